@@ -1,39 +1,109 @@
 # ===== Imports =====
-from pathlib import Path
-from selenium import webdriver
-from selenium.webdriver.chrome.webdriver import WebDriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import Select
-from selenium.webdriver.common.action_chains import ActionChains
-from selenium.webdriver.common.keys import Keys
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-import pytest
 import os
 import time
 from datetime import datetime
-import logging
 import sys
 import traceback
 import random
 import string
+import argparse
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from test_reports.test_report import TestReport, TestCase, TestStep, track_step, create_test_case
+from test_reports.test_report import TestReport, TestCase, TestStep, track_step, create_test_case, set_watchdog, set_trace_exporter, remove_failure_hook
+from test_reports.trace_export import ChromeTraceWriter
+from test_reports.checkpoint import RunCheckpoint, select_rerun, print_rerun_delta
+from test_reports.history import DEFAULT_QUARANTINE_THRESHOLD, FlakeHistory, load_history
+from test_support.network_profiles import NETWORK_PROFILES, DEFAULT_NETWORK_PROFILE, apply_network_profile
+from test_support.runner import Scenario, run_scenarios, format_result
+from test_support.ordering import get_changed_scenarios, order_fail_fast
+from test_support.scheduling import predict_durations, print_prediction
+from test_support.planning import find_navigations, print_plan
+from test_support.artifacts import ArtifactWriter
+from test_support.screencast import start_failure_screencast
+from test_support.snapshots import start_failure_snapshots
+from test_support.watchdog import Watchdog, abort_browser, discard_driver
+from test_support.accounts import Account, AccountPool, load_accounts, get_leased_account
+from test_support.cleanup import EntityManifest, BatchCleanup, find_pending_entities
+from test_support.identifiers import IdentifierGenerator
+from test_support.preflight import DEFAULT_PREFLIGHT_TIMEOUT, HealthTarget, run_preflight, get_unhealthy, create_preflight_test_case
+from test_support.session import BrowserSession
+from test_support.lazy_imports import Lazy, lazy_import
+# Selenium's webdriver package loads every browser binding, so it is imported on first use
+webdriver = lazy_import("selenium.webdriver")
+By = lazy_import("selenium.webdriver.common.by", "By")
+WebDriverWait = lazy_import("selenium.webdriver.support.ui", "WebDriverWait")
+Select = lazy_import("selenium.webdriver.support.ui", "Select")
+EC = lazy_import("selenium.webdriver.support.expected_conditions")
+ActionChains = lazy_import("selenium.webdriver.common.action_chains", "ActionChains")
+Keys = lazy_import("selenium.webdriver.common.keys", "Keys")
 
 # ===== Global Configuration =====
-driver = webdriver.Chrome()
-wait = WebDriverWait(driver, 30)  # Increased timeout for admin panel
-driver.maximize_window()
+SUITE_NAME = "Admin_Payment_Tests"
+def create_driver():
+    """Start a Chrome session for the admin panel"""
+    new_driver = webdriver.Chrome()
+    new_driver.maximize_window()
+    return new_driver
+
+# Chrome starts the first time `driver` is used, so importing the suite (e.g. to plan a run) opens no browser;
+# `driver` follows the session's current browser when the watchdog recycles it
+browser = BrowserSession(create_driver)
+driver = browser.driver
+wait = Lazy(lambda: WebDriverWait(driver, 30), "WebDriverWait")  # Increased timeout for admin panel
 
 report_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reports")
 
 # ===== Admin Panel Configuration =====
+ADMIN_ORIGIN = "https://test-admin-shenlong.cd.xiaoxigroup.net"
+ADMIN_LOGIN_URL = f"{ADMIN_ORIGIN}/login"
 SSO_LOGIN_URL = "https://sso.xiaoxitech.com/login?project=fztpumkh&cb=https%3A%2F%2Ftest-admin-shenlong.cd.xiaoxigroup.net%2Flogin"
-USER_DETAIL_URL = "https://test-admin-shenlong.cd.xiaoxigroup.net/client/userDetail?userId=10711&roles=300&show=false&brand=2"
+USER_DETAIL_URL = "https://test-admin-shenlong.cd.xiaoxigroup.net/client/userDetail?userId={user_id}&roles=300&show=false&brand=2"
 USERNAME = "khordichze"
 PASSWORD = "zxXI@16981098"
 
+# ===== Account Pool =====
+# Scenarios lease the storefront user they add orders to; --accounts adds more target users
+TARGET_USER_ID = "10711"
+DEFAULT_ACCOUNTS = [
+    Account(TARGET_USER_ID, ["admin_target"]),
+]
+account_lock_dir = os.path.join(report_dir, ".account_leases")
+
+# ===== Created Entities =====
+# Every VPN account a scenario creates is recorded here; the cleanup stage deletes them after the run
+entity_manifest = None
+# Generated account names are unique across all runs under the reports root and traceable to their scenario
+id_generator = None
+reports_root = report_dir
+CLEANUP_WORKERS = 4
+CLEANUP_RATE = 5                  # Delete requests per second across all workers
+CLEANUP_MAX_AGE_DAYS = 7          # Only runs this recent are cleaned up
+# Accounts created by either suite are deleted through the admin panel's account API with the
+# admin session's cookies; names are unique across runs, so the name alone identifies the account
+DELETE_ACCOUNT_REQUESTS = [
+    {"method": "POST", "url": "/api/client/account/delete", "body": {"account": "{name}"},
+     "expect_status": 200, "expect_json": {"code": 0}},
+]
+CLEANUP_DELETE_REQUESTS = {
+    "vpn_account": DELETE_ACCOUNT_REQUESTS,     # Added in the admin panel by this suite
+    "paid_account": DELETE_ACCOUNT_REQUESTS,    # Bought on the storefront by the website suite
+}
+
+# ===== Latency Budgets (seconds) =====
+# Steps whose own time (excluding nested steps) exceeds their budget are reported as SLOW; the budgets
+# belong to this suite's TestReport
+STEP_BUDGETS = {
+    "Navigate to User Detail": 10,
+    "Verify Success": 3,          # 确定 → 添加成功 confirmation
+}
+
+# ===== Watchdog Deadlines (seconds) =====
+# Steps and scenarios running past these are aborted, reported as TIMED_OUT and the browser is recycled
+DEFAULT_STEP_TIMEOUT = 120
+DEFAULT_SCENARIO_TIMEOUT = 600
+# How long the admin login waits for the captcha to be solved by hand
+CAPTCHA_TIMEOUT = 900
+
 # ===== Package Mapping =====
 PACKAGE_MAPPING = {
     "天启动态尊享": "天启动态尊享",
@@ -53,7 +123,7 @@ PACKAGE_ARROW_MAPPING = {
 def create_report_dir():
     """Creates a unique report directory with timestamp"""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    test_dir = os.path.join(report_dir, f"Admin_Payment_Tests_{timestamp}")
+    test_dir = os.path.join(report_dir, f"{SUITE_NAME}_{timestamp}")
     os.makedirs(test_dir, exist_ok=True)
     return test_dir
 
@@ -107,8 +177,8 @@ def login_to_admin_panel(test_case):
                     (By.XPATH, "//input[@type='text' and @placeholder='验证码' and @class='el-input__inner']")))
                 driver.execute_script("arguments[0].click();", captcha_field)
                 
-                # Wait up to 15 minutes for user to complete captcha and login
-                max_wait_time = 900  # 15 minutes
+                # Wait for user to complete captcha and login (15 minutes unless --captcha-timeout is given)
+                max_wait_time = CAPTCHA_TIMEOUT
                 start_time = time.time()
                 last_url = driver.current_url
                 
@@ -141,8 +211,9 @@ def navigate_to_user_detail(test_case):
     """Navigate to user detail page"""
     with track_step(test_case, "Navigate to User Detail", "Navigate to user detail page"):
         try:
-            print(f"Navigating to 流量业务管理后台 page")
-            driver.get(USER_DETAIL_URL)
+            target_user = get_leased_account("admin_target") or DEFAULT_ACCOUNTS[0]
+            print(f"Navigating to 流量业务管理后台 page for user {target_user.account_id}")
+            driver.get(USER_DETAIL_URL.format(user_id=target_user.account_id))
             time.sleep(5)  # Increased wait time for page load
             
             print(f"Current URL: {driver.current_url}")
@@ -259,17 +330,23 @@ def select_package_type(package_name, test_case):
             return False
 
 def input_random_username(test_case):
-    """Input random 8-character alphanumeric string in username field"""
-    with track_step(test_case, "Input Username", "Input random 8-character username"):
+    """Input a unique run-tagged 8-character username in username field"""
+    with track_step(test_case, "Input Username", "Input unique 8-character username"):
         try:
-            # Generate random 8-character alphanumeric string
-            username = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
+            if id_generator is not None:
+                username = id_generator.next_name(test_case.name, "vpn_account")
+            else:
+                username = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
             
             # Find username field using the correct XPath
             username_field = wait.until(EC.element_to_be_clickable(
                 (By.XPATH, "/html/body/div[1]/div/div[2]/div/div[3]/div/div[2]/form/div/div[5]/div/div/div/div/div[1]/input")))
             username_field.clear()
             username_field.send_keys(username)
+            if entity_manifest is not None:
+                target_user = get_leased_account("admin_target") or DEFAULT_ACCOUNTS[0]
+                # Recorded for cleanup only once the panel confirms the account was added
+                entity_manifest.submit("vpn_account", username, owner=target_user.account_id, scenario=test_case.name)
             time.sleep(1)
             print(f"Entered username: {username}")
             return True
@@ -325,6 +402,8 @@ def verify_success_message(test_case):
             # Wait for the specific success message "添加成功" using the correct XPath
             success_msg = wait.until(EC.visibility_of_element_located((By.XPATH, "/html/body/div[4]/p")))
             if "添加成功" in success_msg.text:
+                if entity_manifest is not None:
+                    entity_manifest.confirm(test_case.name)
                 print(f"✅ Success message found: {success_msg.text}")
                 return True
             else:
@@ -491,32 +570,241 @@ def test_fixed_long_term_balance_payment(report_dir, test_case):
     finally:
         test_case.complete()
 
+# ===== Scenario Registry =====
+SCENARIOS = [
+    Scenario("1.1_dynamic_supreme_pending", "1.1 Dynamic Supreme - Pending Order", "Test Dynamic Supreme with Pending Order payment", test_dynamic_supreme_pending_order, "1. DYNAMIC SUPREME TESTS", account="admin_target"),
+    Scenario("1.2_dynamic_supreme_balance", "1.2 Dynamic Supreme - Balance Payment", "Test Dynamic Supreme with Balance Payment", test_dynamic_supreme_balance_payment, "1. DYNAMIC SUPREME TESTS", account="admin_target"),
+    Scenario("2.1_dynamic_dedicated_pending", "2.1 Dynamic Dedicated - Pending Order", "Test Dynamic Dedicated with Pending Order payment", test_dynamic_dedicated_pending_order, "2. DYNAMIC DEDICATED TESTS", account="admin_target"),
+    Scenario("2.2_dynamic_dedicated_balance", "2.2 Dynamic Dedicated - Balance Payment", "Test Dynamic Dedicated with Balance Payment", test_dynamic_dedicated_balance_payment, "2. DYNAMIC DEDICATED TESTS", account="admin_target"),
+    Scenario("3.1_static_premium_pending", "3.1 Static Premium - Pending Order", "Test Static Premium with Pending Order payment", test_static_premium_pending_order, "3. STATIC PREMIUM TESTS", account="admin_target"),
+    Scenario("3.2_static_premium_balance", "3.2 Static Premium - Balance Payment", "Test Static Premium with Balance Payment", test_static_premium_balance_payment, "3. STATIC PREMIUM TESTS", account="admin_target"),
+    Scenario("4.1_fixed_long_term_pending", "4.1 Fixed Long-Term - Pending Order", "Test Fixed Long-Term with Pending Order payment", test_fixed_long_term_pending_order, "4. FIXED LONG-TERM TESTS", account="admin_target"),
+    Scenario("4.2_fixed_long_term_balance", "4.2 Fixed Long-Term - Balance Payment", "Test Fixed Long-Term with Balance Payment", test_fixed_long_term_balance_payment, "4. FIXED LONG-TERM TESTS", account="admin_target"),
+]
+
+# ===== Cleanup =====
+def run_cleanup_stage(test_report):
+    """Delete the accounts recent runs of both suites created; any account left behind fails the stage in the report"""
+    pending = find_pending_entities(reports_root, max_age_days=CLEANUP_MAX_AGE_DAYS)
+    if not pending:
+        return
+    test_case = test_report.create_test_case("Cleanup Created Entities", f"Delete the {len(pending)} accounts recent runs created")
+    test_case.start()
+    try:
+        with track_step(test_case, "Delete Entities", "Delete each created account through the admin API"):
+            driver.get(ADMIN_ORIGIN)
+            cookies = {cookie['name']: cookie['value'] for cookie in driver.get_cookies()}
+            deleted, failed = BatchCleanup(ADMIN_ORIGIN, CLEANUP_DELETE_REQUESTS, cookies, CLEANUP_WORKERS, CLEANUP_RATE).run(pending)
+            if failed:
+                raise Exception(f"{failed} of {deleted + failed} accounts could not be deleted")
+    except Exception as e:
+        print(f"❌ CLEANUP FAILED: {str(e)}")
+    finally:
+        test_case.complete()
+        test_report.add_test_case(test_case)
+
 # ===== Main Execution =====
-def main():
-    report_dir = create_report_dir()
-    test_report = TestReport(report_dir)
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Admin panel payment test suite")
+    parser.add_argument("--network-profile", action="append", choices=sorted(NETWORK_PROFILES),
+                        help="Run the scenario matrix under this throttling profile (repeatable)")
+    parser.add_argument("--plan", action="store_true",
+                        help="Print the scenarios, order, accounts, logins, navigations and estimated time, then exit without starting Chrome")
+    parser.add_argument("--captcha-timeout", type=float, default=CAPTCHA_TIMEOUT,
+                        help="Seconds to wait for the admin login captcha to be solved")
+    parser.add_argument("--resume", metavar="RUN_DIR",
+                        help="Resume an interrupted run: skip scenarios that passed in RUN_DIR and merge the report")
+    parser.add_argument("--rerun-failures", metavar="RUN_DIR",
+                        help="Only run the scenarios that failed, timed out or were slow in RUN_DIR and show the delta")
+    parser.add_argument("--step-timeout", type=float, default=DEFAULT_STEP_TIMEOUT,
+                        help="Seconds before a hung step is aborted as TIMED_OUT (0 disables the watchdog)")
+    parser.add_argument("--scenario-timeout", type=float, default=DEFAULT_SCENARIO_TIMEOUT,
+                        help="Seconds before a hung scenario is aborted as TIMED_OUT")
+    parser.add_argument("--only", type=lambda value: value.split(","), metavar="KEYS",
+                        help="Comma-separated scenario keys to run (e.g. 1.2_dynamic_supreme_balance)")
+    parser.add_argument("--order", choices=["source", "fail-fast"], default="source",
+                        help="Run scenarios in source order, or most-likely-to-fail first using the run history")
+    parser.add_argument("--changed-since", metavar="GIT_REF",
+                        help="With --order fail-fast, scenarios whose code changed since this ref go earlier "
+                             "(default: the merge-base with main)")
+    parser.add_argument("--max-failures", type=int, metavar="K",
+                        help="Stop after K failures; the remaining scenarios are reported as NOT_RUN")
+    parser.add_argument("--quarantine-threshold", type=float, default=DEFAULT_QUARANTINE_THRESHOLD,
+                        help="Flake score at which a scenario moves to the non-blocking quarantine lane")
+    parser.add_argument("--no-quarantine", action="store_true",
+                        help="Run flaky scenarios in the main lane")
+    parser.add_argument("--accounts", default=os.environ.get("TEST_ACCOUNTS_FILE"), metavar="FILE",
+                        help="JSON file of target users to lease from instead of the built-in one")
+    parser.add_argument("--no-cleanup", action="store_true",
+                        help="Keep the accounts created by this and earlier runs instead of deleting them afterwards")
+    parser.add_argument("--skip-preflight", action="store_true",
+                        help="Start the scenarios without probing the environment first")
+    parser.add_argument("--preflight-timeout", type=float, default=DEFAULT_PREFLIGHT_TIMEOUT,
+                        help="Seconds each pre-flight check may take")
+    return parser.parse_args(argv)
+
+def get_preflight_targets():
+    """Hosts the admin suite depends on: the admin panel and the SSO login in front of it"""
+    return [
+        HealthTarget("Admin Panel", ADMIN_LOGIN_URL),
+        HealthTarget("SSO", SSO_LOGIN_URL),
+    ]
+
+def get_remaining_scenarios(args, scenarios, done, quarantined, rerun_source, profile_key, flake_history, changed_keys):
+    """Scenarios of one network profile the main lane still has to run, in run order"""
+    remaining = [scenario for scenario in scenarios if scenario.key not in done and scenario.key not in quarantined]
+    if rerun_source is not None:
+        remaining = select_rerun(rerun_source, remaining, profile_key)
+        print(f"🎯 Rerunning {len(remaining)} of {len(SCENARIOS)} scenarios from {rerun_source.run_dir}")
+    if args.order == "fail-fast":
+        remaining = order_fail_fast(remaining, flake_history.get_failure_probabilities(), changed_keys)
+    return remaining
+
+def get_lane_scenarios(scenarios, done, quarantined):
+    """Quarantined scenarios of one network profile the quarantine lane still has to run"""
+    return [scenario for scenario in scenarios if scenario.key in quarantined and scenario.key not in done]
+
+def print_run_plan(args, scenarios, network_profiles, flake_histories, quarantined, rerun_source, changed_keys):
+    """Print what the run would do under every network profile without starting a browser"""
+    resumed = RunCheckpoint.load(args.resume, SUITE_NAME) if args.resume else None
+    navigations = find_navigations(os.path.abspath(__file__))
+    for network_profile in network_profiles:
+        if len(network_profiles) > 1:
+            print(f"\n[{network_profile}]")
+        profile_key = network_profile if args.network_profile else None
+        done = {key for key, passed in resumed.get_results(profile_key).items() if passed} if resumed is not None else set()
+        flake_history = flake_histories[network_profile]
+        remaining = get_remaining_scenarios(args, scenarios, done, quarantined, rerun_source, profile_key, flake_history, changed_keys)
+        lane_scenarios = get_lane_scenarios(scenarios, done, quarantined)
+        predictions = predict_durations(remaining + lane_scenarios, flake_history.get_predicted_durations())
+        # Every scenario runs in the session of the one admin login made at the start of the run
+        logins = {scenario.key: ["Admin panel login (captcha solved by hand)"] for scenario in remaining + lane_scenarios}
+        print_plan([[scenario.key for scenario in remaining]], remaining, predictions, navigations, logins,
+                   flake_history.scenario_durations, lane_scenarios, lane_in_parallel=False)
+
+def print_final_results(test_results, quarantined=()):
+    """Print the pass/fail result of every scenario grouped by package"""
+    print("\n1. DYNAMIC SUPREME:")
+    print(f"   1.1 Pending Order Payment Test: {format_result(test_results, '1.1_dynamic_supreme_pending', quarantined)}")
+    print(f"   1.2 Balance Payment Test: {format_result(test_results, '1.2_dynamic_supreme_balance', quarantined)}")
+    
+    print("\n2. DYNAMIC DEDICATED:")
+    print(f"   2.1 Pending Order Payment Test: {format_result(test_results, '2.1_dynamic_dedicated_pending', quarantined)}")
+    print(f"   2.2 Balance Payment Test: {format_result(test_results, '2.2_dynamic_dedicated_balance', quarantined)}")
+    
+    print("\n3. STATIC PREMIUM:")
+    print(f"   3.1 Pending Order Payment Test: {format_result(test_results, '3.1_static_premium_pending', quarantined)}")
+    print(f"   3.2 Balance Payment Test: {format_result(test_results, '3.2_static_premium_balance', quarantined)}")
+    
+    print("\n4. FIXED LONG-TERM:")
+    print(f"   4.1 Pending Order Payment Test: {format_result(test_results, '4.1_fixed_long_term_pending', quarantined)}")
+    print(f"   4.2 Balance Payment Test: {format_result(test_results, '4.2_fixed_long_term_balance', quarantined)}")
+
+def main(argv=None):
+    global CAPTCHA_TIMEOUT, entity_manifest, id_generator
+    args = parse_args(argv)
+    CAPTCHA_TIMEOUT = args.captcha_timeout
+    network_profiles = args.network_profile or [DEFAULT_NETWORK_PROFILE]
+    
+    rerun_source = RunCheckpoint.load(args.rerun_failures, SUITE_NAME) if args.rerun_failures else None
+    scenarios = [scenario for scenario in SCENARIOS if not args.only or scenario.key in args.only]
+    
+    # Flake scores from earlier runs. The admin login needs a hand-solved captcha, so the
+    # quarantine lane runs after the main lane in the same browser instead of in parallel.
+    # The history is read before the run directory exists, so --plan leaves no trace
+    history_runs = load_history(os.path.dirname(os.path.abspath(args.resume)) if args.resume else reports_root, SUITE_NAME)
+    flake_histories = {network_profile: FlakeHistory(history_runs, network_profile if args.network_profile else None)
+                       for network_profile in network_profiles}
+    changed_keys = set()
+    if args.order == "fail-fast":
+        changed_keys = get_changed_scenarios(SCENARIOS, os.path.abspath(__file__), args.changed_since)
+    quarantined = set()
+    if not args.no_quarantine:
+        for flake_history in flake_histories.values():
+            quarantined |= flake_history.get_quarantined(args.quarantine_threshold)
+        quarantined &= {scenario.key for scenario in scenarios}
+    
+    if args.plan:
+        print_run_plan(args, scenarios, network_profiles, flake_histories, quarantined, rerun_source, changed_keys)
+        return
+    
+    if args.resume:
+        report_dir = args.resume
+        checkpoint = RunCheckpoint.load(report_dir, SUITE_NAME)
+        print(f"🔁 Resuming run from checkpoint: {checkpoint.path}")
+    else:
+        report_dir = create_report_dir()
+        checkpoint = RunCheckpoint(report_dir, SUITE_NAME, rerun_of=args.rerun_failures)
+    test_report = TestReport(report_dir, step_budgets=STEP_BUDGETS)
     test_report.start()
+    # Every finished test case is streamed to trace-<pid>.json for trace viewers
+    trace_writer = ChromeTraceWriter(report_dir, SUITE_NAME)
+    set_trace_exporter(trace_writer)
+    
+    lane_results_by_profile = {}
+    account_pool = AccountPool(load_accounts(args.accounts) if args.accounts else DEFAULT_ACCOUNTS, account_lock_dir)
+    entity_manifest = EntityManifest(report_dir)
+    id_generator = IdentifierGenerator(report_dir, reports_root)
 
-    test_results = {
-        "1.1_dynamic_supreme_pending": False,
-        "1.2_dynamic_supreme_balance": False,
-        "2.1_dynamic_dedicated_pending": False,
-        "2.2_dynamic_dedicated_balance": False,
-        "3.1_static_premium_pending": False,
-        "3.2_static_premium_balance": False,
-        "4.1_fixed_long_term_pending": False,
-        "4.2_fixed_long_term_balance": False
-    }
+    results_by_profile = {}
     
     login_success = False
 
+    artifact_writer = ArtifactWriter()
+    # Captures bind to the browser, so they start after the pre-flight: a down environment never launches Chrome
+    screencast = None
+    snapshots = None
+    current_profile = None
+
+    def recycle_driver():
+        """Replace the aborted browser with a fresh session and log in to the admin panel again"""
+        nonlocal screencast, snapshots
+        for capture in (screencast, snapshots):
+            if capture is not None:
+                remove_failure_hook(capture.failure_hook)
+                capture.stop()
+        discard_driver(browser.current)
+        browser.reset()
+        
+        screencast = start_failure_screencast(driver, report_dir, artifact_writer)
+        snapshots = start_failure_snapshots(driver, report_dir, artifact_writer)
+        
+        relogin_test_case = test_report.create_test_case("Admin Panel Login (browser recycled)", "Login to admin panel again after a timeout")
+        relogin_success = login_to_admin_panel(relogin_test_case)
+        test_report.add_test_case(relogin_test_case)
+        if not relogin_success:
+            raise RuntimeError("Could not log in to the admin panel again after recycling the browser")
+        if args.network_profile:
+            apply_network_profile(driver, current_profile)
+
+    watchdog = None
+    if args.step_timeout:
+        # The login step legitimately waits for the captcha to be solved by hand
+        watchdog = Watchdog(lambda force: abort_browser(browser.current, force),
+                            step_timeout=args.step_timeout, scenario_timeout=args.scenario_timeout,
+                            step_timeouts={"Admin Login": args.captcha_timeout + 60},
+                            before_abort=lambda timeout: snapshots.wait_idle(timeout) if snapshots else None).start()
+        set_watchdog(watchdog)
+
     try:
+        if not args.skip_preflight:
+            preflight_results = run_preflight(get_preflight_targets(), args.preflight_timeout, report_dir)
+            test_report.add_test_case(create_preflight_test_case(preflight_results))
+            unhealthy = get_unhealthy(preflight_results)
+            if unhealthy:
+                print("\n❌ ENVIRONMENT UNHEALTHY - STOPPING ALL TESTS")
+                print(f"Failed pre-flight: {', '.join(health.target.name for health in unhealthy)}")
+                return
+        
+        screencast = start_failure_screencast(driver, report_dir, artifact_writer)
+        snapshots = start_failure_snapshots(driver, report_dir, artifact_writer)
+        
         # First, attempt to login to admin panel
         print("\n" + "="*60)
         print("ADMIN PANEL LOGIN")
         print("="*60)
         
-        login_test_case = create_test_case("Admin Panel Login", "Login to admin panel using token URL")
+        login_test_case = test_report.create_test_case("Admin Panel Login", "Login to admin panel using token URL")
         login_success = login_to_admin_panel(login_test_case)
         test_report.add_test_case(login_test_case)
         
@@ -528,77 +816,63 @@ def main():
         
         print("\n✅ LOGIN SUCCESSFUL - PROCEEDING WITH TESTS")
         
-        # 1. Dynamic Supreme Tests
-        print("\n" + "="*60)
-        print("1. DYNAMIC SUPREME TESTS")
-        print("="*60)
-        
-        # 1.1 Pending Order Payment Test
-        print("\n--- 1.1 Pending Order Payment Test ---")
-        test_case1 = create_test_case("1.1 Dynamic Supreme - Pending Order", "Test Dynamic Supreme with Pending Order payment")
-        test_results["1.1_dynamic_supreme_pending"] = test_dynamic_supreme_pending_order(report_dir, test_case1)
-        test_report.add_test_case(test_case1)
-
-        # 1.2 Balance Payment Test
-        print("\n--- 1.2 Balance Payment Test ---")
-        test_case2 = create_test_case("1.2 Dynamic Supreme - Balance Payment", "Test Dynamic Supreme with Balance Payment")
-        test_results["1.2_dynamic_supreme_balance"] = test_dynamic_supreme_balance_payment(report_dir, test_case2)
-        test_report.add_test_case(test_case2)
-
-        # 2. Dynamic Dedicated Tests
-        print("\n" + "="*60)
-        print("2. DYNAMIC DEDICATED TESTS")
-        print("="*60)
-        
-        # 2.1 Pending Order Payment Test
-        print("\n--- 2.1 Pending Order Payment Test ---")
-        test_case3 = create_test_case("2.1 Dynamic Dedicated - Pending Order", "Test Dynamic Dedicated with Pending Order payment")
-        test_results["2.1_dynamic_dedicated_pending"] = test_dynamic_dedicated_pending_order(report_dir, test_case3)
-        test_report.add_test_case(test_case3)
-
-        # 2.2 Balance Payment Test
-        print("\n--- 2.2 Balance Payment Test ---")
-        test_case4 = create_test_case("2.2 Dynamic Dedicated - Balance Payment", "Test Dynamic Dedicated with Balance Payment")
-        test_results["2.2_dynamic_dedicated_balance"] = test_dynamic_dedicated_balance_payment(report_dir, test_case4)
-        test_report.add_test_case(test_case4)
-
-        # 3. Static Premium Tests
-        print("\n" + "="*60)
-        print("3. STATIC PREMIUM TESTS")
-        print("="*60)
-        
-        # 3.1 Pending Order Payment Test
-        print("\n--- 3.1 Pending Order Payment Test ---")
-        test_case5 = create_test_case("3.1 Static Premium - Pending Order", "Test Static Premium with Pending Order payment")
-        test_results["3.1_static_premium_pending"] = test_static_premium_pending_order(report_dir, test_case5)
-        test_report.add_test_case(test_case5)
-
-        # 3.2 Balance Payment Test
-        print("\n--- 3.2 Balance Payment Test ---")
-        test_case6 = create_test_case("3.2 Static Premium - Balance Payment", "Test Static Premium with Balance Payment")
-        test_results["3.2_static_premium_balance"] = test_static_premium_balance_payment(report_dir, test_case6)
-        test_report.add_test_case(test_case6)
-
-        # 4. Fixed Long-Term Tests
-        print("\n" + "="*60)
-        print("4. FIXED LONG-TERM TESTS")
-        print("="*60)
+        for network_profile in network_profiles:
+            current_profile = network_profile
+            if len(network_profiles) > 1:
+                print("\n" + "#"*60)
+                print(f"NETWORK PROFILE: {network_profile}")
+                print("#"*60)
+            if args.network_profile:
+                apply_network_profile(driver, network_profile)
+            
+            profile_key = network_profile if args.network_profile else None
+            profile_results = results_by_profile.setdefault(network_profile, {})
+            profile_lane_results = lane_results_by_profile.setdefault(network_profile, {})
+            # Quarantined scenarios that already passed count towards the lane, not the main lane
+            for key, result in checkpoint.restore_passed(test_report, profile_key).items():
+                (profile_lane_results if key in quarantined else profile_results)[key] = result
+            flake_history = flake_histories[network_profile]
+            remaining = get_remaining_scenarios(args, scenarios, profile_results, quarantined, rerun_source,
+                                                profile_key, flake_history, changed_keys)
+            # The admin login needs a hand-solved captcha, so the suite always runs in one browser
+            lane_scenarios = get_lane_scenarios(scenarios, profile_lane_results, quarantined)
+            predictions = predict_durations(remaining + lane_scenarios, flake_history.get_predicted_durations())
+            print_prediction([[scenario.key for scenario in remaining + lane_scenarios]], predictions,
+                             flake_history.scenario_durations)
+            run_scenarios(remaining, test_report, report_dir,
+                          network_profile=profile_key,
+                          test_results=profile_results, watchdog=watchdog, recycle_driver=recycle_driver,
+                          checkpoint=checkpoint, flake_scores=flake_history.get_scenario_scores(),
+                          step_flake_scores=flake_history.get_step_scores(), max_failures=args.max_failures, account_pool=account_pool)
+            
+            if quarantined:
+                print("\n" + "="*60)
+                print("QUARANTINE LANE (flaky scenarios, non-blocking)")
+                print("="*60)
+                run_scenarios(lane_scenarios, test_report, report_dir,
+                              network_profile=profile_key,
+                              test_results=profile_lane_results,
+                              watchdog=watchdog, recycle_driver=recycle_driver,
+                              checkpoint=checkpoint, flake_scores=flake_history.get_scenario_scores(),
+                              step_flake_scores=flake_history.get_step_scores(), quarantined=True, account_pool=account_pool)
         
-        # 4.1 Pending Order Payment Test
-        print("\n--- 4.1 Pending Order Payment Test ---")
-        test_case7 = create_test_case("4.1 Fixed Long-Term - Pending Order", "Test Fixed Long-Term with Pending Order payment")
-        test_results["4.1_fixed_long_term_pending"] = test_fixed_long_term_pending_order(report_dir, test_case7)
-        test_report.add_test_case(test_case7)
-
-        # 4.2 Balance Payment Test
-        print("\n--- 4.2 Balance Payment Test ---")
-        test_case8 = create_test_case("4.2 Fixed Long-Term - Balance Payment", "Test Fixed Long-Term with Balance Payment")
-        test_results["4.2_fixed_long_term_balance"] = test_fixed_long_term_balance_payment(report_dir, test_case8)
-        test_report.add_test_case(test_case8)
+        # Delete what this and recent runs of both suites created, using the logged-in admin session
+        if not args.no_cleanup:
+            run_cleanup_stage(test_report)
 
     finally:
         test_report.complete()
-        driver.quit()
+        set_trace_exporter(None)
+        trace_writer.close()
+        if watchdog is not None:
+            watchdog.stop()
+            set_watchdog(None)
+        if screencast is not None:
+            screencast.stop()
+        if snapshots is not None:
+            snapshots.stop()
+        artifact_writer.close()
+        browser.quit()
         
         # Print final results in organized format
         print("\n" + "="*60)
@@ -606,37 +880,53 @@ def main():
         print("="*60)
         
         # Check if any tests were actually run
-        if not any(test_results.values()) and not login_success:
+        if not login_success:
             print("\n❌ NO TESTS EXECUTED - LOGIN FAILED")
             print("All tests were skipped due to login failure")
             report_file = test_report.generate_html_report()
             print(f"\nLogin failure report generated: {report_file}")
             return
         
-        print("\n1. DYNAMIC SUPREME:")
-        print(f"   1.1 Pending Order Payment Test: {'✅ PASSED' if test_results['1.1_dynamic_supreme_pending'] else '❌ FAILED'}")
-        print(f"   1.2 Balance Payment Test: {'✅ PASSED' if test_results['1.2_dynamic_supreme_balance'] else '❌ FAILED'}")
-        
-        print("\n2. DYNAMIC DEDICATED:")
-        print(f"   2.1 Pending Order Payment Test: {'✅ PASSED' if test_results['2.1_dynamic_dedicated_pending'] else '❌ FAILED'}")
-        print(f"   2.2 Balance Payment Test: {'✅ PASSED' if test_results['2.2_dynamic_dedicated_balance'] else '❌ FAILED'}")
-        
-        print("\n3. STATIC PREMIUM:")
-        print(f"   3.1 Pending Order Payment Test: {'✅ PASSED' if test_results['3.1_static_premium_pending'] else '❌ FAILED'}")
-        print(f"   3.2 Balance Payment Test: {'✅ PASSED' if test_results['3.2_static_premium_balance'] else '❌ FAILED'}")
-        
-        print("\n4. FIXED LONG-TERM:")
-        print(f"   4.1 Pending Order Payment Test: {'✅ PASSED' if test_results['4.1_fixed_long_term_pending'] else '❌ FAILED'}")
-        print(f"   4.2 Balance Payment Test: {'✅ PASSED' if test_results['4.2_fixed_long_term_balance'] else '❌ FAILED'}")
+        # Scenarios that never ran (e.g. after a crash) are reported as failed;
+        # with --rerun-failures the scenarios that were not selected keep their previous result
+        test_results = {}
+        lane_results = {}
+        for network_profile, profile_results in results_by_profile.items():
+            if len(network_profiles) > 1:
+                print(f"\n[{network_profile}]")
+            previous_results = {}
+            if rerun_source is not None:
+                previous_results = rerun_source.get_results(network_profile if args.network_profile else None)
+            rerun_results = profile_results
+            profile_results = {scenario.key: profile_results.get(scenario.key, previous_results.get(scenario.key, False))
+                               for scenario in scenarios if scenario.key not in quarantined}
+            profile_lane_results = lane_results_by_profile.get(network_profile, {})
+            print_final_results({**profile_results, **profile_lane_results}, quarantined)
+            if rerun_source is not None:
+                print_rerun_delta(previous_results, rerun_results)
+            test_results.update({f"{network_profile}:{key}": result for key, result in profile_results.items()})
+            lane_results.update({f"{network_profile}:{key}": result for key, result in profile_lane_results.items()})
         
         # Calculate summary
         passed_count = sum(1 for result in test_results.values() if result)
-        total_count = len(test_results)
+        total_count = sum(1 for result in test_results.values() if result is not None)
+        not_run_count = len(test_results) - total_count
         
         print(f"\nSUMMARY: {passed_count}/{total_count} tests passed")
+        if not_run_count:
+            print(f"NOT RUN: {not_run_count} tests were skipped after --max-failures was reached")
+        if quarantined:
+            lane_passed = sum(1 for result in lane_results.values() if result)
+            print(f"QUARANTINE LANE (non-blocking): {lane_passed}/{len(quarantined) * len(network_profiles)} flaky tests passed")
+        slow_count = test_report.get_summary()["slow_tests"]
+        if slow_count:
+            print(f"SLOW: {slow_count} tests exceeded their latency budgets")
+        timed_out_count = test_report.get_summary()["timed_out_tests"]
+        if timed_out_count:
+            print(f"TIMED OUT: {timed_out_count} tests were aborted by the watchdog")
         
         report_file = test_report.generate_html_report()
         print(f"\nDetailed report generated: {report_file}")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -1,44 +1,125 @@
 # ===== Imports =====
-from pathlib import Path
-from selenium import webdriver
-from selenium.webdriver.chrome.webdriver import WebDriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
-import pytest
 import os
 import time
 from datetime import datetime
-import logging
 import sys
 import traceback
+import argparse
+import random
+import string
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from test_reports.test_report import TestReport, TestCase, TestStep, track_step, create_test_case
+from test_reports.test_report import TestReport, TestCase, TestStep, track_step, create_test_case, set_watchdog, set_trace_exporter, remove_failure_hook
+from test_reports.trace_export import ChromeTraceWriter
+from test_reports.checkpoint import RunCheckpoint, select_rerun, print_rerun_delta
+from test_reports.history import DEFAULT_QUARANTINE_THRESHOLD, FlakeHistory, load_history
+from test_support.network_profiles import NETWORK_PROFILES, DEFAULT_NETWORK_PROFILE, apply_network_profile
+from test_support.runner import Scenario, Prerequisite, run_scenarios, format_result
+from test_support.ordering import get_changed_scenarios, order_fail_fast
+from test_support.api_mode import FlowRecorder, ApiMode, flow_path
+from test_support.payment_redirects import RedirectWatcher
+from test_support.payment_stubs import GatewayStub, PaymentGatewayStubs
+from test_support.artifacts import ArtifactWriter
+from test_support.screencast import start_failure_screencast
+from test_support.snapshots import start_failure_snapshots
+from test_support.quarantine import QuarantineLane
+from test_support.scheduling import WorkQueue, WorkerLane, predict_durations, assign_longest_first, print_prediction, get_queue_path
+from test_support.planning import find_navigations, get_prerequisite_chain, print_plan
+from test_support.cleanup import EntityManifest
+from test_support.identifiers import IdentifierGenerator
+from test_support.accounts import Account, AccountPool, BrowserLogin, load_accounts, get_leased_account
+from test_support.preflight import DEFAULT_PREFLIGHT_TIMEOUT, HealthTarget, run_preflight, get_unhealthy, get_flow_api_url, create_preflight_test_case
+from test_support.watchdog import Watchdog, abort_browser, discard_driver
+from test_support.session import BrowserSession
+from test_support.lazy_imports import Lazy, lazy_import
+# Selenium's webdriver package loads every browser binding, so it is imported on first use
+webdriver = lazy_import("selenium.webdriver")
+By = lazy_import("selenium.webdriver.common.by", "By")
+WebDriverWait = lazy_import("selenium.webdriver.support.ui", "WebDriverWait")
+EC = lazy_import("selenium.webdriver.support.expected_conditions")
 
 # ===== Global Configuration =====
-driver = webdriver.Chrome()
-wait = WebDriverWait(driver, 20)
-driver.maximize_window()
+SUITE_NAME = "website_Payment_Tests"
+# Set RECORD_HTTP_FLOWS=1 to record the HTTP calls behind each scenario for --api-mode
+RECORD_HTTP_FLOWS = bool(os.environ.get("RECORD_HTTP_FLOWS"))
+
+def create_driver():
+    """Start a Chrome session with the suite's options"""
+    chrome_options = webdriver.ChromeOptions()
+    if RECORD_HTTP_FLOWS:
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    new_driver = webdriver.Chrome(options=chrome_options)
+    new_driver.maximize_window()
+    return new_driver
+
+# Chrome starts the first time `driver` is used, so importing the suite (e.g. to plan a run) opens no browser;
+# `driver` follows the session's current browser when the watchdog recycles it
+browser = BrowserSession(create_driver)
+driver = browser.driver
+wait = Lazy(lambda: WebDriverWait(driver, 20), "WebDriverWait")
 
 report_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reports")
+flows_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "flows")
 
 # ===== Login Credentials =====
+SITE_URL = "https://test-ip-tianqi.cd.xiaoxigroup.net"
 LOGIN_URL = "https://test-ip-tianqi.cd.xiaoxigroup.net/login"
 PHONE_WITH_BALANCE = "15332595364"
 PHONE_WITHOUT_BALANCE = "15658873355"
 PASSWORD = "Test@123"
 
+# ===== Account Pool =====
+# Scenarios lease an account tagged with their Scenario.account; --accounts adds more so runs can share the site
+DEFAULT_ACCOUNTS = [
+    Account(PHONE_WITH_BALANCE, ["balance"], PASSWORD),
+    Account(PHONE_WITHOUT_BALANCE, ["no_balance"], PASSWORD),
+]
+account_lock_dir = os.path.join(report_dir, ".account_leases")
+
+# ===== Created Entities =====
+# Paid accounts created in the personal center (创建成功) are recorded here; the admin suite's cleanup stage deletes them
+entity_manifest = None
+# Generated account names are unique across all runs under the reports root and traceable to their scenario
+id_generator = None
+reports_root = report_dir
+
+# ===== Latency Budgets (seconds) =====
+# Steps whose own time (excluding nested steps) exceeds their budget are reported as SLOW; the budgets
+# belong to this suite's TestReport
+STEP_BUDGETS = {
+    "Verify Success": 3,          # 立即支付 → 套餐购买成功 / 创建成功 confirmation
+    "Verify Alipay": 5,           # Alipay sandbox redirect
+    "Verify WeChat": 5,           # WeChat QR popup
+    "Verify Recharge Redirect": 5,
+}
+
+# ===== Watchdog Deadlines (seconds) =====
+# Steps and scenarios running past these are aborted, reported as TIMED_OUT and the browser is recycled
+DEFAULT_STEP_TIMEOUT = 120
+DEFAULT_SCENARIO_TIMEOUT = 600
+STEP_TIMEOUTS = {
+    "Login": 180,                 # Fixed sleeps plus redirect wait, and a possible re-login
+}
+
+# ===== Payment Gateway Stubs =====
+# With --stub-payments, gateway traffic is answered locally instead of by the external sandboxes
+PAYMENT_GATEWAY_STUBS = [
+    GatewayStub("alipay", "*alipaydev.com*"),
+    GatewayStub("wechat", "*://*.weixin.qq.com/*", resource_type="Image"),   # QR code images from the WeChat Pay gateway
+]
+payment_stubs = None
+
 # ===== Utility Functions =====
 def create_report_dir():
     """Creates a unique report directory with timestamp"""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    test_dir = os.path.join(report_dir, f"website_Payment_Tests_{timestamp}")
+    test_dir = os.path.join(report_dir, f"{SUITE_NAME}_{timestamp}")
     os.makedirs(test_dir, exist_ok=True)
     return test_dir
 
 def login_with_balance(test_case):
     """Login with account that has balance"""
+    account = get_leased_account("balance") or DEFAULT_ACCOUNTS[0]
     with track_step(test_case, "Login", "Login with account that has balance"):
         try:
             # Navigate to login page
@@ -59,15 +140,15 @@ def login_with_balance(test_case):
                 (By.ID, "__BVID__23")))
             print("Phone input field found")
             phone_input.clear()
-            phone_input.send_keys(PHONE_WITH_BALANCE)
-            print(f"Entered phone number: {PHONE_WITH_BALANCE}")
+            phone_input.send_keys(account.account_id)
+            print(f"Entered phone number: {account.account_id}")
             
             # Try to find password input field
             password_input = wait.until(EC.element_to_be_clickable(
                 (By.ID, "__BVID__24")))
             print("Password input field found")
             password_input.clear()
-            password_input.send_keys(PASSWORD)
+            password_input.send_keys(account.password or PASSWORD)
             print("Entered password")
             
             # Try to find login button
@@ -103,11 +184,12 @@ def login_with_balance(test_case):
             
         except Exception as e:
             print(f"Login failed with error: {str(e)}")
-            print(f"Current page source: {driver.page_source[:1000]}...")
+            print(f"Current URL: {driver.current_url} (full page snapshot attached to the failed step)")
             raise
 
 def login_without_balance(test_case):
     """Login with account that has no balance"""
+    account = get_leased_account("no_balance") or DEFAULT_ACCOUNTS[1]
     with track_step(test_case, "Login", "Login with account that has no balance"):
         try:
             # Navigate to login page
@@ -127,14 +209,14 @@ def login_without_balance(test_case):
             phone_input = wait.until(EC.element_to_be_clickable(
                 (By.ID, "__BVID__23")))
             phone_input.clear()
-            phone_input.send_keys(PHONE_WITHOUT_BALANCE)
-            print(f"Entered phone number: {PHONE_WITHOUT_BALANCE}")
+            phone_input.send_keys(account.account_id)
+            print(f"Entered phone number: {account.account_id}")
             
             # Try to find password input field
             password_input = wait.until(EC.element_to_be_clickable(
                 (By.ID, "__BVID__24")))
             password_input.clear()
-            password_input.send_keys(PASSWORD)
+            password_input.send_keys(account.password or PASSWORD)
             print("Entered password")
             
             # Try to find login button
@@ -170,7 +252,7 @@ def login_without_balance(test_case):
             
         except Exception as e:
             print(f"Login failed with error: {str(e)}")
-            print(f"Current page source: {driver.page_source[:1000]}...")
+            print(f"Current URL: {driver.current_url} (full page snapshot attached to the failed step)")
             raise
 
 def navigate_to_package_order():
@@ -338,32 +420,38 @@ def select_package_type_personal_wallet_no_balance(package_name, test_case):
             raise Exception(f"Package name {package_name} not found in mapping")
         
 def input_random_account(test_case):
-    """Input random 8-character alphanumeric string in account field"""
-    with track_step(test_case, "Input Account", "Input random 8-character account"):
-        import random
-        import string
-        
-        # Generate random 8-character alphanumeric string
-        account = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
+    """Input a unique run-tagged 8-character account name in account field"""
+    with track_step(test_case, "Input Account", "Input unique 8-character account"):
+        if id_generator is not None:
+            account = id_generator.next_name(test_case.name, "paid_account")
+        else:
+            account = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
         
         account_field = wait.until(EC.element_to_be_clickable((By.ID, "__BVID__559")))
         account_field.clear()
         account_field.send_keys(account)
+        if entity_manifest is not None:
+            owner = get_leased_account("balance") or DEFAULT_ACCOUNTS[0]
+            # Recorded for cleanup only once the site confirms the account was created
+            entity_manifest.submit("paid_account", account, owner=owner.account_id, scenario=test_case.name)
         time.sleep(1)
         print(f"Entered account: {account}")
 
 def input_random_account_personal_wallet_no_balance(test_case):
-    """Input random 8-character alphanumeric string in account field"""
-    with track_step(test_case, "Input Account", "Input random 8-character account"):
-        import random
-        import string
-        
-        # Generate random 8-character alphanumeric string
-        account = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
+    """Input a unique run-tagged 8-character account name in account field"""
+    with track_step(test_case, "Input Account", "Input unique 8-character account"):
+        if id_generator is not None:
+            account = id_generator.next_name(test_case.name, "paid_account")
+        else:
+            account = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
         
         account_field = wait.until(EC.element_to_be_clickable((By.ID, "__BVID__109")))
         account_field.clear()
         account_field.send_keys(account)
+        if entity_manifest is not None:
+            owner = get_leased_account("no_balance") or DEFAULT_ACCOUNTS[1]
+            # Recorded for cleanup only once the site confirms the account was created
+            entity_manifest.submit("paid_account", account, owner=owner.account_id, scenario=test_case.name)
         time.sleep(1)
         print(f"Entered account: {account}")
 
@@ -392,6 +480,8 @@ def verify_success_message(test_case):
         success_msg = wait.until(EC.visibility_of_element_located(
             (By.XPATH, "//div[contains(@class, 'ml-20') and contains(text(), '创建成功')]")))
         assert "创建成功" in success_msg.text
+        if entity_manifest is not None:
+            entity_manifest.confirm(test_case.name)
         print("✅ Success message verified")
 
 def close_wechat_popup(test_case):
@@ -403,33 +493,37 @@ def close_wechat_popup(test_case):
         time.sleep(1)
         print("WeChat popup closed")
 
-def verify_alipay_sandbox(test_case, max_retries=1, retry_delay=3):
-    """Verify Alipay sandbox opens with retry logic for intermittent redirects"""
-    for attempt in range(max_retries + 1):
-        try:
-            with track_step(test_case, "Verify Alipay", f"Check Alipay sandbox opens (attempt {attempt + 1})"):
-                driver.switch_to.window(driver.window_handles[-1])
-                
-                # Wait for redirects to complete and verify Alipay sandbox
-                wait.until(lambda d: "alipaydev.com" in d.current_url)
-                assert "alipaydev.com" in driver.current_url
-                print(f"✅ Alipay sandbox verified on attempt {attempt + 1}: {driver.current_url}")
-                return True
-                
-        except Exception as e:
-            if attempt < max_retries:
-                print(f"⚠️ Alipay verification failed on attempt {attempt + 1}: {e}. Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
-                # Switch back to main window before retry
-                driver.switch_to.window(driver.window_handles[0])
-            else:
-                print(f"❌ Alipay verification failed after {max_retries + 1} attempts: {e}")
-                return False
-        finally:
-            # Switch back to main window
-            driver.switch_to.window(driver.window_handles[0])
-    
-    return False
+def watch_alipay_redirect():
+    """Start watching in the background for the Alipay sandbox tab opened by the pay button"""
+    return RedirectWatcher(driver, "alipaydev.com", timeout=20).start()
+
+def verify_alipay_sandbox(test_case, alipay_watcher):
+    """Verify Alipay sandbox opens by joining on the background redirect watcher"""
+    try:
+        # Time the step from the pay click so the latency budget covers the whole redirect
+        with track_step(test_case, "Verify Alipay", "Check Alipay sandbox opens",
+                        started_at_perf=alipay_watcher.started_at_perf):
+            alipay_url = alipay_watcher.result()
+            assert alipay_url is not None, "Alipay sandbox tab did not open within the timeout"
+            print(f"✅ Alipay sandbox verified after {alipay_watcher.latency:.2f}s: {alipay_url}")
+            if payment_stubs is not None:
+                verify_alipay_order_params(test_case)
+            return True
+            
+    except Exception as e:
+        print(f"❌ Alipay verification failed: {e}")
+        return False
+
+def verify_alipay_order_params(test_case):
+    """Verify the order parameters received by the local Alipay gateway stub"""
+    with track_step(test_case, "Verify Alipay Order", "Check order parameters sent to Alipay"):
+        alipay_requests = payment_stubs.get_requests("alipay")
+        assert alipay_requests, "No request reached the Alipay gateway stub"
+        order = alipay_requests[-1].get("biz_content", alipay_requests[-1]["params"])
+        assert order.get("out_trade_no"), "Alipay request has no out_trade_no"
+        assert float(order.get("total_amount", 0)) > 0, "Alipay request has no positive total_amount"
+        print(f"✅ Alipay order {order['out_trade_no']} ({order['total_amount']}) captured by stub")
+        payment_stubs.clear()
 
 def verify_recharge_redirect(test_case):
     """Verify redirect to recharge page when no balance"""
@@ -487,10 +581,11 @@ def test_alipay_payment(report_dir, test_case):
         select_dynamic_supreme(test_case)
         handle_buy_now(test_case)
         select_payment_method("支付宝", test_case)
+        alipay_watcher = watch_alipay_redirect()
         click_pay_now(test_case)
         
         # Verify Alipay sandbox
-        if not verify_alipay_sandbox(test_case):
+        if not verify_alipay_sandbox(test_case, alipay_watcher):
             return False
         return True
             
@@ -573,10 +668,11 @@ def test_alipay_payment_static(report_dir, test_case):
         select_Static_IP(test_case)
         handle_buy_now(test_case)
         select_payment_method("支付宝", test_case)
+        alipay_watcher = watch_alipay_redirect()
         click_pay_now(test_case)
         
         # Verify Alipay sandbox
-        if not verify_alipay_sandbox(test_case):
+        if not verify_alipay_sandbox(test_case, alipay_watcher):
             return False
         return True
             
@@ -659,10 +755,11 @@ def test_alipay_payment_standard(report_dir, test_case):
         select_Dynamic_Standard(test_case)
         handle_buy_now(test_case)
         select_payment_method("支付宝", test_case)
+        alipay_watcher = watch_alipay_redirect()
         click_pay_now(test_case)
         
         # Verify Alipay sandbox
-        if not verify_alipay_sandbox(test_case):
+        if not verify_alipay_sandbox(test_case, alipay_watcher):
             return False
         return True
             
@@ -745,10 +842,11 @@ def test_alipay_payment_dedicated(report_dir, test_case):
         select_Dynamic_Dedicated(test_case)
         handle_buy_now(test_case)
         select_payment_method("支付宝", test_case)
+        alipay_watcher = watch_alipay_redirect()
         click_pay_now(test_case)
         
         # Verify Alipay sandbox
-        if not verify_alipay_sandbox(test_case):
+        if not verify_alipay_sandbox(test_case, alipay_watcher):
             return False
         return True
             
@@ -839,8 +937,9 @@ def test_personal_alipay_supreme(report_dir, test_case):
         select_package_type_personal("天启动态尊享", test_case)
         input_random_account(test_case)
         select_payment_method_personal("支付宝", test_case)
+        alipay_watcher = watch_alipay_redirect()
         click_pay_personal(test_case)
-        if not verify_alipay_sandbox(test_case):
+        if not verify_alipay_sandbox(test_case, alipay_watcher):
             return False
         return True
     except Exception as e:
@@ -897,8 +996,9 @@ def test_personal_alipay_static(report_dir, test_case):
         select_package_type_personal("静态IP-天启", test_case)
         input_random_account(test_case)
         select_payment_method_personal("支付宝", test_case)
+        alipay_watcher = watch_alipay_redirect()
         click_pay_personal(test_case)
-        if not verify_alipay_sandbox(test_case):
+        if not verify_alipay_sandbox(test_case, alipay_watcher):
             return False
         return True
     except Exception as e:
@@ -955,8 +1055,9 @@ def test_personal_alipay_standard(report_dir, test_case):
         select_package_type_personal("天启动态标准套餐", test_case)
         input_random_account(test_case)
         select_payment_method_personal("支付宝", test_case)
+        alipay_watcher = watch_alipay_redirect()
         click_pay_personal(test_case)
-        if not verify_alipay_sandbox(test_case):
+        if not verify_alipay_sandbox(test_case, alipay_watcher):
             return False
         return True
     except Exception as e:
@@ -1013,8 +1114,9 @@ def test_personal_alipay_dedicated(report_dir, test_case):
         select_package_type_personal("天启动态独享套餐", test_case)
         input_random_account(test_case)
         select_payment_method_personal("支付宝", test_case)
+        alipay_watcher = watch_alipay_redirect()
         click_pay_personal(test_case)
-        if not verify_alipay_sandbox(test_case):
+        if not verify_alipay_sandbox(test_case, alipay_watcher):
             return False
         return True
     except Exception as e:
@@ -1212,340 +1314,527 @@ def test_personal_wallet_no_balance_dedicated(report_dir, test_case):
     finally:
         test_case.complete()
 
+# ===== Scenario Registry =====
+# Scenarios run in this order; the no-balance scenarios run last because they switch accounts.
+# API-capable scenarios only assert on order creation or redirects and can replay recorded HTTP
+# calls; WeChat scenarios check the QR popup and always need the browser.
+SCENARIOS = [
+    Scenario("1.1_wallet_balance", "1.1 Dynamic Supreme - Wallet Balance", "Test wallet balance payment for Dynamic Supreme package", test_balance_sufficient, "1. DYNAMIC SUPREME TESTS", "balance", True, requires=("balance_login",)),
+    Scenario("1.2_alipay", "1.2 Dynamic Supreme - Alipay", "Test Alipay payment flow for Dynamic Supreme package", test_alipay_payment, "1. DYNAMIC SUPREME TESTS", "balance", True, requires=("balance_login",)),
+    Scenario("1.3_wechat", "1.3 Dynamic Supreme - WeChat", "Test WeChat payment flow for Dynamic Supreme package", test_wechat_payment, "1. DYNAMIC SUPREME TESTS", "balance", False, requires=("balance_login",)),
+    Scenario("2.1_wallet_balance", "2.1 Static IP - Wallet Balance", "Test wallet balance payment for Static IP package", test_balance_sufficient_static, "2. STATIC IP TESTS", "balance", True, requires=("balance_login",)),
+    Scenario("2.2_alipay", "2.2 Static IP - Alipay", "Test Alipay payment flow for Static IP package", test_alipay_payment_static, "2. STATIC IP TESTS", "balance", True, requires=("balance_login",)),
+    Scenario("2.3_wechat", "2.3 Static IP - WeChat", "Test WeChat payment flow for Static IP package", test_wechat_payment_static, "2. STATIC IP TESTS", "balance", False, requires=("balance_login",)),
+    Scenario("3.1_wallet_balance", "3.1 Dynamic Standard - Wallet Balance", "Test wallet balance payment for Dynamic Standard package", test_balance_sufficient_standard, "3. DYNAMIC STANDARD TESTS", "balance", True, requires=("balance_login",)),
+    Scenario("3.2_alipay", "3.2 Dynamic Standard - Alipay", "Test Alipay payment flow for Dynamic Standard package", test_alipay_payment_standard, "3. DYNAMIC STANDARD TESTS", "balance", True, requires=("balance_login",)),
+    Scenario("3.3_wechat", "3.3 Dynamic Standard - WeChat", "Test WeChat payment flow for Dynamic Standard package", test_wechat_payment_standard, "3. DYNAMIC STANDARD TESTS", "balance", False, requires=("balance_login",)),
+    Scenario("4.1_wallet_balance", "4.1 Dynamic Dedicated - Wallet Balance", "Test wallet balance payment for Dynamic Dedicated package", test_balance_sufficient_dedicated, "4. DYNAMIC DEDICATED TESTS", "balance", True, requires=("balance_login",)),
+    Scenario("4.2_alipay", "4.2 Dynamic Dedicated - Alipay", "Test Alipay payment flow for Dynamic Dedicated package", test_alipay_payment_dedicated, "4. DYNAMIC DEDICATED TESTS", "balance", True, requires=("balance_login",)),
+    Scenario("4.3_wechat", "4.3 Dynamic Dedicated - WeChat", "Test WeChat payment flow for Dynamic Dedicated package", test_wechat_payment_dedicated, "4. DYNAMIC DEDICATED TESTS", "balance", False, requires=("balance_login",)),
+    Scenario("5.1.1_wallet_balance", "5.1.1 Dynamic Supreme - Wallet Balance", "Test wallet balance payment for Dynamic Supreme in Personal Center", test_personal_balance_supreme, "5. PERSONAL CENTER TESTS", "balance", True, requires=("balance_login",)),
+    Scenario("5.1.2_alipay", "5.1.2 Dynamic Supreme - Alipay", "Test Alipay payment flow for Dynamic Supreme in Personal Center", test_personal_alipay_supreme, "5. PERSONAL CENTER TESTS", "balance", True, requires=("balance_login",)),
+    Scenario("5.1.3_wechat", "5.1.3 Dynamic Supreme - WeChat", "Test WeChat payment flow for Dynamic Supreme in Personal Center", test_personal_wechat_supreme, "5. PERSONAL CENTER TESTS", "balance", False, requires=("balance_login",)),
+    Scenario("5.2.1_wallet_balance", "5.2.1 Static IP - Wallet Balance", "Test wallet balance payment for Static IP in Personal Center", test_personal_balance_static, "5. PERSONAL CENTER TESTS", "balance", True, requires=("balance_login",)),
+    Scenario("5.2.2_alipay", "5.2.2 Static IP - Alipay", "Test Alipay payment flow for Static IP in Personal Center", test_personal_alipay_static, "5. PERSONAL CENTER TESTS", "balance", True, requires=("balance_login",)),
+    Scenario("5.2.3_wechat", "5.2.3 Static IP - WeChat", "Test WeChat payment flow for Static IP in Personal Center", test_personal_wechat_static, "5. PERSONAL CENTER TESTS", "balance", False, requires=("balance_login",)),
+    Scenario("5.3.1_wallet_balance", "5.3.1 Dynamic Standard - Wallet Balance", "Test wallet balance payment for Dynamic Standard in Personal Center", test_personal_balance_standard, "5. PERSONAL CENTER TESTS", "balance", True, requires=("balance_login",)),
+    Scenario("5.3.2_alipay", "5.3.2 Dynamic Standard - Alipay", "Test Alipay payment flow for Dynamic Standard in Personal Center", test_personal_alipay_standard, "5. PERSONAL CENTER TESTS", "balance", True, requires=("balance_login",)),
+    Scenario("5.3.3_wechat", "5.3.3 Dynamic Standard - WeChat", "Test WeChat payment flow for Dynamic Standard in Personal Center", test_personal_wechat_standard, "5. PERSONAL CENTER TESTS", "balance", False, requires=("balance_login",)),
+    Scenario("5.4.1_wallet_balance", "5.4.1 Dynamic Dedicated - Wallet Balance", "Test wallet balance payment for Dynamic Dedicated in Personal Center", test_personal_balance_dedicated, "5. PERSONAL CENTER TESTS", "balance", True, requires=("balance_login",)),
+    Scenario("5.4.2_alipay", "5.4.2 Dynamic Dedicated - Alipay", "Test Alipay payment flow for Dynamic Dedicated in Personal Center", test_personal_alipay_dedicated, "5. PERSONAL CENTER TESTS", "balance", True, requires=("balance_login",)),
+    Scenario("5.4.3_wechat", "5.4.3 Dynamic Dedicated - WeChat", "Test WeChat payment flow for Dynamic Dedicated in Personal Center", test_personal_wechat_dedicated, "5. PERSONAL CENTER TESTS", "balance", False, requires=("balance_login",)),
+    Scenario("1.4_wallet_no_balance", "1.4 Dynamic Supreme - Wallet No Balance", "Test wallet payment with no balance for Dynamic Supreme package", test_wallet_no_balance_supreme, "6. WALLET NO BALANCE TESTS", "no_balance", True, requires=("no_balance_login",)),
+    Scenario("2.4_wallet_no_balance", "2.4 Static IP - Wallet No Balance", "Test wallet payment with no balance for Static IP package", test_wallet_no_balance_static, "6. WALLET NO BALANCE TESTS", "no_balance", True, requires=("no_balance_login",)),
+    Scenario("3.4_wallet_no_balance", "3.4 Dynamic Standard - Wallet No Balance", "Test wallet payment with no balance for Dynamic Standard package", test_wallet_no_balance_standard, "6. WALLET NO BALANCE TESTS", "no_balance", True, requires=("no_balance_login",)),
+    Scenario("4.4_wallet_no_balance", "4.4 Dynamic Dedicated - Wallet No Balance", "Test wallet payment with no balance for Dynamic Dedicated package", test_wallet_no_balance_dedicated, "6. WALLET NO BALANCE TESTS", "no_balance", True, requires=("no_balance_login",)),
+    Scenario("5.1.4_wallet_no_balance", "5.1.4 Dynamic Supreme - Wallet No Balance", "Test wallet payment with no balance for Dynamic Supreme in Personal Center", test_personal_wallet_no_balance_supreme, "6. WALLET NO BALANCE TESTS", "no_balance", True, requires=("no_balance_login",)),
+    Scenario("5.2.4_wallet_no_balance", "5.2.4 Static IP - Wallet No Balance", "Test wallet payment with no balance for Static IP in Personal Center", test_personal_wallet_no_balance_static, "6. WALLET NO BALANCE TESTS", "no_balance", True, requires=("no_balance_login",)),
+    Scenario("5.3.4_wallet_no_balance", "5.3.4 Dynamic Standard - Wallet No Balance", "Test wallet payment with no balance for Dynamic Standard in Personal Center", test_personal_wallet_no_balance_standard, "6. WALLET NO BALANCE TESTS", "no_balance", True, requires=("no_balance_login",)),
+    Scenario("5.4.4_wallet_no_balance", "5.4.4 Dynamic Dedicated - Wallet No Balance", "Test wallet payment with no balance for Dynamic Dedicated in Personal Center", test_personal_wallet_no_balance_dedicated, "6. WALLET NO BALANCE TESTS", "no_balance", True, requires=("no_balance_login",)),
+]
+
+# ===== Prerequisites =====
+def check_storefront(test_case):
+    """Check that the storefront loads before any scenario tries to use it"""
+    with track_step(test_case, "Open Storefront", f"Load {SITE_URL}"):
+        driver.get(SITE_URL)
+        wait.until(lambda d: d.execute_script("return document.readyState") == "complete")
+        if not driver.current_url.startswith(SITE_URL):
+            raise Exception(f"Storefront did not load - browser is on {driver.current_url}")
+        print(f"✅ Storefront reachable: {driver.current_url}")
+
+def check_account_login(login_func):
+    """Build a prerequisite check that logs in from a logged-out browser, so an earlier session cannot hide a broken login"""
+    def check(test_case):
+        reset_site_session()
+        login_func(test_case)
+    return check
+
+# Prerequisite that logs in with each account; a rerun adds it to every selected scenario of the account
+LOGIN_PREREQUISITES = {"balance": "balance_login", "no_balance": "no_balance_login"}
+
+def create_prerequisites(api_mode=None):
+    """Create the prerequisites the scenarios declare; each is checked once per network profile.
+    
+    A passed login prerequisite only proves the login works: the runner's BrowserLogin logs the
+    browser in again whenever a scenario needs the other account. With an ApiMode its HTTP
+    logins are added; replayed scenarios require those instead of the browser ones.
+    """
+    prerequisites = [
+        Prerequisite("storefront", "Storefront reachable", check_storefront),
+        Prerequisite("balance_login", "Logged in with balance account", check_account_login(login_with_balance), requires=("storefront",), account="balance"),
+        Prerequisite("no_balance_login", "Logged in with no-balance account", check_account_login(login_without_balance), requires=("storefront",), account="no_balance"),
+    ]
+    prerequisites = {prerequisite.key: prerequisite for prerequisite in prerequisites}
+    if api_mode is not None:
+        prerequisites.update(api_mode.create_prerequisites())
+    return prerequisites
+
+# Recorded login flow of each account; API mode replays it with the leased account's credentials
+LOGIN_FLOWS = {"balance": "login_with_balance", "no_balance": "login_without_balance"}
+
+def create_api_mode():
+    """API mode that replays the recorded flows, logging in as the default accounts outside a lease"""
+    return ApiMode(SITE_URL, flows_dir, LOGIN_FLOWS, {"balance": DEFAULT_ACCOUNTS[0], "no_balance": DEFAULT_ACCOUNTS[1]})
+
 # ===== Main Execution =====
-def main():
-    report_dir = create_report_dir()
-    test_report = TestReport(report_dir)
+def reset_site_session():
+    """Clear cookies and storage for the storefront so the next pass starts logged out"""
+    driver.execute_cdp_cmd("Storage.clearDataForOrigin", {
+        "origin": SITE_URL,
+        "storageTypes": "all"
+    })
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Website payment test suite")
+    parser.add_argument("--network-profile", action="append", choices=sorted(NETWORK_PROFILES),
+                        help="Run the scenario matrix under this throttling profile (repeatable)")
+    parser.add_argument("--api-mode", action="store_true",
+                        help="Replay recorded HTTP flows for API-capable scenarios instead of driving the browser")
+    parser.add_argument("--stub-payments", action="store_true",
+                        help="Answer Alipay/WeChat gateway requests from local stubs instead of the external sandboxes")
+    parser.add_argument("--resume", metavar="RUN_DIR",
+                        help="Resume an interrupted run: skip scenarios that passed in RUN_DIR and merge the report")
+    parser.add_argument("--rerun-failures", metavar="RUN_DIR",
+                        help="Only run the scenarios that failed, timed out or were slow in RUN_DIR and show the delta")
+    parser.add_argument("--step-timeout", type=float, default=DEFAULT_STEP_TIMEOUT,
+                        help="Seconds before a hung step is aborted as TIMED_OUT (0 disables the watchdog)")
+    parser.add_argument("--scenario-timeout", type=float, default=DEFAULT_SCENARIO_TIMEOUT,
+                        help="Seconds before a hung scenario is aborted as TIMED_OUT")
+    parser.add_argument("--only", type=lambda value: value.split(","), metavar="KEYS",
+                        help="Comma-separated scenario keys to run (e.g. 1.2_alipay,2.2_alipay)")
+    parser.add_argument("--run-dir", help="Write the run into this directory instead of a new timestamped one")
+    parser.add_argument("--order", choices=["source", "fail-fast"], default="source",
+                        help="Run scenarios in source order, or most-likely-to-fail first using the run history")
+    parser.add_argument("--changed-since", metavar="GIT_REF",
+                        help="With --order fail-fast, scenarios whose code changed since this ref go earlier "
+                             "(default: the merge-base with main)")
+    parser.add_argument("--max-failures", type=int, metavar="K",
+                        help="Stop after K failures; the remaining scenarios are reported as NOT_RUN")
+    parser.add_argument("--quarantine-threshold", type=float, default=DEFAULT_QUARANTINE_THRESHOLD,
+                        help="Flake score at which a scenario moves to the non-blocking quarantine lane")
+    parser.add_argument("--no-quarantine", action="store_true",
+                        help="Run flaky scenarios in the main lane")
+    parser.add_argument("--skip-preflight", action="store_true",
+                        help="Start the scenarios without probing the environment first")
+    parser.add_argument("--preflight-timeout", type=float, default=DEFAULT_PREFLIGHT_TIMEOUT,
+                        help="Seconds each pre-flight check may take")
+    parser.add_argument("--accounts", default=os.environ.get("TEST_ACCOUNTS_FILE"), metavar="FILE",
+                        help="JSON file of test accounts to lease from instead of the built-in ones")
+    parser.add_argument("--plan", action="store_true",
+                        help="Print the scenarios, order, accounts, logins, navigations and estimated time, then exit without starting Chrome")
+    parser.add_argument("--workers", type=int, default=1, metavar="N",
+                        help="Run the main lane in N browser processes, balanced by the predicted scenario durations")
+    parser.add_argument("--quarantine-lane", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--worker-lane", type=int, metavar="N", help=argparse.SUPPRESS)
+    parser.add_argument("--work-queue", metavar="DIR", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+def get_preflight_targets():
+    """Hosts the website suite depends on; the recorded login flow, if any, gives an API endpoint to probe"""
+    return [HealthTarget("Storefront", LOGIN_URL, api_url=get_flow_api_url(flow_path(flows_dir, LOGIN_FLOWS["balance"])))]
+
+def get_remaining_scenarios(args, scenarios, done, quarantined, rerun_source, profile_key, flake_history, changed_keys):
+    """Scenarios of one network profile the main lane still has to run, in run order"""
+    remaining = [scenario for scenario in scenarios if scenario.key not in done and scenario.key not in quarantined]
+    if rerun_source is not None:
+        remaining = select_rerun(rerun_source, remaining, profile_key, LOGIN_PREREQUISITES)
+        print(f"🎯 Rerunning {len(remaining)} of {len(SCENARIOS)} scenarios from {rerun_source.run_dir}")
+    if args.order == "fail-fast":
+        remaining = order_fail_fast(remaining, flake_history.get_failure_probabilities(), changed_keys)
+    return remaining
+
+def print_run_plan(args, scenarios, network_profiles, flake_histories, quarantined, rerun_source, changed_keys):
+    """Print what the run would do under every network profile without starting a browser"""
+    resumed = RunCheckpoint.load(args.resume, SUITE_NAME) if args.resume else None
+    api_mode = create_api_mode() if args.api_mode else None
+    prerequisites = create_prerequisites(api_mode)
+    navigations = find_navigations(os.path.abspath(__file__))
+    lane_scenarios = [scenario for scenario in scenarios if scenario.key in quarantined]
+    for network_profile in network_profiles:
+        if len(network_profiles) > 1:
+            print(f"\n[{network_profile}]")
+        profile_key = network_profile if args.network_profile else None
+        done = {key for key, passed in resumed.get_results(profile_key).items() if passed} if resumed is not None else set()
+        flake_history = flake_histories[network_profile]
+        remaining = get_remaining_scenarios(args, scenarios, done, quarantined, rerun_source, profile_key, flake_history, changed_keys)
+        predictions = predict_durations(remaining + lane_scenarios, flake_history.get_predicted_durations())
+        if args.workers > 1:
+            assignments = assign_longest_first(remaining, predictions, args.workers)
+        else:
+            assignments = [[scenario.key for scenario in remaining]]
+        logins = {}
+        for scenario in remaining + lane_scenarios:
+            # Replayed scenarios log in over HTTP instead of in the browser
+            replayed = api_mode is not None and api_mode.get_flow(scenario) is not None
+            requires = api_mode.get_prerequisites(scenario) if replayed else scenario.requires
+            logins[scenario.key] = get_prerequisite_chain(requires, prerequisites)
+        print_plan(assignments, remaining, predictions, navigations, logins, flake_history.scenario_durations, lane_scenarios)
+
+def get_lane_args(args):
+    """Options forwarded to quarantine and worker lane processes so they run under the same conditions"""
+    lane_args = []
+    for network_profile in args.network_profile or []:
+        lane_args += ["--network-profile", network_profile]
+    if args.api_mode:
+        lane_args.append("--api-mode")
+    if args.stub_payments:
+        lane_args.append("--stub-payments")
+    if args.accounts:
+        lane_args += ["--accounts", args.accounts]
+    lane_args += ["--step-timeout", str(args.step_timeout), "--scenario-timeout", str(args.scenario_timeout)]
+    return lane_args
+
+def record_login_flows(recorder):
+    """Record the HTTP calls behind both account logins, starting from a logged-out browser"""
+    for tag, login_func, default_account in (("balance", login_with_balance, DEFAULT_ACCOUNTS[0]),
+                                             ("no_balance", login_without_balance, DEFAULT_ACCOUNTS[1])):
+        flow_name = LOGIN_FLOWS[tag]
+        account = get_leased_account(tag) or default_account
+        reset_site_session()
+        recorder.start()
+        login_func(create_test_case(f"Record {flow_name}", "Record the HTTP calls behind the login flow"))
+        # Saved with placeholders so API mode can log in with whichever account it leases
+        recorder.save(flow_name, placeholders={account.account_id: "{account}", account.password: "{password}"})
+    reset_site_session()
+
+def print_final_results(test_results, quarantined=(), blocked=()):
+    """Print the pass/fail result of every scenario grouped by package"""
+    print("\n1. DYNAMIC SUPREME:")
+    print(f"   1.1 Wallet Balance Payment: {format_result(test_results, '1.1_wallet_balance', quarantined, blocked)}")
+    print(f"   1.2 Alipay Payment: {format_result(test_results, '1.2_alipay', quarantined, blocked)}")
+    print(f"   1.3 WeChat Payment: {format_result(test_results, '1.3_wechat', quarantined, blocked)}")
+    print(f"   1.4 Wallet No Balance: {format_result(test_results, '1.4_wallet_no_balance', quarantined, blocked)}")
+    
+    print("\n2. STATIC IP:")
+    print(f"   2.1 Wallet Balance Payment: {format_result(test_results, '2.1_wallet_balance', quarantined, blocked)}")
+    print(f"   2.2 Alipay Payment: {format_result(test_results, '2.2_alipay', quarantined, blocked)}")
+    print(f"   2.3 WeChat Payment: {format_result(test_results, '2.3_wechat', quarantined, blocked)}")
+    print(f"   2.4 Wallet No Balance: {format_result(test_results, '2.4_wallet_no_balance', quarantined, blocked)}")
+    
+    print("\n3. DYNAMIC STANDARD:")
+    print(f"   3.1 Wallet Balance Payment: {format_result(test_results, '3.1_wallet_balance', quarantined, blocked)}")
+    print(f"   3.2 Alipay Payment: {format_result(test_results, '3.2_alipay', quarantined, blocked)}")
+    print(f"   3.3 WeChat Payment: {format_result(test_results, '3.3_wechat', quarantined, blocked)}")
+    print(f"   3.4 Wallet No Balance: {format_result(test_results, '3.4_wallet_no_balance', quarantined, blocked)}")
+    
+    print("\n4. DYNAMIC DEDICATED:")
+    print(f"   4.1 Wallet Balance Payment: {format_result(test_results, '4.1_wallet_balance', quarantined, blocked)}")
+    print(f"   4.2 Alipay Payment: {format_result(test_results, '4.2_alipay', quarantined, blocked)}")
+    print(f"   4.3 WeChat Payment: {format_result(test_results, '4.3_wechat', quarantined, blocked)}")
+    print(f"   4.4 Wallet No Balance: {format_result(test_results, '4.4_wallet_no_balance', quarantined, blocked)}")
+
+    print("\n5. PERSONAL CENTER:")
+    print("   5.1 Dynamic Supreme:")
+    print(f"      5.1.1 Wallet Balance Payment: {format_result(test_results, '5.1.1_wallet_balance', quarantined, blocked)}")
+    print(f"      5.1.2 Alipay Payment: {format_result(test_results, '5.1.2_alipay', quarantined, blocked)}")
+    print(f"      5.1.3 WeChat Payment: {format_result(test_results, '5.1.3_wechat', quarantined, blocked)}")
+    print(f"      5.1.4 Wallet No Balance: {format_result(test_results, '5.1.4_wallet_no_balance', quarantined, blocked)}")
+    
+    print("   5.2 Static IP:")
+    print(f"      5.2.1 Wallet Balance Payment: {format_result(test_results, '5.2.1_wallet_balance', quarantined, blocked)}")
+    print(f"      5.2.2 Alipay Payment: {format_result(test_results, '5.2.2_alipay', quarantined, blocked)}")
+    print(f"      5.2.3 WeChat Payment: {format_result(test_results, '5.2.3_wechat', quarantined, blocked)}")
+    print(f"      5.2.4 Wallet No Balance: {format_result(test_results, '5.2.4_wallet_no_balance', quarantined, blocked)}")
+    
+    print("   5.3 Dynamic Standard:")
+    print(f"      5.3.1 Wallet Balance Payment: {format_result(test_results, '5.3.1_wallet_balance', quarantined, blocked)}")
+    print(f"      5.3.2 Alipay Payment: {format_result(test_results, '5.3.2_alipay', quarantined, blocked)}")
+    print(f"      5.3.3 WeChat Payment: {format_result(test_results, '5.3.3_wechat', quarantined, blocked)}")
+    print(f"      5.3.4 Wallet No Balance: {format_result(test_results, '5.3.4_wallet_no_balance', quarantined, blocked)}")
+    
+    print("   5.4 Dynamic Dedicated:")
+    print(f"      5.4.1 Wallet Balance Payment: {format_result(test_results, '5.4.1_wallet_balance', quarantined, blocked)}")
+    print(f"      5.4.2 Alipay Payment: {format_result(test_results, '5.4.2_alipay', quarantined, blocked)}")
+    print(f"      5.4.3 WeChat Payment: {format_result(test_results, '5.4.3_wechat', quarantined, blocked)}")
+    print(f"      5.4.4 Wallet No Balance: {format_result(test_results, '5.4.4_wallet_no_balance', quarantined, blocked)}")
+
+def main(argv=None):
+    global payment_stubs, entity_manifest, id_generator
+    args = parse_args(argv)
+    network_profiles = args.network_profile or [DEFAULT_NETWORK_PROFILE]
+    # Lane processes are started by a main run, which handles pre-flight, quarantine and scheduling
+    lane_process = args.quarantine_lane or args.worker_lane is not None
+    
+    rerun_source = RunCheckpoint.load(args.rerun_failures, SUITE_NAME) if args.rerun_failures else None
+    scenarios = [scenario for scenario in SCENARIOS if not args.only or scenario.key in args.only]
+    
+    # Flake scores from earlier runs; flaky scenarios move to a parallel, non-blocking lane.
+    # The history is read before the run directory exists, so --plan leaves no trace
+    run_location = args.resume or args.run_dir
+    history_runs = load_history(os.path.dirname(os.path.abspath(run_location)) if run_location else reports_root, SUITE_NAME)
+    flake_histories = {network_profile: FlakeHistory(history_runs, network_profile if args.network_profile else None)
+                       for network_profile in network_profiles}
+    changed_keys = set()
+    if args.order == "fail-fast":
+        changed_keys = get_changed_scenarios(SCENARIOS, os.path.abspath(__file__), args.changed_since)
+    quarantined = set()
+    if not (args.no_quarantine or lane_process):
+        for flake_history in flake_histories.values():
+            quarantined |= flake_history.get_quarantined(args.quarantine_threshold)
+        quarantined &= {scenario.key for scenario in scenarios}
+    
+    if args.plan:
+        print_run_plan(args, scenarios, network_profiles, flake_histories, quarantined, rerun_source, changed_keys)
+        return
+    
+    if args.resume:
+        report_dir = args.resume
+        checkpoint = RunCheckpoint.load(report_dir, SUITE_NAME)
+        print(f"🔁 Resuming run from checkpoint: {checkpoint.path}")
+    else:
+        if args.run_dir:
+            report_dir = args.run_dir
+            os.makedirs(report_dir, exist_ok=True)
+        else:
+            report_dir = create_report_dir()
+        checkpoint = RunCheckpoint(report_dir, SUITE_NAME, rerun_of=args.rerun_failures)
+    test_report = TestReport(report_dir, step_budgets=STEP_BUDGETS)
     test_report.start()
-
-    test_results = {
-        "1.1_wallet_balance": False,
-        "1.2_alipay": False,
-        "1.3_wechat": False,
-        "1.4_wallet_no_balance": False,
-        "2.1_wallet_balance": False,
-        "2.2_alipay": False,
-        "2.3_wechat": False,
-        "2.4_wallet_no_balance": False,
-        "3.1_wallet_balance": False,
-        "3.2_alipay": False,
-        "3.3_wechat": False,
-        "3.4_wallet_no_balance": False,
-        "4.1_wallet_balance": False,
-        "4.2_alipay": False,
-        "4.3_wechat": False,
-        "4.4_wallet_no_balance": False,
-        "5.1.1_wallet_balance": False,
-        "5.1.2_alipay": False,
-        "5.1.3_wechat": False,
-        "5.1.4_wallet_no_balance": False,
-        "5.2.1_wallet_balance": False,
-        "5.2.2_alipay": False,
-        "5.2.3_wechat": False,
-        "5.2.4_wallet_no_balance": False,
-        "5.3.1_wallet_balance": False,
-        "5.3.2_alipay": False,
-        "5.3.3_wechat": False,
-        "5.3.4_wallet_no_balance": False,
-        "5.4.1_wallet_balance": False,
-        "5.4.2_alipay": False,
-        "5.4.3_wechat": False,
-        "5.4.4_wallet_no_balance": False
-    }
+    # Every finished test case is streamed to trace-<pid>.json for trace viewers
+    trace_writer = ChromeTraceWriter(report_dir, SUITE_NAME)
+    set_trace_exporter(trace_writer)
+    
+    quarantine_lane = None
+    worker_lanes = []
+    account_pool = AccountPool(load_accounts(args.accounts) if args.accounts else DEFAULT_ACCOUNTS, account_lock_dir)
+    if args.workers > 1:
+        for tag in sorted({scenario.account for scenario in scenarios if scenario.account}):
+            count = sum(1 for account in account_pool.accounts if tag in account.tags)
+            if count < args.workers:
+                print(f"⚠️ Only {count} '{tag}' accounts for {args.workers} workers - workers will wait for each other's leases")
+    entity_manifest = EntityManifest(report_dir)
+    id_generator = IdentifierGenerator(report_dir, reports_root)
+    # Scenarios after 1.1 do not log in themselves; the runner switches the browser to each scenario's account
+    browser_login = BrowserLogin({"balance": login_with_balance, "no_balance": login_without_balance}, reset_site_session)
+
+    results_by_profile = {}
+    blocked_by_profile = {}
+    recorder = None
+    api_mode = None
+    current_profile = None
+
+    artifact_writer = ArtifactWriter()
+    # Captures bind to the browser, so they start after the pre-flight: a down environment never launches Chrome
+    screencast = None
+    snapshots = None
+
+    def recycle_driver():
+        """Replace the aborted browser with a fresh session and restart everything bound to it"""
+        global payment_stubs
+        nonlocal screencast, snapshots
+        for capture in (screencast, snapshots):
+            if capture is not None:
+                remove_failure_hook(capture.failure_hook)
+                capture.stop()
+        if payment_stubs is not None:
+            payment_stubs.stop()
+        discard_driver(browser.current)
+        browser.reset()
+        
+        screencast = start_failure_screencast(driver, report_dir, artifact_writer)
+        snapshots = start_failure_snapshots(driver, report_dir, artifact_writer)
+        if args.stub_payments:
+            payment_stubs = PaymentGatewayStubs(driver, PAYMENT_GATEWAY_STUBS).start()
+        # The fresh browser is logged out, so the next scenario logs in again
+        browser_login.forget()
+        if args.network_profile:
+            apply_network_profile(driver, current_profile)
+
+    watchdog = None
+    if args.step_timeout:
+        watchdog = Watchdog(lambda force: abort_browser(browser.current, force),
+                            step_timeout=args.step_timeout, scenario_timeout=args.scenario_timeout,
+                            step_timeouts=STEP_TIMEOUTS,
+                            before_abort=lambda timeout: snapshots.wait_idle(timeout) if snapshots else None).start()
+        set_watchdog(watchdog)
 
     try:
-        # 1. Dynamic Supreme Tests
-        print("\n" + "="*60)
-        print("1. DYNAMIC SUPREME TESTS")
-        print("="*60)
-        
-        # 1.1 Wallet Balance Payment
-        print("\n--- 1.1 Wallet Balance Payment ---")
-        test_case1 = create_test_case("1.1 Dynamic Supreme - Wallet Balance", "Test wallet balance payment for Dynamic Supreme package")
-        test_results["1.1_wallet_balance"] = test_balance_sufficient(report_dir, test_case1)
-        test_report.add_test_case(test_case1)
-
-        # 1.2 Alipay Payment
-        print("\n--- 1.2 Alipay Payment ---")
-        test_case2 = create_test_case("1.2 Dynamic Supreme - Alipay", "Test Alipay payment flow for Dynamic Supreme package")
-        test_results["1.2_alipay"] = test_alipay_payment(report_dir, test_case2)
-        test_report.add_test_case(test_case2)
-
-        # 1.3 WeChat Payment
-        print("\n--- 1.3 WeChat Payment ---")
-        test_case3 = create_test_case("1.3 Dynamic Supreme - WeChat", "Test WeChat payment flow for Dynamic Supreme package")
-        test_results["1.3_wechat"] = test_wechat_payment(report_dir, test_case3)
-        test_report.add_test_case(test_case3)
-
-        # 2. Static IP Tests
-        print("\n" + "="*60)
-        print("2. STATIC IP TESTS")
-        print("="*60)
-        
-        # 2.1 Wallet Balance Payment
-        print("\n--- 2.1 Wallet Balance Payment ---")
-        test_case4 = create_test_case("2.1 Static IP - Wallet Balance", "Test wallet balance payment for Static IP package")
-        test_results["2.1_wallet_balance"] = test_balance_sufficient_static(report_dir, test_case4)
-        test_report.add_test_case(test_case4)
-
-        # 2.2 Alipay Payment
-        print("\n--- 2.2 Alipay Payment ---")
-        test_case5 = create_test_case("2.2 Static IP - Alipay", "Test Alipay payment flow for Static IP package")
-        test_results["2.2_alipay"] = test_alipay_payment_static(report_dir, test_case5)
-        test_report.add_test_case(test_case5)
-
-        # 2.3 WeChat Payment
-        print("\n--- 2.3 WeChat Payment ---")
-        test_case6 = create_test_case("2.3 Static IP - WeChat", "Test WeChat payment flow for Static IP package")
-        test_results["2.3_wechat"] = test_wechat_payment_static(report_dir, test_case6)
-        test_report.add_test_case(test_case6)
-
-        # 3. Dynamic Standard Tests
-        print("\n" + "="*60)
-        print("3. DYNAMIC STANDARD TESTS")
-        print("="*60)
-        
-        # 3.1 Wallet Balance Payment
-        print("\n--- 3.1 Wallet Balance Payment ---")
-        test_case7 = create_test_case("3.1 Dynamic Standard - Wallet Balance", "Test wallet balance payment for Dynamic Standard package")
-        test_results["3.1_wallet_balance"] = test_balance_sufficient_standard(report_dir, test_case7)
-        test_report.add_test_case(test_case7)
-
-        # 3.2 Alipay Payment
-        print("\n--- 3.2 Alipay Payment ---")
-        test_case8 = create_test_case("3.2 Dynamic Standard - Alipay", "Test Alipay payment flow for Dynamic Standard package")
-        test_results["3.2_alipay"] = test_alipay_payment_standard(report_dir, test_case8)
-        test_report.add_test_case(test_case8)
-
-        # 3.3 WeChat Payment
-        print("\n--- 3.3 WeChat Payment ---")
-        test_case9 = create_test_case("3.3 Dynamic Standard - WeChat", "Test WeChat payment flow for Dynamic Standard package")
-        test_results["3.3_wechat"] = test_wechat_payment_standard(report_dir, test_case9)
-        test_report.add_test_case(test_case9)
-
-        # 4. Dynamic Dedicated Tests
-        print("\n" + "="*60)
-        print("4. DYNAMIC DEDICATED TESTS")
-        print("="*60)
-        
-        # 4.1 Wallet Balance Payment
-        print("\n--- 4.1 Wallet Balance Payment ---")
-        test_case10 = create_test_case("4.1 Dynamic Dedicated - Wallet Balance", "Test wallet balance payment for Dynamic Dedicated package")
-        test_results["4.1_wallet_balance"] = test_balance_sufficient_dedicated(report_dir, test_case10)
-        test_report.add_test_case(test_case10)
-
-        # 4.2 Alipay Payment
-        print("\n--- 4.2 Alipay Payment ---")
-        test_case11 = create_test_case("4.2 Dynamic Dedicated - Alipay", "Test Alipay payment flow for Dynamic Dedicated package")
-        test_results["4.2_alipay"] = test_alipay_payment_dedicated(report_dir, test_case11)
-        test_report.add_test_case(test_case11)
-
-        # 4.3 WeChat Payment
-        print("\n--- 4.3 WeChat Payment ---")
-        test_case12 = create_test_case("4.3 Dynamic Dedicated - WeChat", "Test WeChat payment flow for Dynamic Dedicated package")
-        test_results["4.3_wechat"] = test_wechat_payment_dedicated(report_dir, test_case12)
-        test_report.add_test_case(test_case12)
-
-        # 5. Personal Center Tests
-        print("\n" + "="*60)
-        print("5. PERSONAL CENTER TESTS")
-        print("="*60)
-        
-        # 5.1 Dynamic Supreme Tests
-        print("\n--- 5.1 Dynamic Supreme ---")
+        if not (args.skip_preflight or lane_process):
+            preflight_results = run_preflight(get_preflight_targets(), args.preflight_timeout, report_dir)
+            test_report.add_test_case(create_preflight_test_case(preflight_results))
+            unhealthy = get_unhealthy(preflight_results)
+            if unhealthy:
+                print("\n❌ ENVIRONMENT UNHEALTHY - STOPPING ALL TESTS")
+                print(f"Failed pre-flight: {', '.join(health.target.name for health in unhealthy)}")
+                return
         
-        # 5.1.1 Wallet Balance Payment
-        print("\n--- 5.1.1 Wallet Balance Payment ---")
-        test_case13 = create_test_case("5.1.1 Dynamic Supreme - Wallet Balance", "Test wallet balance payment for Dynamic Supreme in Personal Center")
-        test_results["5.1.1_wallet_balance"] = test_personal_balance_supreme(report_dir, test_case13)
-        test_report.add_test_case(test_case13)
-
-        # 5.1.2 Alipay Payment
-        print("\n--- 5.1.2 Alipay Payment ---")
-        test_case14 = create_test_case("5.1.2 Dynamic Supreme - Alipay", "Test Alipay payment flow for Dynamic Supreme in Personal Center")
-        test_results["5.1.2_alipay"] = test_personal_alipay_supreme(report_dir, test_case14)
-        test_report.add_test_case(test_case14)
-
-        # 5.1.3 WeChat Payment
-        print("\n--- 5.1.3 WeChat Payment ---")
-        test_case15 = create_test_case("5.1.3 Dynamic Supreme - WeChat", "Test WeChat payment flow for Dynamic Supreme in Personal Center")
-        test_results["5.1.3_wechat"] = test_personal_wechat_supreme(report_dir, test_case15)
-        test_report.add_test_case(test_case15)
-
-        # 5.2 Static IP Tests
-        print("\n--- 5.2 Static IP ---")
+        screencast = start_failure_screencast(driver, report_dir, artifact_writer)
+        snapshots = start_failure_snapshots(driver, report_dir, artifact_writer)
+        if args.stub_payments:
+            payment_stubs = PaymentGatewayStubs(driver, PAYMENT_GATEWAY_STUBS).start()
         
-        # 5.2.1 Wallet Balance Payment
-        print("\n--- 5.2.1 Wallet Balance Payment ---")
-        test_case16 = create_test_case("5.2.1 Static IP - Wallet Balance", "Test wallet balance payment for Static IP in Personal Center")
-        test_results["5.2.1_wallet_balance"] = test_personal_balance_static(report_dir, test_case16)
-        test_report.add_test_case(test_case16)
-
-        # 5.2.2 Alipay Payment
-        print("\n--- 5.2.2 Alipay Payment ---")
-        test_case17 = create_test_case("5.2.2 Static IP - Alipay", "Test Alipay payment flow for Static IP in Personal Center")
-        test_results["5.2.2_alipay"] = test_personal_alipay_static(report_dir, test_case17)
-        test_report.add_test_case(test_case17)
-
-        # 5.2.3 WeChat Payment
-        print("\n--- 5.2.3 WeChat Payment ---")
-        test_case18 = create_test_case("5.2.3 Static IP - WeChat", "Test WeChat payment flow for Static IP in Personal Center")
-        test_results["5.2.3_wechat"] = test_personal_wechat_static(report_dir, test_case18)
-        test_report.add_test_case(test_case18)
-
-        # 5.3 Dynamic Standard Tests
-        print("\n--- 5.3 Dynamic Standard ---")
+        if RECORD_HTTP_FLOWS:
+            recorder = FlowRecorder(driver, SITE_URL, flows_dir, artifact_writer)
+            record_login_flows(recorder)
+        elif args.api_mode:
+            api_mode = create_api_mode()
         
-        # 5.3.1 Wallet Balance Payment
-        print("\n--- 5.3.1 Wallet Balance Payment ---")
-        test_case19 = create_test_case("5.3.1 Dynamic Standard - Wallet Balance", "Test wallet balance payment for Dynamic Standard in Personal Center")
-        test_results["5.3.1_wallet_balance"] = test_personal_balance_standard(report_dir, test_case19)
-        test_report.add_test_case(test_case19)
-
-        # 5.3.2 Alipay Payment
-        print("\n--- 5.3.2 Alipay Payment ---")
-        test_case20 = create_test_case("5.3.2 Dynamic Standard - Alipay", "Test Alipay payment flow for Dynamic Standard in Personal Center")
-        test_results["5.3.2_alipay"] = test_personal_alipay_standard(report_dir, test_case20)
-        test_report.add_test_case(test_case20)
-
-        # 5.3.3 WeChat Payment
-        print("\n--- 5.3.3 WeChat Payment ---")
-        test_case21 = create_test_case("5.3.3 Dynamic Standard - WeChat", "Test WeChat payment flow for Dynamic Standard in Personal Center")
-        test_results["5.3.3_wechat"] = test_personal_wechat_standard(report_dir, test_case21)
-        test_report.add_test_case(test_case21)
-
-        # 5.4 Dynamic Dedicated Tests
-        print("\n--- 5.4 Dynamic Dedicated ---")
+        if quarantined:
+            quarantine_lane = QuarantineLane(os.path.abspath(__file__), SUITE_NAME, quarantined,
+                                             report_dir, get_lane_args(args)).start()
+        if args.workers > 1 and not lane_process:
+            # A resumed run must not hand out the queues left by its previous attempt
+            for network_profile in network_profiles:
+                queue_path = get_queue_path(report_dir, network_profile if args.network_profile else None)
+                if os.path.exists(queue_path):
+                    os.remove(queue_path)
+            worker_lanes = [WorkerLane(os.path.abspath(__file__), SUITE_NAME, worker, report_dir, report_dir,
+                                       get_lane_args(args)).start() for worker in range(1, args.workers)]
         
-        # 5.4.1 Wallet Balance Payment
-        print("\n--- 5.4.1 Wallet Balance Payment ---")
-        test_case22 = create_test_case("5.4.1 Dynamic Dedicated - Wallet Balance", "Test wallet balance payment for Dynamic Dedicated in Personal Center")
-        test_results["5.4.1_wallet_balance"] = test_personal_balance_dedicated(report_dir, test_case22)
-        test_report.add_test_case(test_case22)
-
-        # 5.4.2 Alipay Payment
-        print("\n--- 5.4.2 Alipay Payment ---")
-        test_case23 = create_test_case("5.4.2 Dynamic Dedicated - Alipay", "Test Alipay payment flow for Dynamic Dedicated in Personal Center")
-        test_results["5.4.2_alipay"] = test_personal_alipay_dedicated(report_dir, test_case23)
-        test_report.add_test_case(test_case23)
-
-        # 5.4.3 WeChat Payment
-        print("\n--- 5.4.3 WeChat Payment ---")
-        test_case24 = create_test_case("5.4.3 Dynamic Dedicated - WeChat", "Test WeChat payment flow for Dynamic Dedicated in Personal Center")
-        test_results["5.4.3_wechat"] = test_personal_wechat_dedicated(report_dir, test_case24)
-        test_report.add_test_case(test_case24)
-
-        # 1.4 Wallet No Balance
-        print("\n--- 1.4 Wallet No Balance ---")
-        test_case1_4 = create_test_case("1.4 Dynamic Supreme - Wallet No Balance", "Test wallet payment with no balance for Dynamic Supreme package")
-        test_results["1.4_wallet_no_balance"] = test_wallet_no_balance_supreme(report_dir, test_case1_4)
-        test_report.add_test_case(test_case1_4)
-
-        # 2.4 Wallet No Balance
-        print("\n--- 2.4 Wallet No Balance ---")
-        test_case2_4 = create_test_case("2.4 Static IP - Wallet No Balance", "Test wallet payment with no balance for Static IP package")
-        test_results["2.4_wallet_no_balance"] = test_wallet_no_balance_static(report_dir, test_case2_4)
-        test_report.add_test_case(test_case2_4)
-
-        # 3.4 Wallet No Balance
-        print("\n--- 3.4 Wallet No Balance ---")
-        test_case3_4 = create_test_case("3.4 Dynamic Standard - Wallet No Balance", "Test wallet payment with no balance for Dynamic Standard package")
-        test_results["3.4_wallet_no_balance"] = test_wallet_no_balance_standard(report_dir, test_case3_4)
-        test_report.add_test_case(test_case3_4)
-
-        # 4.4 Wallet No Balance
-        print("\n--- 4.4 Wallet No Balance ---")
-        test_case4_4 = create_test_case("4.4 Dynamic Dedicated - Wallet No Balance", "Test wallet payment with no balance for Dynamic Dedicated package")
-        test_results["4.4_wallet_no_balance"] = test_wallet_no_balance_dedicated(report_dir, test_case4_4)
-        test_report.add_test_case(test_case4_4)
-
-        # 5.1.4 Wallet No Balance
-        print("\n--- 5.1.4 Wallet No Balance ---")
-        test_case5_1_4 = create_test_case("5.1.4 Dynamic Supreme - Wallet No Balance", "Test wallet payment with no balance for Dynamic Supreme in Personal Center")
-        test_results["5.1.4_wallet_no_balance"] = test_personal_wallet_no_balance_supreme(report_dir, test_case5_1_4)
-        test_report.add_test_case(test_case5_1_4)
-
-        # 5.2.4 Wallet No Balance
-        print("\n--- 5.2.4 Wallet No Balance ---")
-        test_case5_2_4 = create_test_case("5.2.4 Static IP - Wallet No Balance", "Test wallet payment with no balance for Static IP in Personal Center")
-        test_results["5.2.4_wallet_no_balance"] = test_personal_wallet_no_balance_static(report_dir, test_case5_2_4)
-        test_report.add_test_case(test_case5_2_4)
-
-        # 5.3.4 Wallet No Balance
-        print("\n--- 5.3.4 Wallet No Balance ---")
-        test_case5_3_4 = create_test_case("5.3.4 Dynamic Standard - Wallet No Balance", "Test wallet payment with no balance for Dynamic Standard in Personal Center")
-        test_results["5.3.4_wallet_no_balance"] = test_personal_wallet_no_balance_standard(report_dir, test_case5_3_4)
-        test_report.add_test_case(test_case5_3_4)
-
-        # 5.4.4 Wallet No Balance
-        print("\n--- 5.4.4 Wallet No Balance ---")
-        test_case5_4_4 = create_test_case("5.4.4 Dynamic Dedicated - Wallet No Balance", "Test wallet payment with no balance for Dynamic Dedicated in Personal Center")
-        test_results["5.4.4_wallet_no_balance"] = test_personal_wallet_no_balance_dedicated(report_dir, test_case5_4_4)
-        test_report.add_test_case(test_case5_4_4)
+        for network_profile in network_profiles:
+            current_profile = network_profile
+            if len(network_profiles) > 1:
+                print("\n" + "#"*60)
+                print(f"NETWORK PROFILE: {network_profile}")
+                print("#"*60)
+            if results_by_profile:
+                reset_site_session()
+                browser_login.forget()
+            if args.network_profile:
+                apply_network_profile(driver, network_profile)
+            
+            profile_key = network_profile if args.network_profile else None
+            profile_results = results_by_profile.setdefault(network_profile, {})
+            profile_blocked = blocked_by_profile.setdefault(network_profile, {})
+            profile_results.update(checkpoint.restore_passed(test_report, profile_key))
+            flake_history = flake_histories[network_profile]
+            remaining = get_remaining_scenarios(args, scenarios, profile_results, quarantined, rerun_source,
+                                                profile_key, flake_history, changed_keys)
+            if args.worker_lane is not None:
+                # The main run writes this profile's queue once it reaches the profile itself
+                queue = WorkQueue.wait_for(get_queue_path(args.work_queue, profile_key),
+                                           timeout=len(SCENARIOS) * args.scenario_timeout)
+                remaining = queue.iter_scenarios(args.worker_lane, remaining)
+            elif not args.quarantine_lane:
+                predictions = predict_durations(remaining, flake_history.get_predicted_durations())
+                if args.workers > 1:
+                    assignments = assign_longest_first(remaining, predictions, args.workers)
+                    print_prediction(assignments, predictions, flake_history.scenario_durations)
+                    accounts = {scenario.key: scenario.account for scenario in remaining}
+                    remaining = WorkQueue.create(get_queue_path(report_dir, profile_key), assignments,
+                                                 predictions, accounts).iter_scenarios(0, remaining)
+                else:
+                    print_prediction([[scenario.key for scenario in remaining]], predictions, flake_history.scenario_durations)
+            run_scenarios(remaining, test_report, report_dir,
+                          network_profile=profile_key,
+                          test_results=profile_results, recorder=recorder, api_mode=api_mode,
+                          watchdog=watchdog, recycle_driver=recycle_driver,
+                          checkpoint=checkpoint, flake_scores=flake_history.get_scenario_scores(),
+                          step_flake_scores=flake_history.get_step_scores(), max_failures=args.max_failures, quarantined=args.quarantine_lane,
+                          prerequisites=create_prerequisites(api_mode), blocked=profile_blocked, account_pool=account_pool,
+                          browser_login=browser_login)
 
     finally:
         test_report.complete()
-        driver.quit()
+        set_trace_exporter(None)
+        trace_writer.close()
+        if watchdog is not None:
+            watchdog.stop()
+            set_watchdog(None)
+        if api_mode is not None:
+            api_mode.close()
+        if payment_stubs is not None:
+            payment_stubs.stop()
+        if screencast is not None:
+            screencast.stop()
+        if snapshots is not None:
+            snapshots.stop()
+        artifact_writer.close()
+        browser.quit()
+        
+        # The quarantine lane never blocks the verdict; its test cases are merged into the report
+        lane_checkpoint = None
+        if quarantine_lane is not None:
+            lane_checkpoint = quarantine_lane.wait(timeout=len(quarantined) * len(network_profiles) * args.scenario_timeout + 120)
+            if lane_checkpoint is not None:
+                for network_profile in network_profiles:
+                    for test_case in lane_checkpoint.get_test_cases(network_profile if args.network_profile else None):
+                        test_report.add_test_case(test_case)
+        
+        # Worker results count towards the verdict like the scenarios this process ran itself;
+        # workers still waiting for a profile this process never reached get an empty queue
+        for network_profile in network_profiles if worker_lanes else []:
+            queue_path = get_queue_path(report_dir, network_profile if args.network_profile else None)
+            if not os.path.exists(queue_path):
+                WorkQueue.create(queue_path, [], {})
+        for worker_lane in worker_lanes:
+            worker_checkpoint = worker_lane.wait(timeout=len(scenarios) * len(network_profiles) * args.scenario_timeout + 120)
+            if worker_checkpoint is None:
+                continue
+            for network_profile in network_profiles:
+                profile_key = network_profile if args.network_profile else None
+                for test_case in worker_checkpoint.get_test_cases(profile_key):
+                    test_report.add_test_case(test_case)
+                results_by_profile.setdefault(network_profile, {}).update(worker_checkpoint.get_results(profile_key))
+                blocked_by_profile.setdefault(network_profile, {})
         
         # Print final results in organized format
         print("\n" + "="*60)
         print("FINAL TEST RESULTS")
         print("="*60)
         
-        print("\n1. DYNAMIC SUPREME:")
-        print(f"   1.1 Wallet Balance Payment: {'✅ PASSED' if test_results['1.1_wallet_balance'] else '❌ FAILED'}")
-        print(f"   1.2 Alipay Payment: {'✅ PASSED' if test_results['1.2_alipay'] else '❌ FAILED'}")
-        print(f"   1.3 WeChat Payment: {'✅ PASSED' if test_results['1.3_wechat'] else '❌ FAILED'}")
-        print(f"   1.4 Wallet No Balance: {'✅ PASSED' if test_results['1.4_wallet_no_balance'] else '❌ FAILED'}")
-        
-        print("\n2. STATIC IP:")
-        print(f"   2.1 Wallet Balance Payment: {'✅ PASSED' if test_results['2.1_wallet_balance'] else '❌ FAILED'}")
-        print(f"   2.2 Alipay Payment: {'✅ PASSED' if test_results['2.2_alipay'] else '❌ FAILED'}")
-        print(f"   2.3 WeChat Payment: {'✅ PASSED' if test_results['2.3_wechat'] else '❌ FAILED'}")
-        print(f"   2.4 Wallet No Balance: {'✅ PASSED' if test_results['2.4_wallet_no_balance'] else '❌ FAILED'}")
-        
-        print("\n3. DYNAMIC STANDARD:")
-        print(f"   3.1 Wallet Balance Payment: {'✅ PASSED' if test_results['3.1_wallet_balance'] else '❌ FAILED'}")
-        print(f"   3.2 Alipay Payment: {'✅ PASSED' if test_results['3.2_alipay'] else '❌ FAILED'}")
-        print(f"   3.3 WeChat Payment: {'✅ PASSED' if test_results['3.3_wechat'] else '❌ FAILED'}")
-        print(f"   3.4 Wallet No Balance: {'✅ PASSED' if test_results['3.4_wallet_no_balance'] else '❌ FAILED'}")
-        
-        print("\n4. DYNAMIC DEDICATED:")
-        print(f"   4.1 Wallet Balance Payment: {'✅ PASSED' if test_results['4.1_wallet_balance'] else '❌ FAILED'}")
-        print(f"   4.2 Alipay Payment: {'✅ PASSED' if test_results['4.2_alipay'] else '❌ FAILED'}")
-        print(f"   4.3 WeChat Payment: {'✅ PASSED' if test_results['4.3_wechat'] else '❌ FAILED'}")
-        print(f"   4.4 Wallet No Balance: {'✅ PASSED' if test_results['4.4_wallet_no_balance'] else '❌ FAILED'}")
-
-        print("\n5. PERSONAL CENTER:")
-        print("   5.1 Dynamic Supreme:")
-        print(f"      5.1.1 Wallet Balance Payment: {'✅ PASSED' if test_results['5.1.1_wallet_balance'] else '❌ FAILED'}")
-        print(f"      5.1.2 Alipay Payment: {'✅ PASSED' if test_results['5.1.2_alipay'] else '❌ FAILED'}")
-        print(f"      5.1.3 WeChat Payment: {'✅ PASSED' if test_results['5.1.3_wechat'] else '❌ FAILED'}")
-        print(f"      5.1.4 Wallet No Balance: {'✅ PASSED' if test_results['5.1.4_wallet_no_balance'] else '❌ FAILED'}")
-        
-        print("   5.2 Static IP:")
-        print(f"      5.2.1 Wallet Balance Payment: {'✅ PASSED' if test_results['5.2.1_wallet_balance'] else '❌ FAILED'}")
-        print(f"      5.2.2 Alipay Payment: {'✅ PASSED' if test_results['5.2.2_alipay'] else '❌ FAILED'}")
-        print(f"      5.2.3 WeChat Payment: {'✅ PASSED' if test_results['5.2.3_wechat'] else '❌ FAILED'}")
-        print(f"      5.2.4 Wallet No Balance: {'✅ PASSED' if test_results['5.2.4_wallet_no_balance'] else '❌ FAILED'}")
-        
-        print("   5.3 Dynamic Standard:")
-        print(f"      5.3.1 Wallet Balance Payment: {'✅ PASSED' if test_results['5.3.1_wallet_balance'] else '❌ FAILED'}")
-        print(f"      5.3.2 Alipay Payment: {'✅ PASSED' if test_results['5.3.2_alipay'] else '❌ FAILED'}")
-        print(f"      5.3.3 WeChat Payment: {'✅ PASSED' if test_results['5.3.3_wechat'] else '❌ FAILED'}")
-        print(f"      5.3.4 Wallet No Balance: {'✅ PASSED' if test_results['5.3.4_wallet_no_balance'] else '❌ FAILED'}")
-        
-        print("   5.4 Dynamic Dedicated:")
-        print(f"      5.4.1 Wallet Balance Payment: {'✅ PASSED' if test_results['5.4.1_wallet_balance'] else '❌ FAILED'}")
-        print(f"      5.4.2 Alipay Payment: {'✅ PASSED' if test_results['5.4.2_alipay'] else '❌ FAILED'}")
-        print(f"      5.4.3 WeChat Payment: {'✅ PASSED' if test_results['5.4.3_wechat'] else '❌ FAILED'}")
-        print(f"      5.4.4 Wallet No Balance: {'✅ PASSED' if test_results['5.4.4_wallet_no_balance'] else '❌ FAILED'}")
+        # Scenarios that never ran (e.g. after a crash) are reported as failed;
+        # with --rerun-failures the scenarios that were not selected keep their previous result
+        test_results = {}
+        lane_results = {}
+        for network_profile, profile_results in results_by_profile.items():
+            if len(network_profiles) > 1:
+                print(f"\n[{network_profile}]")
+            profile_key = network_profile if args.network_profile else None
+            previous_results = rerun_source.get_results(profile_key) if rerun_source is not None else {}
+            rerun_results = profile_results
+            profile_results = {scenario.key: profile_results.get(scenario.key, previous_results.get(scenario.key, False))
+                               for scenario in scenarios if scenario.key not in quarantined}
+            profile_lane_results = lane_checkpoint.get_results(profile_key) if lane_checkpoint is not None else {}
+            print_final_results({**profile_results, **profile_lane_results}, quarantined, blocked_by_profile[network_profile])
+            if rerun_source is not None:
+                print_rerun_delta(previous_results, rerun_results)
+            test_results.update({f"{network_profile}:{key}": result for key, result in profile_results.items()})
+            lane_results.update({f"{network_profile}:{key}": result for key, result in profile_lane_results.items()})
         
         # Calculate summary
         passed_count = sum(1 for result in test_results.values() if result)
-        total_count = len(test_results)
+        total_count = sum(1 for result in test_results.values() if result is not None)
+        not_run_count = len(test_results) - total_count
         
         print(f"\nSUMMARY: {passed_count}/{total_count} tests passed")
+        if not_run_count:
+            print(f"NOT RUN: {not_run_count} tests were skipped after --max-failures was reached")
+        for network_profile, profile_blocked in blocked_by_profile.items():
+            for prerequisite in sorted(set(profile_blocked.values())):
+                blocked_count = list(profile_blocked.values()).count(prerequisite)
+                profile_suffix = f" [{network_profile}]" if len(network_profiles) > 1 else ""
+                print(f"BLOCKED{profile_suffix}: {blocked_count} tests did not run because '{prerequisite}' failed")
+        if quarantined:
+            lane_passed = sum(1 for result in lane_results.values() if result)
+            print(f"QUARANTINE LANE (non-blocking): {lane_passed}/{len(quarantined) * len(network_profiles)} flaky tests passed")
+        slow_count = test_report.get_summary()["slow_tests"]
+        if slow_count:
+            print(f"SLOW: {slow_count} tests exceeded their latency budgets")
+        timed_out_count = test_report.get_summary()["timed_out_tests"]
+        if timed_out_count:
+            print(f"TIMED OUT: {timed_out_count} tests were aborted by the watchdog")
         
         report_file = test_report.generate_html_report()
         print(f"\nDetailed report generated: {report_file}")
@@ -0,0 +1,129 @@
+"""
+Run Checkpoints
+Saves every finished scenario to the run directory so an interrupted run can be resumed,
+and gives later runs machine-readable access to a previous run's results.
+"""
+
+import copy
+import json
+import os
+from datetime import datetime
+
+from test_reports.test_report import TestCase
+
+CHECKPOINT_FILE = "results.json"
+
+class RunCheckpoint:
+    """Per-run record of scenario outcomes, rewritten after each scenario finishes."""
+
+    def __init__(self, run_dir, suite, rerun_of=None):
+        self.run_dir = run_dir
+        self.suite = suite
+        self.rerun_of = rerun_of    # Run directory this run re-checks with --rerun-failures
+        self.path = os.path.join(run_dir, CHECKPOINT_FILE)
+        self.started = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.records = []
+
+    @classmethod
+    def load(cls, run_dir, suite=None):
+        """Load the checkpoint of a previous run, checking it belongs to the expected suite."""
+        path = os.path.join(run_dir, CHECKPOINT_FILE)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No {CHECKPOINT_FILE} checkpoint found in {run_dir}")
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if suite is not None and data['suite'] != suite:
+            raise ValueError(f"{run_dir} is a {data['suite']} run, not {suite}")
+        checkpoint = cls(run_dir, data['suite'], data.get('rerun_of'))
+        checkpoint.started = data['started']
+        checkpoint.records = data['records']
+        return checkpoint
+
+    def record(self, scenario_key, test_case, passed):
+        """Record a finished scenario (replacing an earlier attempt) and save the checkpoint."""
+        self.records = [record for record in self.records
+                        if (record['scenario'], record['network_profile']) != (scenario_key, test_case.network_profile)]
+        self.records.append({
+            'scenario': scenario_key,
+            'network_profile': test_case.network_profile,
+            'passed': passed,
+            'test_case': test_case.to_dict()
+        })
+        self.save()
+
+    def save(self):
+        """Write the checkpoint atomically so a crash never leaves a truncated file."""
+        data = {
+            'suite': self.suite,
+            'started': self.started,
+            'rerun_of': self.rerun_of,
+            'updated': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'records': self.records
+        }
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.path)
+
+    def get_results(self, network_profile=None):
+        """Get scenario key -> passed for one network profile."""
+        return {record['scenario']: record['passed'] for record in self.records
+                if record['network_profile'] == network_profile}
+
+    def get_test_cases(self, network_profile=None, passed_only=False):
+        """Rebuild the recorded test cases of one network profile."""
+        return [TestCase.from_dict(record['test_case']) for record in self.records
+                if record['network_profile'] == network_profile and (record['passed'] or not passed_only)]
+
+    def restore_passed(self, test_report, network_profile=None):
+        """Add the scenarios that already passed to a report and return their results to skip them."""
+        test_cases = self.get_test_cases(network_profile, passed_only=True)
+        for test_case in test_cases:
+            test_report.add_test_case(test_case)
+        passed = {key: True for key, result in self.get_results(network_profile).items() if result}
+        if passed:
+            print(f"⏭️ Skipping {len(passed)} scenarios that already passed in {self.run_dir}")
+        return passed
+
+def select_rerun(checkpoint, scenarios, network_profile=None, login_prerequisites=None):
+    """Pick the scenarios to confirm from a previous run: failed, timed out, slow or never run.
+
+    Most scenarios do not log in themselves and relied on an earlier scenario's login in the full
+    run. login_prerequisites maps Scenario.account -> the key of the prerequisite that logs in
+    with it; every selected scenario of that account is returned requiring it, so the rerun
+    logs in before the first one.
+    """
+    records = {record['scenario']: record for record in checkpoint.records
+               if record['network_profile'] == network_profile}
+    selected = []
+    for scenario in scenarios:
+        record = records.get(scenario.key)
+        if record is None or not record['passed'] or record['test_case']['status'] != "PASSED":
+            login_key = (login_prerequisites or {}).get(scenario.account)
+            if login_key is not None and login_key not in scenario.requires:
+                scenario = copy.copy(scenario)
+                scenario.requires = (login_key,) + scenario.requires
+            selected.append(scenario)
+    return selected
+
+def print_rerun_delta(previous_results, rerun_results):
+    """Print how the rerun scenarios changed compared with the previous run."""
+    fixed = [key for key, passed in rerun_results.items() if passed and not previous_results.get(key)]
+    still_failing = [key for key, passed in rerun_results.items() if not passed and not previous_results.get(key)]
+    regressed = [key for key, passed in rerun_results.items() if not passed and previous_results.get(key)]
+    confirmed = [key for key, passed in rerun_results.items() if passed and previous_results.get(key)]
+    
+    print("\nRERUN DELTA (vs previous run):")
+    print(f"   ✅ Fixed: {len(fixed)}")
+    for key in fixed:
+        print(f"      {key}")
+    print(f"   ❌ Still failing: {len(still_failing)}")
+    for key in still_failing:
+        print(f"      {key}")
+    if regressed:
+        print(f"   ⚠️ Passed before, failing now: {len(regressed)}")
+        for key in regressed:
+            print(f"      {key}")
+    if confirmed:
+        print(f"   ✔️ Passed again (were slow or timed out before): {len(confirmed)}")
+    return {'fixed': fixed, 'still_failing': still_failing, 'regressed': regressed, 'confirmed': confirmed}
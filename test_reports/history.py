@@ -0,0 +1,139 @@
+"""
+Run History and Flake Scores
+Scores how flaky each scenario and step is from the checkpoints of earlier runs.
+
+A scenario that always passes or always fails scores 0; the score grows with how often
+its outcome flips between consecutive runs, how close its failure rate is to 50/50, and
+how often a failure passed when the same build was re-checked with --rerun-failures.
+"""
+
+import glob
+import os
+
+from test_reports.checkpoint import RunCheckpoint, CHECKPOINT_FILE
+
+# Scenarios scoring at or above this are quarantined into the non-blocking lane
+DEFAULT_QUARANTINE_THRESHOLD = 0.3
+# Fewer runs than this do not say anything about flakiness
+MIN_RUNS_FOR_SCORE = 3
+
+def load_history(reports_root, suite, limit=30):
+    """Load the checkpoints of the most recent runs of a suite, oldest first."""
+    runs = []
+    # Quarantine lanes write their checkpoint one level down, inside the main run directory
+    paths = glob.glob(os.path.join(reports_root, "*", CHECKPOINT_FILE)) + \
+        glob.glob(os.path.join(reports_root, "*", "*", CHECKPOINT_FILE))
+    for path in paths:
+        try:
+            runs.append(RunCheckpoint.load(os.path.dirname(path), suite))
+        except (ValueError, KeyError, OSError):
+            # Other suite, or a checkpoint from an older format
+            continue
+    runs.sort(key=lambda run: run.started)
+    return runs[-limit:]
+
+def flake_score(outcomes, retry_passes=0):
+    """Score a chronological list of pass (True) / fail (False) outcomes between 0 and 1."""
+    if len(outcomes) < MIN_RUNS_FOR_SCORE:
+        return None
+    failure_rate = outcomes.count(False) / len(outcomes)
+    flips = sum(1 for previous, current in zip(outcomes, outcomes[1:]) if previous != current)
+    flip_rate = flips / (len(outcomes) - 1)
+    failures = outcomes.count(False)
+    retry_pass_rate = retry_passes / failures if failures else 0
+    # 4p(1-p) is 1 for a coin flip and 0 for a scenario that always passes or always fails
+    variance = 4 * failure_rate * (1 - failure_rate)
+    return round(min(1.0, 0.5 * max(flip_rate, retry_pass_rate) + 0.5 * variance), 2)
+
+class FlakeHistory:
+    """Per-scenario and per-step outcomes collected from earlier runs of one suite."""
+
+    def __init__(self, runs, network_profile=None):
+        self.runs = runs
+        self.network_profile = network_profile
+        self.scenario_outcomes = {}
+        self.step_outcomes = {}
+        self.retry_passes = {}
+        self.scenario_durations = {}
+        self._collect()
+
+    def _collect(self):
+        first_runs = [run for run in self.runs if run.rerun_of is None]
+        reruns = {}
+        for run in self.runs:
+            if run.rerun_of is not None:
+                reruns.setdefault(os.path.abspath(run.rerun_of), []).append(run)
+
+        # Every run that executed a scenario says how long it takes, reruns included
+        for run in self.runs:
+            for record in run.records:
+                test_case = record['test_case']
+                if record['network_profile'] != self.network_profile or test_case['status'] in ("BLOCKED", "NOT_RUN"):
+                    continue
+                duration = test_case.get('duration')
+                if duration is None and test_case.get('start_time') and test_case.get('end_time'):
+                    duration = test_case['end_time'] - test_case['start_time']
+                if duration is not None:
+                    self.scenario_durations.setdefault(record['scenario'], []).append(duration)
+
+        for run in first_runs:
+            for record in run.records:
+                # A blocked scenario never ran, so it says nothing about its own flakiness
+                if record['network_profile'] != self.network_profile or record['test_case']['status'] == "BLOCKED":
+                    continue
+                key = record['scenario']
+                self.scenario_outcomes.setdefault(key, []).append(record['passed'])
+                step_results = {}
+                for step in record['test_case']['steps']:
+                    passed = step['status'] in ("PASSED", "SLOW")
+                    step_results[step['name']] = step_results.get(step['name'], True) and passed
+                for step_name, passed in step_results.items():
+                    self.step_outcomes.setdefault((key, step_name), []).append(passed)
+
+            # A failure that passes when the same build is re-checked is the clearest flake signal
+            rerun_results = {}
+            for rerun in reruns.get(os.path.abspath(run.run_dir), []):
+                rerun_results.update(rerun.get_results(self.network_profile))
+            blocked = {record['scenario'] for record in run.records if record['test_case']['status'] == "BLOCKED"}
+            for key, passed in run.get_results(self.network_profile).items():
+                if not passed and key not in blocked and rerun_results.get(key):
+                    self.retry_passes[key] = self.retry_passes.get(key, 0) + 1
+
+    def get_scenario_scores(self):
+        """Get scenario key -> flake score (None while there is too little history)."""
+        return {key: flake_score(outcomes, self.retry_passes.get(key, 0))
+                for key, outcomes in self.scenario_outcomes.items()}
+
+    def get_failure_probabilities(self, decay=0.8):
+        """Estimate each scenario's chance of failing next, weighting recent runs more.
+
+        Each older run counts `decay` times as much as the one after it; the estimate is
+        smoothed towards 50% so a scenario with little history is neither first nor last.
+        """
+        probabilities = {}
+        for key, outcomes in self.scenario_outcomes.items():
+            weights = [decay ** age for age in range(len(outcomes) - 1, -1, -1)]
+            failed_weight = sum(weight for weight, passed in zip(weights, outcomes) if not passed)
+            probabilities[key] = (failed_weight + 1) / (sum(weights) + 2)
+        return probabilities
+
+    def get_predicted_durations(self, decay=0.8):
+        """Predict each scenario's next duration in seconds as a recency-weighted mean of past runs."""
+        predictions = {}
+        for key, durations in self.scenario_durations.items():
+            weights = [decay ** age for age in range(len(durations) - 1, -1, -1)]
+            predictions[key] = sum(weight * duration for weight, duration in zip(weights, durations)) / sum(weights)
+        return predictions
+
+    def get_step_scores(self):
+        """Get (scenario key, step name) -> flake score for steps with enough history."""
+        scores = {}
+        for (key, step_name), outcomes in self.step_outcomes.items():
+            score = flake_score(outcomes)
+            if score:
+                scores[(key, step_name)] = score
+        return scores
+
+    def get_quarantined(self, threshold=DEFAULT_QUARANTINE_THRESHOLD):
+        """Get the scenario keys whose flake score reaches the quarantine threshold."""
+        return {key for key, score in self.get_scenario_scores().items() if score is not None and score >= threshold}
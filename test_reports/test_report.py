@@ -3,83 +3,313 @@ Test Reporting Module for Selenium Test Automation
 Provides classes and functions for tracking test execution and generating reports.
 """
 
+import html
 import os
 import time
 import traceback
+import zlib
 from datetime import datetime
 from contextlib import contextmanager
 
+# ===== Watchdog =====
+# Optional test_support.watchdog.Watchdog enforcing step deadlines inside track_step
+WATCHDOG = None
+
+def set_watchdog(watchdog):
+    """Register the watchdog that gives every tracked step a deadline (None disables it)."""
+    global WATCHDOG
+    WATCHDOG = watchdog
+
+# ===== Failure Hooks =====
+# Callables run as hook(test_case, step) after a step fails, e.g. to capture debugging artifacts
+FAILURE_HOOKS = []
+
+def add_failure_hook(hook):
+    """Register a hook that runs whenever track_step records a failed step."""
+    FAILURE_HOOKS.append(hook)
+
+def remove_failure_hook(hook):
+    """Unregister a failure hook, e.g. when the capture it feeds is stopped."""
+    if hook in FAILURE_HOOKS:
+        FAILURE_HOOKS.remove(hook)
+
+def run_failure_hooks(test_case, step):
+    """Run the failure hooks for a step without letting a broken hook mask the failure."""
+    for hook in FAILURE_HOOKS:
+        try:
+            hook(test_case, step)
+        except Exception as e:
+            print(f"⚠️ Failure hook {getattr(hook, '__name__', hook)} failed: {str(e)}")
+
+# ===== Trace Export =====
+# Optional test_reports.trace_export.ChromeTraceWriter that receives every test case as it completes
+TRACE_EXPORTER = None
+
+def set_trace_exporter(exporter):
+    """Register the exporter that streams finished test cases to a trace file (None disables it)."""
+    global TRACE_EXPORTER
+    TRACE_EXPORTER = exporter
+
+def export_trace(test_case):
+    """Hand a finished test case to the trace exporter, once, without letting export errors fail the run."""
+    if TRACE_EXPORTER is None or test_case._traced:
+        return
+    test_case._traced = True
+    try:
+        TRACE_EXPORTER.write_test_case(test_case)
+    except Exception as e:
+        print(f"⚠️ Trace export failed for {test_case.name}: {str(e)}")
+
 class TestStep:
     """Represents a single test step with timing and status information."""
     
-    def __init__(self, name, description):
+    def __init__(self, name, description, budget=None):
         self.name = name
         self.description = description
+        self.budget = budget
         self.start_time = None
         self.end_time = None
         self.status = "NOT_STARTED"
         self.error_message = None
+        self.stack_trace = None
+        self.artifacts = []
+        self.flake_score = None
+        self.parent = None          # Enclosing step when track_step blocks are nested
+        self.children = []
+        self.duration = None        # Measured on the monotonic clock; start/end times are wall clock
+        self._perf_start = None
     
-    def start(self):
-        """Start timing the test step."""
-        self.start_time = time.time()
+    def start(self, started_at_perf=None):
+        """Start timing the test step, backdated to an earlier time.perf_counter() reading if given."""
+        now_perf = time.perf_counter()
+        self._perf_start = now_perf if started_at_perf is None else started_at_perf
+        # Both clocks move back together, so the wall-clock span and the duration agree
+        self.start_time = time.time() - (now_perf - self._perf_start)
         self.status = "RUNNING"
     
-    def complete(self, success=True, error_message=None, stack_trace=None):
+    def complete(self, success=True, error_message=None, stack_trace=None, timed_out=False):
         """Complete the test step with success/failure status."""
-        self.end_time = time.time()
-        self.status = "PASSED" if success else "FAILED"
+        if self._perf_start is not None:
+            self.duration = time.perf_counter() - self._perf_start
+            self.end_time = self.start_time + self.duration
+        else:
+            self.end_time = time.time()
+        if timed_out:
+            self.status = "TIMED_OUT"
+        elif not success:
+            self.status = "FAILED"
+        elif self.exceeds_budget():
+            self.status = "SLOW"
+        else:
+            self.status = "PASSED"
         self.error_message = error_message
         self.stack_trace = stack_trace
     
     def get_duration(self):
-        """Get the duration of the test step in seconds."""
+        """Get the duration of the test step in seconds, including nested steps."""
+        if self.duration is not None:
+            return self.duration
         if self.start_time and self.end_time:
             return self.end_time - self.start_time
         return None
+    
+    def get_self_time(self):
+        """Get the time spent in this step itself, excluding nested steps."""
+        duration = self.get_duration()
+        if duration is None:
+            return None
+        return max(0.0, duration - sum(child.get_duration() or 0 for child in self.children))
+    
+    def get_depth(self):
+        """Get how deeply the step is nested (0 for a top-level step)."""
+        depth = 0
+        parent = self.parent
+        while parent is not None:
+            depth += 1
+            parent = parent.parent
+        return depth
+    
+    def exceeds_budget(self):
+        """Check whether the step's own time, excluding nested steps, exceeded its latency budget."""
+        self_time = self.get_self_time()
+        return self.budget is not None and self_time is not None and self_time > self.budget
+    
+    def add_artifact(self, label, path):
+        """Attach a debugging artifact (screencast, snapshot, ...) to the step."""
+        self.artifacts.append({'label': label, 'path': path})
+    
+    def to_dict(self):
+        """Serialize the step for checkpoints and machine-readable results."""
+        return {
+            'name': self.name,
+            'description': self.description,
+            'budget': self.budget,
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+            'status': self.status,
+            'error_message': self.error_message,
+            'stack_trace': self.stack_trace,
+            'artifacts': self.artifacts,
+            'flake_score': self.flake_score,
+            'duration': self.duration
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a step serialized with to_dict()."""
+        step = cls(data['name'], data['description'], data.get('budget'))
+        step.start_time = data.get('start_time')
+        step.end_time = data.get('end_time')
+        step.status = data['status']
+        step.error_message = data.get('error_message')
+        step.stack_trace = data.get('stack_trace')
+        step.artifacts = data.get('artifacts', [])
+        step.flake_score = data.get('flake_score')
+        step.duration = data.get('duration')
+        return step
 
 class TestCase:
     """Represents a complete test case with multiple steps."""
     
-    def __init__(self, name, description):
+    def __init__(self, name, description, budget=None, step_budgets=None):
         self.name = name
         self.description = description
+        self.budget = budget
+        self.step_budgets = dict(step_budgets or {})    # Step name -> seconds, for steps tracked in this case
+        self.network_profile = None
+        self.flake_score = None
+        self.quarantined = False
         self.steps = []
         self.start_time = None
         self.end_time = None
         self.status = "NOT_STARTED"
         self.error_message = None
         self.stack_trace = None
+        self.duration = None
+        self._perf_start = None
+        self._open_steps = []       # Steps whose track_step block is still running, innermost last
+        self._traced = False
     
     def start(self):
-        """Start the test case."""
+        """Start the test case; a case the runner already started (e.g. to log in first) keeps its start."""
+        if self.status == "RUNNING":
+            return
         self.start_time = time.time()
+        self._perf_start = time.perf_counter()
         self.status = "RUNNING"
     
+    def _stop_clock(self):
+        if self._perf_start is not None:
+            self.duration = time.perf_counter() - self._perf_start
+            self.end_time = self.start_time + self.duration
+        else:
+            self.end_time = time.time()
+    
     def complete(self, success=None, error_message=None, stack_trace=None):
         """Complete the test case with success/failure status."""
-        self.end_time = time.time()
+        self._stop_clock()
         
         # If success is explicitly provided, use it
         if success is not None:
-            self.status = "PASSED" if success else "FAILED"
+            self.status = "PASSED" if success else "TIMED_OUT" if self.get_timed_out_steps() else "FAILED"
+            if self.status == "PASSED" and self.get_slow_steps():
+                self.status = "SLOW"
         else:
             # Auto-determine status based on step results
             self.status = self._determine_status_from_steps()
         
+        # A functionally passing test case can still breach its own latency budget
+        if self.status == "PASSED" and self.exceeds_budget():
+            self.status = "SLOW"
+        
         self.error_message = error_message
         self.stack_trace = stack_trace
+        export_trace(self)
     
-    def add_step(self, step):
-        """Add a test step to this test case."""
+    def mark_not_run(self, reason):
+        """Mark a test case that was deliberately skipped (it is neither passed nor failed)."""
+        self.status = "NOT_RUN"
+        self.error_message = reason
+    
+    def mark_blocked(self, reason):
+        """Mark a test case that was not run because a prerequisite it depends on failed."""
+        self.status = "BLOCKED"
+        self.error_message = reason
+    
+    def mark_timed_out(self, error_message):
+        """Mark the test case as aborted by the watchdog."""
+        self.status = "TIMED_OUT"
+        self.error_message = error_message
+        if self.end_time is None:
+            self._stop_clock()
+        export_trace(self)
+    
+    def add_step(self, step, parent=None):
+        """Add a test step to this test case, nested under parent if given."""
         self.steps.append(step)
+        if parent is not None:
+            step.parent = parent
+            parent.children.append(step)
+    
+    def get_open_step(self):
+        """Get the innermost step whose track_step block is still running."""
+        return self._open_steps[-1] if self._open_steps else None
+    
+    def get_root_steps(self):
+        """Get the top-level steps; nested steps hang off their children lists."""
+        return [step for step in self.steps if step.parent is None]
     
     def get_duration(self):
         """Get the total duration of the test case in seconds."""
+        if self.duration is not None:
+            return self.duration
         if self.start_time and self.end_time:
             return self.end_time - self.start_time
         return None
     
+    def exceeds_budget(self):
+        """Check whether the test case took longer than its latency budget."""
+        duration = self.get_duration()
+        return self.budget is not None and duration is not None and duration > self.budget
+    
+    def to_dict(self):
+        """Serialize the test case and its steps for checkpoints and machine-readable results."""
+        return {
+            'name': self.name,
+            'description': self.description,
+            'budget': self.budget,
+            'network_profile': self.network_profile,
+            'flake_score': self.flake_score,
+            'quarantined': self.quarantined,
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+            'status': self.status,
+            'error_message': self.error_message,
+            'stack_trace': self.stack_trace,
+            'duration': self.duration,
+            'steps': [dict(step.to_dict(), parent=self.steps.index(step.parent) if step.parent is not None else None)
+                      for step in self.steps]
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a test case serialized with to_dict()."""
+        test_case = cls(data['name'], data['description'], data.get('budget'))
+        test_case.network_profile = data.get('network_profile')
+        test_case.flake_score = data.get('flake_score')
+        test_case.quarantined = data.get('quarantined', False)
+        test_case.start_time = data.get('start_time')
+        test_case.end_time = data.get('end_time')
+        test_case.status = data['status']
+        test_case.error_message = data.get('error_message')
+        test_case.stack_trace = data.get('stack_trace')
+        test_case.duration = data.get('duration')
+        for step_data in data.get('steps', []):
+            parent_index = step_data.get('parent')
+            test_case.add_step(TestStep.from_dict(step_data),
+                               test_case.steps[parent_index] if parent_index is not None else None)
+        return test_case
+    
     def get_passed_steps(self):
         """Get the number of passed steps."""
         return sum(1 for step in self.steps if step.status == "PASSED")
@@ -88,20 +318,31 @@ class TestCase:
         """Get the number of failed steps."""
         return sum(1 for step in self.steps if step.status == "FAILED")
     
+    def get_slow_steps(self):
+        """Get the number of steps that passed but exceeded their latency budget."""
+        return sum(1 for step in self.steps if step.status == "SLOW")
+    
+    def get_timed_out_steps(self):
+        """Get the number of steps aborted by the watchdog."""
+        return sum(1 for step in self.steps if step.status == "TIMED_OUT")
+    
     def _determine_status_from_steps(self):
         """Determine test case status based on step results."""
         if not self.steps:
             return "NOT_STARTED"
         
+        if self.get_timed_out_steps():
+            return "TIMED_OUT"
+        
         # Check if any steps failed
         failed_steps = [step for step in self.steps if step.status == "FAILED"]
         if failed_steps:
             return "FAILED"
         
-        # Check if all steps passed
-        passed_steps = [step for step in self.steps if step.status == "PASSED"]
+        # Check if all steps passed (slow steps still passed functionally)
+        passed_steps = [step for step in self.steps if step.status in ("PASSED", "SLOW")]
         if len(passed_steps) == len(self.steps):
-            return "PASSED"
+            return "SLOW" if self.get_slow_steps() else "PASSED"
         
         # If some steps are still running or not started
         return "RUNNING"
@@ -110,7 +351,7 @@ class TestCase:
         """Get details of failed steps for debugging."""
         failed_details = []
         for i, step in enumerate(self.steps):
-            if step.status == "FAILED":
+            if step.status in ("FAILED", "TIMED_OUT"):
                 failed_details.append({
                     'step_number': i + 1,
                     'step_name': step.name,
@@ -118,12 +359,32 @@ class TestCase:
                     'stack_trace': step.stack_trace
                 })
         return failed_details
+    
+    def get_slow_step_details(self):
+        """Get details of steps that exceeded their latency budget."""
+        slow_details = []
+        for i, step in enumerate(self.steps):
+            if step.status == "SLOW":
+                slow_details.append({
+                    'step_number': i + 1,
+                    'step_name': step.name,
+                    'duration': step.get_duration(),
+                    'self_time': step.get_self_time(),
+                    'budget': step.budget
+                })
+        return slow_details
 
 class TestReport:
-    """Manages test execution reporting and generates reports."""
+    """Manages test execution reporting and generates reports.
+    
+    step_budgets / case_budgets are the suite's latency budgets (seconds by step / test case
+    name); test cases created with create_test_case() carry them, so suites never share budgets.
+    """
     
-    def __init__(self, report_dir):
+    def __init__(self, report_dir, step_budgets=None, case_budgets=None):
         self.report_dir = report_dir
+        self.step_budgets = dict(step_budgets or {})
+        self.case_budgets = dict(case_budgets or {})
         self.test_cases = []
         self.start_time = None
         self.end_time = None
@@ -137,6 +398,12 @@ class TestReport:
         """Complete the test report."""
         self.end_time = time.time()
     
+    def create_test_case(self, name, description, budget=None):
+        """Create a test case that uses this report's latency budgets."""
+        if budget is None:
+            budget = self.case_budgets.get(name)
+        return TestCase(name, description, budget, self.step_budgets)
+    
     def add_test_case(self, test_case):
         """Add a test case to the report."""
         self.test_cases.append(test_case)
@@ -154,18 +421,30 @@ class TestReport:
         total_tests = len(self.test_cases)
         passed_tests = sum(1 for tc in self.test_cases if tc.status == "PASSED")
         failed_tests = sum(1 for tc in self.test_cases if tc.status == "FAILED")
+        slow_tests = sum(1 for tc in self.test_cases if tc.status == "SLOW")
+        timed_out_tests = sum(1 for tc in self.test_cases if tc.status == "TIMED_OUT")
+        not_run_tests = sum(1 for tc in self.test_cases if tc.status == "NOT_RUN")
+        blocked_tests = sum(1 for tc in self.test_cases if tc.status == "BLOCKED")
         
         total_steps = sum(len(tc.steps) for tc in self.test_cases)
         passed_steps = sum(tc.get_passed_steps() for tc in self.test_cases)
         failed_steps = sum(tc.get_failed_steps() for tc in self.test_cases)
+        slow_steps = sum(tc.get_slow_steps() for tc in self.test_cases)
+        timed_out_steps = sum(tc.get_timed_out_steps() for tc in self.test_cases)
         
         return {
             "total_tests": total_tests,
             "passed_tests": passed_tests,
             "failed_tests": failed_tests,
+            "slow_tests": slow_tests,
+            "timed_out_tests": timed_out_tests,
+            "not_run_tests": not_run_tests,
+            "blocked_tests": blocked_tests,
             "total_steps": total_steps,
             "passed_steps": passed_steps,
             "failed_steps": failed_steps,
+            "slow_steps": slow_steps,
+            "timed_out_steps": timed_out_steps,
             "duration": self.get_duration(),
             "execution_errors": len(self.execution_errors)
         }
@@ -176,6 +455,154 @@ class TestReport:
             return self.end_time - self.start_time
         return None
     
+    def get_network_profiles(self):
+        """Get the network profiles the test cases ran under, in run order."""
+        profiles = []
+        for tc in self.test_cases:
+            if tc.network_profile is not None and tc.network_profile not in profiles:
+                profiles.append(tc.network_profile)
+        return profiles
+    
+    def get_profile_comparison(self):
+        """Get the average duration of each step name under each network profile."""
+        durations = {}
+        for tc in self.test_cases:
+            if tc.network_profile is None:
+                continue
+            for step in tc.steps:
+                duration = step.get_duration()
+                if duration is None:
+                    continue
+                durations.setdefault(step.name, {}).setdefault(tc.network_profile, []).append(duration)
+        
+        return {
+            step_name: {profile: sum(values) / len(values) for profile, values in by_profile.items()}
+            for step_name, by_profile in durations.items()
+        }
+    
+    def _render_step_html(self, step):
+        """Render a step and, in a collapsible block, the steps nested inside it."""
+        step_class = step.status.lower().replace('_', '-')
+        duration_str = f"{step.get_duration():.2f}" if step.get_duration() is not None else "N/A"
+        if step.children and step.get_self_time() is not None:
+            duration_str += f" (self {step.get_self_time():.2f})"
+        html = f"""
+        <div class="test-step {step_class}">
+            <p><strong>{step.name}</strong> - {step.description}</p>
+            <p>Status: {step.status}</p>
+            <p>Duration: {duration_str} seconds</p>
+"""
+        if step.budget is not None:
+            budget_note = " (exceeded)" if step.status == "SLOW" else ""
+            html += f"""
+            <p>Budget: {step.budget:.2f} seconds of self time{budget_note}</p>
+"""
+        if step.flake_score is not None:
+            html += f"""
+            <p>Flake score: {step.flake_score:.2f}</p>
+"""
+        if step.artifacts:
+            html += '            <p class="artifacts">Artifacts: '
+            for artifact in step.artifacts:
+                link = os.path.relpath(artifact['path'], self.report_dir)
+                html += f'<a href="{link}">{artifact["label"]}</a>'
+            html += "</p>\n"
+        if step.error_message:
+            html += f"""
+            <div class="error-details">
+                <p><strong>Step Error:</strong> {step.error_message}</p>
+"""
+            if step.stack_trace:
+                html += f"""
+                <div class="stack-trace">{step.stack_trace}</div>
+"""
+            html += "</div>"
+        if step.children:
+            html += f"""
+            <details class="span-children" open>
+                <summary>{len(step.children)} nested step{'s' if len(step.children) != 1 else ''}</summary>
+"""
+            for child in step.children:
+                html += self._render_step_html(child)
+            html += "</details>"
+        html += "</div>"
+        return html
+    
+    def get_step_profile(self):
+        """Aggregate step timings by step name, sorted by self time so nested time is counted once."""
+        profile = {}
+        for tc in self.test_cases:
+            for step in tc.steps:
+                duration = step.get_duration()
+                if duration is None:
+                    continue
+                entry = profile.setdefault(step.name, {'name': step.name, 'count': 0, 'total': 0.0, 'self': 0.0, 'max': 0.0})
+                entry['count'] += 1
+                entry['total'] += duration
+                entry['self'] += step.get_self_time()
+                entry['max'] = max(entry['max'], duration)
+        return sorted(profile.values(), key=lambda entry: entry['self'], reverse=True)
+    
+    def get_flame_tree(self, by_scenario=True):
+        """Merge the step trees of all test cases into one tree of total seconds per call path.
+        
+        With by_scenario the path starts with the test case, otherwise identical step paths
+        from different test cases are merged, flame-graph style, into one node per helper.
+        """
+        root = {'name': "All test cases", 'total': 0.0, 'count': 0, 'children': {}}
+        
+        def add_step(node, step):
+            duration = step.get_duration()
+            if duration is None:
+                return
+            child = node['children'].setdefault(step.name, {'name': step.name, 'total': 0.0, 'count': 0, 'children': {}})
+            child['total'] += duration
+            child['count'] += 1
+            for nested in step.children:
+                add_step(child, nested)
+        
+        for tc in self.test_cases:
+            duration = tc.get_duration()
+            if duration is None:
+                continue
+            root['total'] += duration
+            root['count'] += 1
+            node = root
+            if by_scenario:
+                node = root['children'].setdefault(tc.name, {'name': tc.name, 'total': 0.0, 'count': 0, 'children': {}})
+                node['total'] += duration
+                node['count'] += 1
+            for step in tc.get_root_steps():
+                add_step(node, step)
+        return root
+    
+    def _render_icicle_html(self, tree):
+        """Render a flame tree as an icicle chart: one row per depth, widths proportional to time."""
+        if not tree['total']:
+            return ""
+        blocks = []
+        
+        def add_block(node, depth, left):
+            width = node['total'] / tree['total'] * 100
+            blocks.append((node, depth, left, width))
+            # Children are laid out by time; the gap to the right of them is the node's own time
+            child_left = left
+            for child in sorted(node['children'].values(), key=lambda child: child['total'], reverse=True):
+                add_block(child, depth + 1, child_left)
+                child_left += child['total'] / tree['total'] * 100
+        
+        add_block(tree, 0, 0.0)
+        rows = max(depth for _, depth, _, _ in blocks) + 1
+        icicle = f'        <div class="icicle" style="height: {rows * 22}px;">\n'
+        for node, depth, left, width in blocks:
+            hue = zlib.crc32(node['name'].encode('utf-8')) % 50
+            label = html.escape(node['name'])
+            tooltip = f"{label}: {node['total']:.2f}s in {node['count']} call{'s' if node['count'] != 1 else ''} ({width:.1f}%)"
+            icicle += (f'            <div class="icicle-block" title="{tooltip}" style="left: {left:.3f}%; width: {width:.3f}%; '
+                       f'top: {depth * 22}px; background-color: hsl({hue}, 80%, 65%);">{label} {node["total"]:.1f}s</div>\n')
+        icicle += "        </div>\n"
+        return icicle
+    
     def generate_html_report(self):
         """Generate an HTML report of the test results."""
         html_content = f"""
@@ -192,11 +619,30 @@ class TestReport:
         .test-step {{ margin: 5px 10px; padding: 5px; border-left: 3px solid #ddd; }}
         .passed {{ border-left-color: #4CAF50; }}
         .failed {{ border-left-color: #f44336; }}
+        .slow {{ border-left-color: #FF9800; }}
+        .timed-out {{ border-left-color: #9C27B0; }}
+        .not-run {{ border-left-color: #BDBDBD; }}
+        .blocked {{ border-left-color: #795548; }}
         .running {{ border-left-color: #2196F3; }}
         .not-started {{ border-left-color: #9E9E9E; }}
         .error-details {{ background-color: #ffebee; padding: 10px; margin: 5px 0; border-radius: 3px; }}
+        .artifacts a {{ margin-right: 10px; }}
         .stack-trace {{ background-color: #f5f5f5; padding: 10px; margin: 5px 0; font-family: monospace; font-size: 12px; white-space: pre-wrap; }}
         .execution-errors {{ background-color: #fff3cd; padding: 15px; border-radius: 5px; margin: 20px 0; }}
+        .profile-comparison {{ padding: 15px; margin: 20px 0; }}
+        .profile-comparison table {{ border-collapse: collapse; }}
+        .profile-comparison th, .profile-comparison td {{ border: 1px solid #ddd; padding: 5px 10px; text-align: right; }}
+        .profile-comparison th:first-child, .profile-comparison td:first-child {{ text-align: left; }}
+        .step-profile {{ padding: 15px; margin: 20px 0; }}
+        .step-profile table {{ border-collapse: collapse; }}
+        .step-profile th, .step-profile td {{ border: 1px solid #ddd; padding: 5px 10px; text-align: right; }}
+        .step-profile th:first-child, .step-profile td:first-child {{ text-align: left; }}
+        .span-children {{ margin-left: 20px; }}
+        .span-children summary {{ cursor: pointer; color: #555; }}
+        .flame-graph {{ padding: 15px; margin: 20px 0; }}
+        .icicle {{ position: relative; margin: 10px 0 20px; }}
+        .icicle-block {{ position: absolute; height: 20px; line-height: 20px; font-size: 11px; padding-left: 3px; box-sizing: border-box;
+                         overflow: hidden; white-space: nowrap; text-overflow: ellipsis; border: 1px solid #fff; border-radius: 2px; }}
     </style>
 </head>
 <body>
@@ -215,9 +661,15 @@ class TestReport:
         <p><strong>Total Tests:</strong> {summary['total_tests']}</p>
         <p><strong>Passed:</strong> {summary['passed_tests']}</p>
         <p><strong>Failed:</strong> {summary['failed_tests']}</p>
+        <p><strong>Slow (over latency budget):</strong> {summary['slow_tests']}</p>
+        <p><strong>Timed Out:</strong> {summary['timed_out_tests']}</p>
+        <p><strong>Not Run:</strong> {summary['not_run_tests']}</p>
+        <p><strong>Blocked (prerequisite failed):</strong> {summary['blocked_tests']}</p>
         <p><strong>Total Steps:</strong> {summary['total_steps']}</p>
         <p><strong>Passed Steps:</strong> {summary['passed_steps']}</p>
         <p><strong>Failed Steps:</strong> {summary['failed_steps']}</p>
+        <p><strong>Slow Steps:</strong> {summary['slow_steps']}</p>
+        <p><strong>Timed Out Steps:</strong> {summary['timed_out_steps']}</p>
         <p><strong>Duration:</strong> {duration_str} seconds</p>
         <p><strong>Execution Errors:</strong> {summary['execution_errors']}</p>
     </div>
@@ -242,9 +694,70 @@ class TestReport:
                 html_content += "</div>"
             html_content += "</div>"
         
+        # Add network profile comparison if the matrix ran under several profiles
+        profiles = self.get_network_profiles()
+        if len(profiles) > 1:
+            baseline = profiles[0]
+            html_content += """
+    <div class="profile-comparison">
+        <h2>Network Profile Comparison</h2>
+        <p>Average step duration in seconds (slowdown relative to the first profile).</p>
+        <table>
+            <tr><th>Step</th>"""
+            for profile in profiles:
+                html_content += f"<th>{profile}</th>"
+            html_content += "</tr>\n"
+            
+            for step_name, by_profile in self.get_profile_comparison().items():
+                html_content += f"            <tr><td>{step_name}</td>"
+                for profile in profiles:
+                    if profile not in by_profile:
+                        html_content += "<td>N/A</td>"
+                    elif profile != baseline and by_profile.get(baseline):
+                        ratio = by_profile[profile] / by_profile[baseline]
+                        html_content += f"<td>{by_profile[profile]:.2f} (×{ratio:.1f})</td>"
+                    else:
+                        html_content += f"<td>{by_profile[profile]:.2f}</td>"
+                html_content += "</tr>\n"
+            html_content += """        </table>
+    </div>
+"""
+        
+        # Add the per-step-name profile; self time excludes nested steps so the column adds up to the run
+        step_profile = self.get_step_profile()
+        if step_profile:
+            html_content += """
+    <div class="step-profile">
+        <h2>Step Profile</h2>
+        <p>Time per step name across all test cases, in seconds. Total includes nested steps; self time does not.</p>
+        <table>
+            <tr><th>Step</th><th>Count</th><th>Self Time</th><th>Total Time</th><th>Average</th><th>Max</th></tr>
+"""
+            for entry in step_profile:
+                html_content += (f"            <tr><td>{entry['name']}</td><td>{entry['count']}</td>"
+                                 f"<td>{entry['self']:.2f}</td><td>{entry['total']:.2f}</td>"
+                                 f"<td>{entry['total'] / entry['count']:.2f}</td><td>{entry['max']:.2f}</td></tr>\n")
+            html_content += """        </table>
+    </div>
+"""
+        
+        # Add icicle charts of where the time went: per scenario, and per helper across the whole run
+        by_scenario = self.get_flame_tree(by_scenario=True)
+        if by_scenario['total']:
+            html_content += f"""
+    <div class="flame-graph">
+        <h2>Where the Time Goes</h2>
+        <p>Each block is a test case or step, as wide as its share of the {by_scenario['total']:.1f}s spent in test cases; blocks below it are the steps it ran. Hover for totals.</p>
+        <h3>By scenario</h3>
+{self._render_icicle_html(by_scenario)}
+        <h3>By step, merged across scenarios</h3>
+{self._render_icicle_html(self.get_flame_tree(by_scenario=False))}
+    </div>
+"""
+        
         # Add test cases
         for test_case in self.test_cases:
-            status_class = test_case.status.lower()
+            status_class = test_case.status.lower().replace('_', '-')
             duration_str = f"{test_case.get_duration():.2f}" if test_case.get_duration() is not None else "N/A"
             html_content += f"""
     <div class="test-case">
@@ -254,6 +767,19 @@ class TestReport:
             <p><strong>Description:</strong> {test_case.description}</p>
             <p><strong>Duration:</strong> {duration_str} seconds</p>
 """
+            if test_case.network_profile is not None:
+                html_content += f"""
+            <p><strong>Network Profile:</strong> {test_case.network_profile}</p>
+"""
+            if test_case.budget is not None:
+                html_content += f"""
+            <p><strong>Budget:</strong> {test_case.budget:.2f} seconds</p>
+"""
+            if test_case.flake_score is not None:
+                quarantine_note = " (quarantined - does not block the verdict)" if test_case.quarantined else ""
+                html_content += f"""
+            <p><strong>Flake Score:</strong> {test_case.flake_score:.2f}{quarantine_note}</p>
+"""
             
             # Add test case error details if any
             if test_case.error_message:
@@ -269,26 +795,8 @@ class TestReport:
             
             html_content += "</div>"
             
-            for step in test_case.steps:
-                step_class = step.status.lower().replace('_', '-')
-                duration_str = f"{step.get_duration():.2f}" if step.get_duration() is not None else "N/A"
-                html_content += f"""
-        <div class="test-step {step_class}">
-            <p><strong>{step.name}</strong> - {step.description}</p>
-            <p>Status: {step.status}</p>
-            <p>Duration: {duration_str} seconds</p>
-"""
-                if step.error_message:
-                    html_content += f"""
-            <div class="error-details">
-                <p><strong>Step Error:</strong> {step.error_message}</p>
-"""
-                    if step.stack_trace:
-                        html_content += f"""
-                <div class="stack-trace">{step.stack_trace}</div>
-"""
-                    html_content += "</div>"
-                html_content += "</div>"
+            for step in test_case.get_root_steps():
+                html_content += self._render_step_html(step)
             
             html_content += "</div>"
         
@@ -319,11 +827,22 @@ FINAL TEST SUMMARY
         
         # Add test case results
         for test_case in self.test_cases:
-            status_icon = "✓" if test_case.status == "PASSED" else "✗" if test_case.status == "FAILED" else "⚠"
-            report_content += f"{status_icon} {test_case.name}: {test_case.status}\n"
+            status_icon = "✓" if test_case.status == "PASSED" else "✗" if test_case.status == "FAILED" else "-" if test_case.status in ("NOT_RUN", "BLOCKED") else "⚠"
+            profile_suffix = f" [{test_case.network_profile}]" if test_case.network_profile is not None else ""
+            quarantine_suffix = " (quarantined, non-blocking)" if test_case.quarantined else ""
+            report_content += f"{status_icon} {test_case.name}{profile_suffix}: {test_case.status}{quarantine_suffix}\n"
+            
+            # Add budget details for slow tests
+            if test_case.status == "SLOW":
+                if test_case.exceeds_budget():
+                    report_content += f"   Test case took {test_case.get_duration():.2f}s (budget {test_case.budget:.2f}s)\n"
+                for step_detail in test_case.get_slow_step_details():
+                    report_content += f"     Step {step_detail['step_number']}: {step_detail['step_name']} took {step_detail['self_time']:.2f}s itself (budget {step_detail['budget']:.2f}s)\n"
             
             # Add error details for failed tests
-            if test_case.status == "FAILED":
+            if test_case.status == "BLOCKED":
+                report_content += f"   {test_case.error_message}\n"
+            if test_case.status in ("FAILED", "TIMED_OUT"):
                 if test_case.error_message:
                     report_content += f"   Error: {test_case.error_message}\n"
                 failed_steps = test_case.get_failed_step_details()
@@ -344,14 +863,20 @@ FINAL TEST SUMMARY
         summary = self.get_summary()
         passed_count = summary['passed_tests']
         failed_count = summary['failed_tests']
-        skipped_count = 0  # Not currently tracked
+        slow_count = summary['slow_tests']
+        timed_out_count = summary['timed_out_tests']
+        skipped_count = summary['not_run_tests']
+        blocked_count = summary['blocked_tests']
         total_count = summary['total_tests']
         
         report_content += f"""
 Overall Results:
   Passed: {passed_count}
   Failed: {failed_count}
+  Slow: {slow_count}
+  Timed Out: {timed_out_count}
   Skipped: {skipped_count}
+  Blocked: {blocked_count}
   Total: {total_count}
 
 Test reports saved in: {self.report_dir}
@@ -364,24 +889,59 @@ Test reports saved in: {self.report_dir}
         
         return report_file
 
-def create_test_case(name, description):
-    """Create a new test case."""
-    return TestCase(name, description)
+def create_test_case(name, description, budget=None):
+    """Create a new test case outside any report's latency budgets (see TestReport.create_test_case)."""
+    return TestCase(name, description, budget)
 
 @contextmanager
-def track_step(test_case, step_name, step_description):
-    """Context manager for tracking a test step with enhanced error handling."""
-    step = TestStep(step_name, step_description)
-    test_case.add_step(step)
-    step.start()
+def track_step(test_case, step_name, step_description, budget=None, started_at_perf=None):
+    """Context manager for tracking a test step with enhanced error handling.
+    
+    started_at_perf (a time.perf_counter() reading) backdates the step to something that
+    began before the block, e.g. a redirect a background watcher has been timing.
+    """
+    if budget is None:
+        budget = test_case.step_budgets.get(step_name)
+    step = TestStep(step_name, step_description, budget)
+    test_case.add_step(step, test_case.get_open_step())
+    test_case._open_steps.append(step)
+    step.start(started_at_perf)
+    deadline = None
+    if WATCHDOG is not None:
+        deadline = WATCHDOG.arm(f"Step '{step_name}'", WATCHDOG.get_step_timeout(step_name), test_case, step)
     
     try:
         yield step
-        step.complete(success=True)
+        if WATCHDOG is not None and WATCHDOG.tripped:
+            # The step swallowed the error caused by the watchdog aborting the browser
+            step.complete(success=False, error_message="Aborted by the watchdog", timed_out=True)
+            print(f"⏰ Step '{step_name}' timed out")
+        else:
+            step.complete(success=True)
     except Exception as e:
         error_message = str(e)
         stack_trace = traceback.format_exc()
+        if WATCHDOG is not None and WATCHDOG.tripped:
+            # Failure artifacts were captured by the watchdog before it aborted the browser
+            timeout_note = f"Timed out after {deadline.timeout}s" if deadline is not None and deadline.expired else "Aborted by the watchdog"
+            step.complete(success=False, error_message=f"{timeout_note}: {error_message}", stack_trace=stack_trace, timed_out=True)
+            print(f"⏰ Step '{step_name}' timed out: {error_message}")
+            raise
         step.complete(success=False, error_message=error_message, stack_trace=stack_trace)
         print(f"❌ Step '{step_name}' failed: {error_message}")
-        print(f"Stack trace: {stack_trace}")
-        raise 
\ No newline at end of file
+        # Enclosing steps fail with the same exception; only the innermost one dumps it and runs the hooks
+        if getattr(e, "_failed_step", None) is None:
+            print(f"Stack trace: {stack_trace}")
+            run_failure_hooks(test_case, step)
+            try:
+                e._failed_step = step
+            except AttributeError:
+                pass
+        raise
+    finally:
+        test_case._open_steps.remove(step)
+        if WATCHDOG is not None:
+            WATCHDOG.disarm(deadline)
+    
+    if step.status == "SLOW":
+        print(f"🐢 Step '{step_name}' exceeded its latency budget: {step.get_self_time():.2f}s > {step.budget:.2f}s") 
\ No newline at end of file
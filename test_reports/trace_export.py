@@ -0,0 +1,94 @@
+"""
+Trace Export
+Streams test case and step timings to the run directory in Chrome trace-event format
+(trace-<pid>.json), which Perfetto (ui.perfetto.dev) and chrome://tracing open directly.
+
+Each test case is written and flushed as soon as it completes, so a long run can be inspected
+while it is still going and a crashed run keeps every finished case. The file is a JSON array
+whose closing bracket is only written by close(); trace viewers accept the array without it.
+Timestamps are wall-clock microseconds since the epoch, so the spans line up with backend
+traces recorded for the same time window. Spans are placed with the perf_counter clock they were
+measured on, mapped to wall time through one anchor taken when the writer opens, so cases and
+steps (including backdated ones) stay consistent with each other even if the wall clock moves.
+"""
+
+import json
+import os
+import threading
+import time
+
+TRACE_FILE = "trace-{pid}.json"
+
+def _microseconds(seconds):
+    return int(round(seconds * 1_000_000))
+
+class ChromeTraceWriter:
+    """Appends complete ("X") events for finished test cases to a trace-event file."""
+
+    def __init__(self, run_dir, process_name):
+        self.pid = os.getpid()
+        self.path = os.path.join(run_dir, TRACE_FILE.format(pid=self.pid))
+        self._lock = threading.Lock()
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._file.write("[")
+        self._first = True
+        # Single mapping from perf_counter to wall time for every span in this file
+        self._anchor_wall = time.time()
+        self._anchor_perf = time.perf_counter()
+        self._write([
+            {'name': 'process_name', 'ph': 'M', 'pid': self.pid, 'tid': 0, 'args': {'name': process_name}},
+            {'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': 0, 'args': {'name': 'scenarios'}},
+        ])
+
+    def _write(self, events):
+        # One write and flush per batch keeps the overhead to a few syscalls per test case
+        lines = [json.dumps(event, ensure_ascii=False, separators=(',', ':')) for event in events]
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(("\n" if self._first else ",\n") + ",\n".join(lines))
+            self._file.flush()
+            self._first = False
+
+    def _start_time(self, item):
+        # Items loaded back from JSON have no perf_counter start and keep their recorded wall time
+        perf_start = getattr(item, '_perf_start', None)
+        if perf_start is None:
+            return item.start_time
+        return self._anchor_wall + (perf_start - self._anchor_perf)
+
+    def _span(self, name, category, start_time, duration, args):
+        return {'name': name, 'cat': category, 'ph': 'X', 'ts': _microseconds(start_time),
+                'dur': _microseconds(duration), 'pid': self.pid, 'tid': 0,
+                'args': {key: value for key, value in args.items() if value is not None}}
+
+    def write_test_case(self, test_case):
+        """Write a finished test case and its steps; steps nest under it by time in the viewer."""
+        if test_case.start_time is None or test_case.get_duration() is None:
+            return
+        events = [self._span(test_case.name, 'test_case', self._start_time(test_case), test_case.get_duration(), {
+            'status': test_case.status,
+            'description': test_case.description,
+            'network_profile': getattr(test_case, 'network_profile', None),
+            'error': test_case.error_message,
+        })]
+        for step in test_case.steps:
+            if step.start_time is None or step.get_duration() is None:
+                continue
+            events.append(self._span(step.name, 'step', self._start_time(step), step.get_duration(), {
+                'status': step.status,
+                'description': step.description,
+                'self_time': round(step.get_self_time(), 6),
+                'budget': step.budget,
+                'error': step.error_message,
+            }))
+        self._write(events)
+
+    def close(self):
+        """Terminate the JSON array so strict JSON parsers can read the file too."""
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write("\n]\n")
+            self._file.close()
+            self._file = None
@@ -0,0 +1,162 @@
+"""
+Test Account Pool
+Configured test accounts tagged by capability ("balance", "no_balance", "admin_target", ...)
+and handed out to scenarios through leases. A lease is an exclusive lock on a per-account lock
+file, so suite processes running side by side never drive the same account at the same time;
+the operating system drops the lock if a process dies, so crashed runs leave no stale leases.
+
+Extra accounts come from a JSON file:
+    {"accounts": [{"id": "15332595364", "password": "...", "tags": ["balance"]}, ...]}
+"""
+
+import json
+import os
+import re
+import time
+
+from test_support.file_locks import try_lock, unlock
+
+# Leases held by this process, by tag; the suite's login helpers read the account from here
+ACTIVE_LEASES = {}
+
+class Account:
+    """A test account and the capabilities it can be leased for."""
+
+    def __init__(self, account_id, tags, password=None, **details):
+        self.account_id = str(account_id)
+        self.tags = set(tags)
+        self.password = password
+        self.details = details      # Any other per-account settings from the accounts file
+
+    def __repr__(self):
+        return f"Account({self.account_id}, {sorted(self.tags)})"
+
+class Lease:
+    """An account held exclusively by one scenario until it is released."""
+
+    def __init__(self, account, tag, holder, lock_file):
+        self.account = account
+        self.tag = tag
+        self.holder = holder
+        self.lock_file = lock_file
+        self.leased_at = time.time()
+
+def load_accounts(path):
+    """Load accounts from a JSON accounts file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return [Account(entry.pop('id'), entry.pop('tags'), **entry) for entry in data['accounts']]
+
+class AccountPool:
+    """Hands out accounts by tag with leases that are exclusive across processes."""
+
+    def __init__(self, accounts, lock_dir, lease_timeout=300, poll_interval=0.5):
+        self.accounts = list(accounts)
+        self.lock_dir = lock_dir
+        self.lease_timeout = lease_timeout
+        self.poll_interval = poll_interval
+        self._last_leased = {}      # tag -> account id, so a process keeps its logged-in account
+        os.makedirs(lock_dir, exist_ok=True)
+
+    def get_tags(self):
+        return set().union(*(account.tags for account in self.accounts))
+
+    def _lock_path(self, account):
+        safe_id = re.sub(r"[^A-Za-z0-9_.-]+", "_", account.account_id)
+        return os.path.join(self.lock_dir, f"{safe_id}.lock")
+
+    def _candidates(self, tag):
+        candidates = [account for account in self.accounts if tag in account.tags]
+        # Prefer the account this process used last: the browser is probably still logged in with it
+        preferred = self._last_leased.get(tag)
+        candidates.sort(key=lambda account: account.account_id != preferred)
+        return candidates
+
+    def _try_lease(self, tag, holder):
+        for account in self._candidates(tag):
+            lock_file = open(self._lock_path(account), 'a+', encoding='utf-8')
+            if not try_lock(lock_file):
+                lock_file.close()
+                continue
+            lock_file.seek(0)
+            lock_file.truncate()
+            lock_file.write(json.dumps({'holder': holder, 'pid': os.getpid(), 'tag': tag, 'leased_at': time.time()}))
+            lock_file.flush()
+            return Lease(account, tag, holder, lock_file)
+        return None
+
+    def lease(self, tag, holder, timeout=None):
+        """Lease a free account with the tag, waiting up to timeout seconds for one to be released."""
+        if not any(tag in account.tags for account in self.accounts):
+            raise LookupError(f"No '{tag}' account is configured")
+        timeout = self.lease_timeout if timeout is None else timeout
+        deadline = time.time() + timeout
+        waiting = False
+        while True:
+            lease = self._try_lease(tag, holder)
+            if lease is not None:
+                if waiting:
+                    print(f"🔑 Got '{tag}' account {lease.account.account_id} for {holder}")
+                self._last_leased[tag] = lease.account.account_id
+                ACTIVE_LEASES[tag] = lease
+                return lease
+            if time.time() >= deadline:
+                raise TimeoutError(f"No '{tag}' account became free within {timeout}s")
+            if not waiting:
+                print(f"⏳ All '{tag}' accounts are leased - {holder} is waiting for one")
+                waiting = True
+            time.sleep(self.poll_interval)
+
+    def release(self, lease):
+        """Release a lease so other scenarios and processes can use the account."""
+        if ACTIVE_LEASES.get(lease.tag) is lease:
+            del ACTIVE_LEASES[lease.tag]
+        try:
+            lease.lock_file.seek(0)
+            lease.lock_file.truncate()
+            unlock(lease.lock_file)
+        finally:
+            lease.lock_file.close()
+
+def get_leased_account(tag):
+    """Get the account this process currently leases for a tag, or None outside a lease."""
+    lease = ACTIVE_LEASES.get(tag)
+    return lease.account if lease is not None else None
+
+class BrowserLogin:
+    """Tracks which account the suite's browser is logged in with and logs in again when a scenario needs another.
+
+    logins maps account tag -> login function(test_case), which logs in with the account this
+    process leases for the tag (see get_leased_account); reset_session() logs the browser out.
+    The account is tracked by id as well as tag: a lease can hand out a different account of the
+    same tag than the browser is logged in with, e.g. when another process holds that one.
+    """
+
+    def __init__(self, logins, reset_session):
+        self.logins = logins
+        self.reset_session = reset_session
+        self.account = None         # (tag, account id) the browser is logged in with; None when logged out or unknown
+
+    def _wanted(self, tag):
+        account = get_leased_account(tag)
+        return (tag, account.account_id if account is not None else None)
+
+    def ensure(self, tag, test_case):
+        """Log the browser in with the tag's leased account unless it already is; return whether it logged in."""
+        wanted = self._wanted(tag)
+        if wanted == self.account:
+            return False
+        print(f"🔐 Switching the browser to the '{tag}' account {wanted[1] or '(default)'}")
+        self.account = None
+        self.reset_session()
+        self.logins[tag](test_case)
+        self.account = wanted
+        return True
+
+    def logged_in(self, tag):
+        """Record a login made outside ensure(), e.g. by a prerequisite check, with the tag's leased account."""
+        self.account = self._wanted(tag)
+
+    def forget(self):
+        """Forget the login, e.g. after the browser was replaced by a logged-out one."""
+        self.account = None
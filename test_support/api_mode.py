@@ -0,0 +1,189 @@
+"""
+API-Level Scenario Mode
+Records the HTTP calls the UI makes for each scenario and replays them without a browser.
+
+Recording needs Chrome's performance log, enabled when the driver is created with
+    goog:loggingPrefs = {"performance": "ALL"}
+Recorded flows are saved as JSON (see test_support.http_flows for the format). Login flows are
+saved with "{account}" and "{password}" in place of the recorded credentials and replayed with
+the account this process leases for the tag.
+"""
+
+import json
+import os
+
+from test_reports.test_report import track_step
+from test_support.accounts import get_leased_account
+from test_support.http_flows import HttpSession, check_response, fill_placeholders, load_flow, replay_requests
+from test_support.runner import Prerequisite
+
+# Top-level response fields that identify the business outcome and are stable across runs
+STABLE_RESPONSE_FIELDS = ("code", "success")
+
+# Request headers that are connection- or session-specific and must not be replayed verbatim
+SKIPPED_REQUEST_HEADERS = ("cookie", "content-length", "host", "connection", "accept-encoding")
+
+def flow_path(flows_dir, flow_name):
+    """Get the path of a recorded flow file."""
+    return os.path.join(flows_dir, f"{flow_name}.json")
+
+class FlowRecorder:
+    """Collects the XHR/fetch calls a scenario makes from Chrome's performance log."""
+
+    def __init__(self, driver, origin, flows_dir, writer=None):
+        self.driver = driver
+        self.writer = writer
+        self.origin = origin.rstrip("/")
+        self.flows_dir = flows_dir
+        os.makedirs(flows_dir, exist_ok=True)
+
+    def start(self):
+        """Discard buffered log entries so the recording starts at the current point."""
+        self.driver.get_log("performance")
+
+    def _collect_requests(self):
+        requests = {}
+        for entry in self.driver.get_log("performance"):
+            message = json.loads(entry["message"])["message"]
+            params = message.get("params", {})
+            request_id = params.get("requestId")
+
+            if message["method"] == "Network.requestWillBeSent":
+                request = params["request"]
+                if params.get("type") not in ("XHR", "Fetch") or not request["url"].startswith(self.origin):
+                    continue
+                requests[request_id] = {
+                    "method": request["method"],
+                    "url": request["url"][len(self.origin):] or "/",
+                    "headers": {name: value for name, value in request.get("headers", {}).items()
+                                if name.lower() not in SKIPPED_REQUEST_HEADERS and not name.startswith(":")},
+                    "body": request.get("postData")
+                }
+
+            elif message["method"] == "Network.responseReceived" and request_id in requests:
+                response = params["response"]
+                requests[request_id]["expect_status"] = response["status"]
+                if "json" in response.get("mimeType", ""):
+                    requests[request_id]["expect_json"] = self._stable_fields(request_id)
+
+        return list(requests.values())
+
+    def _stable_fields(self, request_id):
+        try:
+            body = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+            payload = json.loads(body["body"])
+        except Exception:
+            # Body already evicted or not JSON; status code alone is asserted
+            return {}
+        if not isinstance(payload, dict):
+            return {}
+        return {field: payload[field] for field in STABLE_RESPONSE_FIELDS if field in payload}
+
+    def save(self, flow_name, placeholders=None):
+        """Write the requests recorded since start() as a flow file and return its path.
+        
+        placeholders maps recorded values (e.g. the login's phone and password) to the placeholder
+        written in their place, such as "{account}", so the flow can be replayed with other values.
+        """
+        requests = self._collect_requests()
+        for value, placeholder in (placeholders or {}).items():
+            for request in requests:
+                for field in ("url", "body"):
+                    if value and isinstance(request.get(field), str):
+                        request[field] = request[field].replace(value, placeholder)
+        flow = {
+            "name": flow_name,
+            "base_url": self.origin,
+            "requests": requests
+        }
+        path = flow_path(self.flows_dir, flow_name)
+        if self.writer is not None:
+            self.writer.write_json(path, flow)
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(flow, f, ensure_ascii=False, indent=2)
+        print(f"📼 Recorded {len(flow['requests'])} HTTP calls for {flow_name}: {path}")
+        return path
+
+class ApiMode:
+    """Runs API-capable scenarios as HTTP replays; the rest still run in the browser.
+
+    login_flows maps account tag -> recorded login flow name (replayed to get session cookies),
+    and default_accounts maps tag -> the Account to log in with outside a lease. A replayed
+    scenario requires its account's HTTP login prerequisite instead of the browser ones, so
+    the browser is not started or logged in for it. Browser-only scenarios are logged in by
+    the runner's BrowserLogin like in a normal run.
+    """
+
+    def __init__(self, origin, flows_dir, login_flows, default_accounts=None):
+        self.origin = origin
+        self.flows_dir = flows_dir
+        self.login_flows = login_flows
+        self.default_accounts = default_accounts or {}
+        self.sessions = {}          # (tag, account id) -> logged-in HttpSession
+
+    def get_flow(self, scenario):
+        """Get the recorded flow for a scenario, or None when it must run in the browser."""
+        if not scenario.api or scenario.account not in self.login_flows:
+            return None
+        path = flow_path(self.flows_dir, scenario.key)
+        login_path = flow_path(self.flows_dir, self.login_flows[scenario.account])
+        if not (os.path.exists(path) and os.path.exists(login_path)):
+            return None
+        flow = load_flow(path)
+        return flow if flow["requests"] else None
+
+    def get_login_prerequisite(self, account):
+        """Key of the prerequisite that logs in over HTTP with an account tag."""
+        return f"api_{account}_login"
+
+    def get_prerequisites(self, scenario):
+        """Prerequisite keys of a replayed scenario: its account's HTTP login stands in for the browser ones."""
+        return (self.get_login_prerequisite(scenario.account),)
+
+    def create_prerequisites(self):
+        """Create the HTTP login prerequisite of every account tag with a login flow."""
+        prerequisites = {}
+        for account in self.login_flows:
+            def check(test_case, account=account):
+                with track_step(test_case, "API Login", f"Replay the {account} login flow"):
+                    self.get_session(account)
+            key = self.get_login_prerequisite(account)
+            prerequisites[key] = Prerequisite(key, f"Logged in over HTTP with {account} account", check)
+        return prerequisites
+
+    def get_session(self, account):
+        """Get the pooled HTTP session for the account leased for a tag, logging in on first use."""
+        leased = get_leased_account(account) or self.default_accounts.get(account)
+        key = (account, leased.account_id if leased is not None else None)
+        if key not in self.sessions:
+            session = HttpSession(self.origin)
+            login_requests = load_flow(flow_path(self.flows_dir, self.login_flows[account]))["requests"]
+            if leased is not None:
+                login_requests = fill_placeholders(login_requests, {"account": leased.account_id, "password": leased.password})
+            replay_requests(session, login_requests)
+            self.sessions[key] = session
+        return self.sessions[key]
+
+    def run_scenario(self, scenario, test_case, flow):
+        """Replay a scenario's recorded HTTP calls as test steps."""
+        test_case.start()
+        try:
+            with track_step(test_case, "API Login", f"Open HTTP session for {scenario.account} account"):
+                session = self.get_session(scenario.account)
+            for spec in flow["requests"]:
+                with track_step(test_case, f"API {spec['method']}", f"{spec['method']} {spec['url']}"):
+                    response = session.request(spec["method"], spec["url"], spec.get("body"), spec.get("headers"))
+                    check_response(spec, response)
+            return True
+        except Exception as e:
+            print(f"API replay of {scenario.name} failed: {str(e)}")
+            return False
+        finally:
+            test_case.complete()
+
+    def close(self):
+        """Close all pooled HTTP sessions."""
+        for session in self.sessions.values():
+            session.close()
+        self.sessions.clear()
@@ -0,0 +1,99 @@
+"""
+Asynchronous Artifact Writer
+Moves artifact I/O (screenshots, page snapshots, JSON, HTML) off the thread driving the browser.
+Writes go through a bounded queue to a background thread; when the queue is full, callers block
+until there is room, so a burst of captures cannot grow memory without limit.
+"""
+
+import gzip
+import json
+import os
+import queue
+import threading
+import time
+
+class ArtifactWriter:
+    """Background writer for run artifacts with a bounded queue."""
+
+    def __init__(self, max_pending=32):
+        self._queue = queue.Queue(maxsize=max_pending)
+        self.written = []
+        self.errors = []
+        self.blocked_time = 0
+        self._thread = threading.Thread(target=self._run, name="artifact-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                function, path, args = job
+                function(path, *args)
+                self.written.append(path)
+            except Exception as e:
+                self.errors.append((path, str(e)))
+                print(f"⚠️ Failed to write artifact {path}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def _submit(self, function, path, *args):
+        if not self._thread.is_alive():
+            raise RuntimeError("Artifact writer is closed")
+        job = (function, path, args)
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            # Back-pressure: wait for the writer instead of buffering without limit
+            started = time.time()
+            self._queue.put(job)
+            self.blocked_time += time.time() - started
+        return path
+
+    @staticmethod
+    def _open(path, binary, compress):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        opener = gzip.open if compress else open
+        return opener(path, 'wb') if binary else opener(path, 'wt', encoding='utf-8')
+
+    @staticmethod
+    def _compressed_path(path, compress):
+        return path if not compress or path.endswith(".gz") else path + ".gz"
+
+    def write_bytes(self, path, data, compress=False):
+        """Queue a binary write (e.g. a PNG) and return the final path."""
+        def write(path, data):
+            with self._open(path, True, compress) as f:
+                f.write(data)
+        return self._submit(write, self._compressed_path(path, compress), data)
+
+    def write_text(self, path, text, compress=False):
+        """Queue a UTF-8 text write (HTML, MHTML, ...) and return the final path.
+
+        text may also be a callable returning the text, to move rendering off the caller's thread too.
+        """
+        def write(path, text):
+            with self._open(path, False, compress) as f:
+                f.write(text() if callable(text) else text)
+        return self._submit(write, self._compressed_path(path, compress), text)
+
+    def write_json(self, path, data, compress=False):
+        """Queue a JSON write and return the final path."""
+        def write(path, data):
+            with self._open(path, False, compress) as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+        return self._submit(write, self._compressed_path(path, compress), data)
+
+    def flush(self):
+        """Wait until every queued artifact has been written."""
+        self._queue.join()
+
+    def close(self):
+        """Flush the queue and stop the writer thread."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if self.written or self.errors:
+            print(f"🗂️ Artifacts written: {len(self.written)}, failed: {len(self.errors)}, "
+                  f"time blocked on a full queue: {self.blocked_time:.2f}s")
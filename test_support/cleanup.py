@@ -0,0 +1,169 @@
+"""
+Created-Entity Manifest and Batch Cleanup
+Every account a scenario creates is appended to created_entities.jsonl in its run directory
+once the site has confirmed the creation. The cleanup stage collects the entities of recent
+runs that have not been deleted yet and deletes them through the admin panel's HTTP API, from
+several worker threads sharing one rate limit, so user detail pages and account lists stop
+growing from run to run.
+
+Each entity kind is deleted with the admin API requests the suite configures for it (request
+specs in the recorded flow format) in which "{name}" and "{owner}" are replaced with the
+entity's values. A kind without requests fails the cleanup stage instead of leaving its
+entities behind unnoticed.
+"""
+
+import glob
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from test_support.http_flows import HttpSession, fill_placeholders, replay_requests
+
+MANIFEST_FILE = "created_entities.jsonl"
+CLEANED_FILE = "cleaned_entities.jsonl"
+# An entity that keeps failing to delete (e.g. already deleted by hand) is not retried forever
+MAX_CLEANUP_ATTEMPTS = 3
+# Only runs this recent are scanned; older manifests have been cleaned or given up on
+DEFAULT_MAX_AGE_DAYS = 7
+
+def _append_line(path, record, lock):
+    # One short write per line in append mode, so lines from parallel processes never interleave
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    with lock:
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(line)
+
+def _read_lines(path):
+    if not os.path.exists(path):
+        return []
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+    return records
+
+class EntityManifest:
+    """Append-only record of the entities created during one run."""
+
+    def __init__(self, run_dir):
+        self.run_dir = run_dir
+        self.path = os.path.join(run_dir, MANIFEST_FILE)
+        self._lock = threading.Lock()
+        self._submitted = None
+
+    def submit(self, kind, name, owner=None, scenario=None):
+        """Remember an entity whose name was just submitted; confirm() records it once it was created."""
+        self._submitted = {'kind': kind, 'name': name, 'owner': owner, 'scenario': scenario}
+
+    def confirm(self, scenario=None):
+        """Record the entity the scenario submitted now that the site reported it created."""
+        submitted, self._submitted = self._submitted, None
+        if submitted is None or submitted['scenario'] != scenario:
+            return None
+        self.record(**submitted)
+        return submitted['name']
+
+    def record(self, kind, name, owner=None, scenario=None):
+        """Record a created entity."""
+        _append_line(self.path, {'kind': kind, 'name': name, 'owner': owner, 'scenario': scenario,
+                                 'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}, self._lock)
+
+def find_pending_entities(reports_root, kinds=None, max_age_days=DEFAULT_MAX_AGE_DAYS):
+    """Collect the recorded entities of recent runs under reports_root that have not been cleaned up yet."""
+    pending = []
+    paths = glob.glob(os.path.join(reports_root, "*", MANIFEST_FILE)) + \
+        glob.glob(os.path.join(reports_root, "*", "*", MANIFEST_FILE))
+    oldest = time.time() - max_age_days * 86400
+    for path in sorted(paths):
+        if os.path.getmtime(path) < oldest:
+            continue
+        run_dir = os.path.dirname(path)
+        done = set()
+        attempts = {}
+        for record in _read_lines(os.path.join(run_dir, CLEANED_FILE)):
+            key = (record['kind'], record['name'])
+            attempts[key] = attempts.get(key, 0) + 1
+            if record['deleted'] or attempts[key] >= MAX_CLEANUP_ATTEMPTS:
+                done.add(key)
+        for entity in _read_lines(path):
+            if (kinds is None or entity['kind'] in kinds) and (entity['kind'], entity['name']) not in done:
+                entity['run_dir'] = run_dir
+                pending.append(entity)
+    return pending
+
+class RateLimiter:
+    """Spaces calls from any number of threads at least 1/rate seconds apart."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            slot = max(self._next_slot, time.monotonic())
+            self._next_slot = slot + self.interval
+        time.sleep(max(0, slot - time.monotonic()))
+
+class BatchCleanup:
+    """Deletes recorded entities through the admin API with a shared rate limit."""
+
+    def __init__(self, origin, delete_requests, cookies, workers=4, rate=5):
+        self.origin = origin
+        self.delete_requests = delete_requests      # Entity kind -> request specs that delete one entity
+        self.cookies = cookies
+        self.workers = workers
+        self.rate_limiter = RateLimiter(rate)
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+
+    def get_delete_requests(self, kinds):
+        """Get the delete requests of each kind, raising LookupError when any kind has none."""
+        missing = sorted(kind for kind in kinds if not self.delete_requests.get(kind))
+        if missing:
+            raise LookupError(f"No delete requests for entity kinds: {', '.join(missing)}")
+        return {kind: self.delete_requests[kind] for kind in kinds}
+
+    def _get_session(self):
+        # HttpSession keeps one connection per host and is not thread-safe, so each worker has its own
+        if not hasattr(self._local, "session"):
+            self._local.session = HttpSession(self.origin, self.cookies)
+            with self._lock:
+                self._sessions.append(self._local.session)
+        return self._local.session
+
+    def _delete(self, entity, requests):
+        self.rate_limiter.wait()
+        try:
+            replay_requests(self._get_session(), fill_placeholders(requests, {'name': entity['name'], 'owner': entity.get('owner')}))
+            deleted = True
+        except Exception as e:
+            print(f"⚠️ Could not delete {entity['kind']} {entity['name']}: {str(e)}")
+            deleted = False
+        _append_line(os.path.join(entity['run_dir'], CLEANED_FILE),
+                     {'kind': entity['kind'], 'name': entity['name'], 'deleted': deleted,
+                      'cleaned_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}, self._lock)
+        return deleted
+
+    def run(self, entities):
+        """Delete the entities in parallel and return (deleted, failed) counts."""
+        delete_requests = self.get_delete_requests({entity['kind'] for entity in entities})
+        work = [(entity, delete_requests[entity['kind']]) for entity in entities]
+        if not work:
+            return 0, 0
+
+        print(f"\n🧹 Cleaning up {len(work)} created entities ({self.workers} workers, {1 / self.rate_limiter.interval:g}/s)")
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="cleanup") as executor:
+            results = list(executor.map(lambda item: self._delete(*item), work))
+        for session in self._sessions:
+            session.close()
+        deleted = results.count(True)
+        print(f"🧹 Deleted {deleted}/{len(work)} entities in {time.perf_counter() - start:.1f}s")
+        return deleted, len(work) - deleted
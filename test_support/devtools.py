@@ -0,0 +1,86 @@
+"""
+DevTools Event Listeners
+Runs Chrome DevTools Protocol listeners on a background thread so scenarios keep driving the browser.
+"""
+
+import json
+import re
+import threading
+import urllib.request
+
+from test_support.lazy_imports import lazy_import
+
+# Loaded when the first listener starts, so importing the suites stays fast
+trio = lazy_import("trio")
+cdp = lazy_import("selenium.webdriver.common.bidi.cdp")
+
+# Errors Chrome answers with once a tab and its DevTools session are gone
+SESSION_CLOSED_MESSAGE = re.compile(r"session with given id not found|no target with given id|target closed", re.IGNORECASE)
+
+def is_session_closed(error):
+    """Check whether a DevTools error only means the tab the session belonged to was closed."""
+    return isinstance(error, cdp.BrowserError) and bool(SESSION_CLOSED_MESSAGE.search(str(error.message or "")))
+
+def get_browser_websocket_url(driver):
+    """Get the browser-level DevTools websocket URL of a ChromeDriver session."""
+    debugger_address = driver.capabilities["goog:chromeOptions"]["debuggerAddress"]
+    with urllib.request.urlopen(f"http://{debugger_address}/json/version", timeout=5) as response:
+        return json.loads(response.read())["webSocketDebuggerUrl"]
+
+def get_devtools_module(driver):
+    """Import the generated DevTools bindings matching the browser version."""
+    return cdp.import_devtools(driver.capabilities["browserVersion"].split(".")[0])
+
+class DevToolsListener:
+    """Runs an async listener on its own DevTools connection in a background thread.
+
+    The listener is called as `await listener(connection, devtools, ready)` and must call
+    ready.set() once its subscriptions are in place; start() blocks until then.
+    """
+
+    def __init__(self, driver, listener, name="devtools-listener"):
+        self.listener = listener
+        self.error = None
+        self._ws_url = get_browser_websocket_url(driver)
+        self._devtools = get_devtools_module(driver)
+        self._ready = threading.Event()
+        self._cancel_scope = None
+        self._trio_token = None
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self, timeout=10):
+        """Start the listener thread and wait until it is subscribed."""
+        self._thread.start()
+        self._ready.wait(timeout)
+        return self
+
+    def _run(self):
+        try:
+            trio.run(self._main)
+        except Exception as e:
+            self.error = e
+        finally:
+            self._ready.set()
+
+    async def _main(self):
+        self._trio_token = trio.lowlevel.current_trio_token()
+        with trio.CancelScope() as cancel_scope:
+            self._cancel_scope = cancel_scope
+            async with cdp.open_cdp(self._ws_url) as connection:
+                await self.listener(connection, self._devtools, self._ready)
+
+    def is_running(self):
+        return self._thread.is_alive()
+    
+    def call_soon(self, function, *args):
+        """Run a synchronous function on the listener's event loop from another thread."""
+        return trio.from_thread.run_sync(function, *args, trio_token=self._trio_token)
+
+    def stop(self, timeout=5):
+        """Cancel the listener and wait for its thread to exit."""
+        if self._thread.is_alive() and self._cancel_scope is not None:
+            try:
+                trio.from_thread.run_sync(self._cancel_scope.cancel, trio_token=self._trio_token)
+            except trio.RunFinishedError:
+                pass
+        self._thread.join(timeout)
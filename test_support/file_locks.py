@@ -0,0 +1,48 @@
+"""
+Cross-Process File Locks
+Exclusive locks on lock files (flock, or msvcrt on Windows) for state shared by suite
+processes running side by side. The operating system drops a lock when its process dies.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+def try_lock(lock_file):
+    """Try to take an exclusive lock on an open file without waiting."""
+    try:
+        if os.name == "nt":
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+def unlock(lock_file):
+    """Release a lock taken with try_lock."""
+    if os.name == "nt":
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+@contextmanager
+def locked(path, timeout=30, poll_interval=0.05):
+    """Hold an exclusive lock on path (created if missing) for the duration of a with block."""
+    deadline = time.time() + timeout
+    with open(path, 'a+', encoding='utf-8') as lock_file:
+        while not try_lock(lock_file):
+            if time.time() >= deadline:
+                raise TimeoutError(f"Could not lock {path} within {timeout}s")
+            time.sleep(poll_interval)
+        try:
+            yield lock_file
+        finally:
+            unlock(lock_file)
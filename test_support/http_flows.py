@@ -0,0 +1,150 @@
+"""
+HTTP Flow Replay
+Browser-less replay of the HTTP requests behind a purchase flow over keep-alive connections.
+
+A flow is a JSON document:
+    {
+        "name": "balance_purchase_supreme",
+        "base_url": "https://test-ip-tianqi.cd.xiaoxigroup.net",
+        "login": [<request>, ...],          # optional, run once per session
+        "requests": [<request>, ...],       # the flow itself
+        "balance": <request> + {"field": "data.balance"},   # optional
+        "amount_field": "data.amount"       # optional, read from the last response
+    }
+where each request is {"method", "url", "headers", "body", "expect_status", "expect_json"}.
+Strings in a request may hold placeholders such as "{account}", filled in with fill_placeholders().
+"""
+
+import http.client
+import json
+from http.cookies import SimpleCookie
+from urllib.parse import urlsplit
+
+class FlowAssertionError(Exception):
+    """Raised when a replayed response does not match the flow's expectations."""
+
+class HttpResponse:
+    """Status, headers and body of a replayed request."""
+
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        """Decode the response body as JSON."""
+        return json.loads(self.body.decode("utf-8"))
+
+class HttpSession:
+    """HTTP client that keeps one persistent connection per host and carries cookies."""
+
+    def __init__(self, base_url, cookies=None, timeout=20):
+        self.base_url = base_url.rstrip("/")
+        self.cookies = dict(cookies or {})
+        self.timeout = timeout
+        self._connections = {}
+
+    def _get_connection(self, scheme, netloc):
+        """Get the pooled connection for a host, opening it on first use."""
+        key = (scheme, netloc)
+        if key not in self._connections:
+            connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            self._connections[key] = connection_class(netloc, timeout=self.timeout)
+        return key, self._connections[key]
+
+    def request(self, method, url, body=None, headers=None):
+        """Send a request on the pooled connection and return an HttpResponse."""
+        if url.startswith("/"):
+            url = self.base_url + url
+        parts = urlsplit(url)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+        headers = dict(headers or {})
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{name}={value}" for name, value in self.cookies.items())
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            headers.setdefault("Content-Type", "application/json")
+        elif isinstance(body, str):
+            body = body.encode("utf-8")
+
+        for attempt in range(2):
+            key, connection = self._get_connection(parts.scheme, parts.netloc)
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+                break
+            except (http.client.RemoteDisconnected, http.client.CannotSendRequest, ConnectionResetError, BrokenPipeError):
+                # The server closed an idle keep-alive connection; reconnect once
+                connection.close()
+                del self._connections[key]
+                if attempt:
+                    raise
+
+        for header, value in response.getheaders():
+            if header.lower() == "set-cookie":
+                cookie = SimpleCookie()
+                cookie.load(value)
+                for name, morsel in cookie.items():
+                    self.cookies[name] = morsel.value
+
+        return HttpResponse(response.status, dict(response.getheaders()), data)
+
+    def close(self):
+        """Close all pooled connections."""
+        for connection in self._connections.values():
+            connection.close()
+        self._connections.clear()
+
+def load_flow(path):
+    """Load a flow definition from a JSON file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def fill_placeholders(value, values):
+    """Replace "{name}" placeholders throughout a request spec with values[name]."""
+    if isinstance(value, str):
+        for name, replacement in values.items():
+            value = value.replace("{" + name + "}", str(replacement if replacement is not None else ""))
+        return value
+    if isinstance(value, dict):
+        return {key: fill_placeholders(item, values) for key, item in value.items()}
+    if isinstance(value, list):
+        return [fill_placeholders(item, values) for item in value]
+    return value
+
+def get_field(data, field_path):
+    """Get a nested value from decoded JSON using a dotted path such as 'data.balance'."""
+    for part in field_path.split("."):
+        data = data[int(part)] if isinstance(data, list) else data[part]
+    return data
+
+def check_response(spec, response):
+    """Assert a response against the expectations recorded in a request spec."""
+    expected_status = spec.get("expect_status")
+    if expected_status is not None and response.status != expected_status:
+        raise FlowAssertionError(f"{spec['method']} {spec['url']} returned {response.status}, expected {expected_status}")
+
+    expected_json = spec.get("expect_json")
+    if expected_json:
+        try:
+            payload = response.json()
+        except ValueError:
+            raise FlowAssertionError(f"{spec['method']} {spec['url']} did not return JSON")
+        for field_path, expected in expected_json.items():
+            try:
+                actual = get_field(payload, field_path)
+            except (KeyError, IndexError, TypeError):
+                raise FlowAssertionError(f"{spec['method']} {spec['url']} response has no field '{field_path}'")
+            if actual != expected:
+                raise FlowAssertionError(f"{spec['method']} {spec['url']} returned {field_path}={actual!r}, expected {expected!r}")
+
+def replay_requests(session, request_specs):
+    """Replay request specs in order on a session, asserting each response."""
+    responses = []
+    for spec in request_specs:
+        response = session.request(spec["method"], spec["url"], spec.get("body"), spec.get("headers"))
+        check_response(spec, response)
+        responses.append(response)
+    return responses
@@ -0,0 +1,122 @@
+"""
+Unique Identifiers
+Hands out account names that never collide across runs or across the processes of a run.
+
+A name is the run's 4-character tag (starting with a letter) followed by a 4-character
+sequence number, both base 36, so it keeps the 8 lowercase alphanumeric characters the
+account forms accept. Run tags are
+allocated from a counter shared by all runs under the reports directory; sequence numbers are
+handed out in blocks from the run directory's identifiers.json, so a process only takes the
+file lock once per block. Every name is logged with the scenario that asked for it, so
+trace_identifier() can tell which run and scenario created an account found on the site.
+"""
+
+import json
+import os
+import string
+import threading
+
+from test_support.file_locks import locked
+
+ALPHABET = string.digits + string.ascii_lowercase
+TAG_LENGTH = 4
+SEQUENCE_LENGTH = 4
+BLOCK_SIZE = 50
+# Run tags start at "a000" so every name starts with a letter and never looks like a phone number
+TAG_OFFSET = 10 * len(ALPHABET) ** (TAG_LENGTH - 1)
+IDENTIFIERS_DIR = ".identifiers"
+RUN_TAGS_FILE = "run_tags.jsonl"
+STATE_FILE = "identifiers.json"
+ISSUED_FILE = "identifiers.jsonl"
+
+def to_base36(number, length):
+    """Encode a number as fixed-width base 36."""
+    if number >= len(ALPHABET) ** length:
+        raise OverflowError(f"{number} does not fit in {length} base-36 characters")
+    digits = []
+    for _ in range(length):
+        number, digit = divmod(number, len(ALPHABET))
+        digits.append(ALPHABET[digit])
+    return "".join(reversed(digits))
+
+def _read_json(path, default):
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return default
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _write_json(path, data):
+    temp_path = path + ".tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
+
+def allocate_run_tag(reports_root, run_dir):
+    """Allocate the next run tag from the counter shared by all runs and remember which run got it."""
+    shared_dir = os.path.join(reports_root, IDENTIFIERS_DIR)
+    os.makedirs(shared_dir, exist_ok=True)
+    counter_path = os.path.join(shared_dir, "run_counter.json")
+    with locked(os.path.join(shared_dir, "run_counter.lock")):
+        number = _read_json(counter_path, {'next': 0})['next']
+        _write_json(counter_path, {'next': number + 1})
+        run_tag = to_base36(TAG_OFFSET + number, TAG_LENGTH)
+        with open(os.path.join(shared_dir, RUN_TAGS_FILE), 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'tag': run_tag, 'run_dir': os.path.abspath(run_dir)}) + "\n")
+    return run_tag
+
+class IdentifierGenerator:
+    """Per-process source of unique, run-tagged names for one run directory."""
+
+    def __init__(self, run_dir, reports_root, block_size=BLOCK_SIZE):
+        self.run_dir = run_dir
+        self.block_size = block_size
+        self.state_path = os.path.join(run_dir, STATE_FILE)
+        self.issued_path = os.path.join(run_dir, ISSUED_FILE)
+        self._lock = threading.Lock()
+        self._block = iter(())
+        # A resumed run keeps its tag and continues after the numbers it already used
+        with locked(self.state_path + ".lock"):
+            state = _read_json(self.state_path, None)
+            if state is None:
+                state = {'run_tag': allocate_run_tag(reports_root, run_dir), 'next': 0}
+                _write_json(self.state_path, state)
+        self.run_tag = state['run_tag']
+
+    def _allocate_block(self):
+        with locked(self.state_path + ".lock"):
+            state = _read_json(self.state_path, None)
+            start = state['next']
+            state['next'] = start + self.block_size
+            _write_json(self.state_path, state)
+        return iter(range(start, start + self.block_size))
+
+    def next_name(self, scenario=None, kind=None):
+        """Get a new unique name and log which scenario it was issued to."""
+        with self._lock:
+            number = next(self._block, None)
+            if number is None:
+                self._block = self._allocate_block()
+                number = next(self._block)
+            name = self.run_tag + to_base36(number, SEQUENCE_LENGTH)
+            with open(self.issued_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'name': name, 'kind': kind, 'scenario': scenario, 'pid': os.getpid()},
+                                   ensure_ascii=False) + "\n")
+        return name
+
+def trace_identifier(reports_root, name):
+    """Find the run directory and the issue record of a generated name, or None."""
+    tags_path = os.path.join(reports_root, IDENTIFIERS_DIR, RUN_TAGS_FILE)
+    if not os.path.exists(tags_path):
+        return None
+    with open(tags_path, 'r', encoding='utf-8') as f:
+        run_dirs = {entry['tag']: entry['run_dir'] for entry in map(json.loads, filter(str.strip, f))}
+    run_dir = run_dirs.get(name[:TAG_LENGTH])
+    if run_dir is None:
+        return None
+    issued_path = os.path.join(run_dir, ISSUED_FILE)
+    if os.path.exists(issued_path):
+        with open(issued_path, 'r', encoding='utf-8') as f:
+            for record in map(json.loads, filter(str.strip, f)):
+                if record['name'] == name:
+                    return {'run_dir': run_dir, **record}
+    return {'run_dir': run_dir, 'name': name}
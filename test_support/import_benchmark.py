@@ -0,0 +1,96 @@
+"""
+Import-Time Benchmark
+Imports each suite module in a fresh interpreter and checks that it stays under the import-time
+target and loads neither selenium.webdriver nor trio, so collection, --plan and report tooling
+start in milliseconds. Exits non-zero when a module misses the target.
+
+    python -m test_support.import_benchmark
+    python -m test_support.import_benchmark --target-ms 150 --repeat 7
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SUITE_DIR = os.path.join(REPO_ROOT, "Test_Scenario")
+
+SUITE_MODULES = ["website_Payment_Tests", "Admin_Payment_Tests"]
+IMPORT_TIME_TARGET_MS = 200
+# Modules that belong to running scenarios, not to importing the suite
+HEAVY_MODULES = ["selenium.webdriver", "trio", "pytest"]
+
+# Measured in the child so interpreter startup is not counted
+_MEASURE = """
+import json, sys, time
+sys.path.insert(0, {suite_dir!r})
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "heavy": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+def measure_import(module, repeat=5):
+    """Import a module in `repeat` fresh interpreters; return the median milliseconds and heavy modules loaded."""
+    timings = []
+    heavy = []
+    for _ in range(repeat):
+        code = _MEASURE.format(suite_dir=SUITE_DIR, module=module, heavy=HEAVY_MODULES)
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, timeout=120, cwd=REPO_ROOT)
+        if result.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{result.stderr.strip()}")
+        sample = json.loads(result.stdout.strip().splitlines()[-1])
+        timings.append(sample["ms"])
+        heavy = sample["heavy"]
+    return statistics.median(timings), heavy
+
+def get_slowest_imports(module, count=5):
+    """Use -X importtime to find the imports that contribute most to a module's import time."""
+    code = f"import sys; sys.path.insert(0, {SUITE_DIR!r}); import {module}"
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True,
+                            timeout=120, cwd=REPO_ROOT)
+    # Children are listed before their parent, indented two more spaces per level
+    children = []
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        depth = (len(parts[2]) - len(parts[2].lstrip())) // 2
+        name = parts[2].strip()
+        if depth == 0:
+            if name == module:
+                return sorted(children, reverse=True)[:count]
+            children = []
+        elif depth == 1:
+            children.append((int(parts[1]) / 1000, name))
+    return []
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark how long importing the suite modules takes")
+    parser.add_argument("--target-ms", type=float, default=IMPORT_TIME_TARGET_MS,
+                        help="Median import time each suite module must stay under")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--module", action="append", choices=SUITE_MODULES,
+                        help="Only benchmark this module (repeatable)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    failures = 0
+    for module in args.module or SUITE_MODULES:
+        median_ms, heavy = measure_import(module, args.repeat)
+        ok = median_ms <= args.target_ms and not heavy
+        print(f"{'✅' if ok else '❌'} {module}: {median_ms:.0f} ms (target {args.target_ms:.0f} ms)")
+        if heavy:
+            print(f"   Loaded at import: {', '.join(heavy)}")
+        if not ok:
+            failures += 1
+            for cumulative_ms, name in get_slowest_imports(module):
+                print(f"   {cumulative_ms:7.1f} ms  {name}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""
+Lazy Imports
+Importing anything under selenium.webdriver loads every browser binding, and trio and the
+DevTools bindings add more on top; together they make up most of the suites' import time.
+lazy_import() returns a stand-in that imports the real module or attribute on first use,
+so tooling that only inspects the suites (--plan, report regeneration, listing scenarios)
+never pays for them.
+
+Exceptions used in `except` clauses must stay real imports; selenium.common.exceptions is cheap.
+"""
+
+import importlib
+import threading
+
+class Lazy:
+    """Stand-in for an object built by factory() on its first attribute access or call."""
+
+    def __init__(self, factory, name=None):
+        self._factory = factory
+        self._name = name or getattr(factory, "__name__", "object")
+        self._target = None
+        self._lock = threading.Lock()
+
+    def _resolve(self):
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    self._target = self._factory()
+        return self._target
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+    def __repr__(self):
+        state = "loaded" if self._target is not None else "not loaded"
+        return f"<lazy {self._name} ({state})>"
+
+def lazy_import(module, attribute=None):
+    """Defer `import module` (or `from module import attribute`) until the name is first used."""
+    def load():
+        loaded = importlib.import_module(module)
+        return getattr(loaded, attribute) if attribute else loaded
+    return Lazy(load, f"{module}.{attribute}" if attribute else module)
@@ -0,0 +1,254 @@
+"""
+Concurrent-Buyer Load Mode
+Drives the balance purchase flow from many sessions at once and records throughput,
+latency percentiles, error rates and balance consistency.
+
+    python -m test_support.load_mode --standin --concurrency 20 --purchases 200
+    python -m test_support.load_mode --flow flows/balance_purchase.json --concurrency 10 --purchases 50
+    python -m test_support.load_mode --mode browser --flow flows/balance_check.json --concurrency 4 --purchases 8
+
+Browser mode cannot see what each purchase charged, so its flow gives the login and "balance"
+requests used to read the balance before and after the run and the package "price" (in the
+balance's units) every successful purchase is expected to cost.
+"""
+
+import argparse
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(REPO_ROOT)
+from test_reports.test_report import TestCase
+from test_support.http_flows import HttpSession, load_flow, replay_requests, get_field
+from test_support.standin_server import start_standin_server, standin_purchase_flow
+
+REPORT_ROOT = os.path.join(REPO_ROOT, "Test_Scenario", "reports")
+
+# Stand-in account mirroring PHONE_WITH_BALANCE in the website suite
+STANDIN_PHONE = "15332595364"
+STANDIN_PASSWORD = "Test@123"
+STANDIN_BALANCE = 100000000  # fen
+
+# ===== Utility Functions =====
+def create_report_dir():
+    """Creates a unique report directory with timestamp"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    test_dir = os.path.join(REPORT_ROOT, f"Load_Tests_{timestamp}")
+    os.makedirs(test_dir, exist_ok=True)
+    return test_dir
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def read_balance(flow):
+    """Log in with a fresh session and read the account balance described by the flow."""
+    session = HttpSession(flow["base_url"])
+    try:
+        replay_requests(session, flow.get("login", []))
+        response = replay_requests(session, [flow["balance"]])[0]
+        return Decimal(str(get_field(response.json(), flow["balance"]["field"])))
+    finally:
+        session.close()
+
+# ===== HTTP Sessions =====
+def _http_session(flow, claim_purchase, samples, samples_lock):
+    """Run purchases on one keep-alive session until the shared budget is used up."""
+    session = HttpSession(flow["base_url"])
+    try:
+        try:
+            replay_requests(session, flow.get("login", []))
+        except Exception as e:
+            with samples_lock:
+                samples.append({"success": False, "latency": 0.0, "error": f"Login failed: {e}", "amount": None})
+            return
+
+        while claim_purchase():
+            start = time.perf_counter()
+            try:
+                responses = replay_requests(session, flow["requests"])
+                amount = None
+                if flow.get("amount_field"):
+                    amount = str(get_field(responses[-1].json(), flow["amount_field"]))
+                sample = {"success": True, "latency": time.perf_counter() - start, "error": None, "amount": amount}
+            except Exception as e:
+                sample = {"success": False, "latency": time.perf_counter() - start, "error": str(e), "amount": None}
+            with samples_lock:
+                samples.append(sample)
+    finally:
+        session.close()
+
+def run_http_load(flow, concurrency, purchases):
+    """Replay the flow's purchase requests from concurrent sessions."""
+    counter = itertools.count()
+    counter_lock = threading.Lock()
+
+    def claim_purchase():
+        with counter_lock:
+            return next(counter) < purchases
+
+    samples = []
+    samples_lock = threading.Lock()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="load-session") as executor:
+        for _ in range(concurrency):
+            executor.submit(_http_session, flow, claim_purchase, samples, samples_lock)
+    return samples
+
+# ===== Browser Sessions =====
+def _browser_session(purchases, price=None):
+    """Run balance purchases through the website suite in one browser (worker process); each success costs price."""
+    sys.path.insert(0, os.path.join(REPO_ROOT, "Test_Scenario"))
+    import website_Payment_Tests as website
+
+    samples = []
+    try:
+        for i in range(purchases):
+            test_case = TestCase(f"Load purchase {i + 1}", "Balance purchase of 天启动态尊享", step_budgets=website.STEP_BUDGETS)
+            start = time.perf_counter()
+            success = website.test_balance_sufficient(None, test_case)
+            latency = time.perf_counter() - start
+            failed_steps = test_case.get_failed_step_details()
+            error = None
+            if not success:
+                error = failed_steps[0]['error_message'] if failed_steps else "Purchase failed"
+            samples.append({"success": success, "latency": latency, "error": error, "amount": price if success else None})
+    finally:
+        website.browser.quit()
+    return samples
+
+def run_browser_load(concurrency, purchases, price=None):
+    """Run the website balance purchase scenario in concurrent browser processes."""
+    per_session = [purchases // concurrency + (1 if i < purchases % concurrency else 0) for i in range(concurrency)]
+    per_session = [count for count in per_session if count]
+    with multiprocessing.get_context("spawn").Pool(len(per_session)) as pool:
+        results = pool.starmap(_browser_session, [(count, price) for count in per_session])
+    return [sample for session_samples in results for sample in session_samples]
+
+# ===== Results =====
+def summarize(samples, duration, mode, concurrency):
+    """Aggregate load samples into throughput, latency percentiles and error counts."""
+    succeeded = [s for s in samples if s["success"]]
+    latencies = sorted(s["latency"] for s in succeeded)
+    errors = Counter(s["error"] for s in samples if not s["success"])
+    return {
+        "mode": mode,
+        "concurrency": concurrency,
+        "purchases": len(samples),
+        "succeeded": len(succeeded),
+        "failed": len(samples) - len(succeeded),
+        "error_rate": (len(samples) - len(succeeded)) / len(samples) if samples else 0.0,
+        "duration": duration,
+        "throughput": len(succeeded) / duration if duration else 0.0,
+        "latency_p50": percentile(latencies, 50),
+        "latency_p90": percentile(latencies, 90),
+        "latency_p95": percentile(latencies, 95),
+        "latency_p99": percentile(latencies, 99),
+        "latency_max": latencies[-1] if latencies else None,
+        "errors": dict(errors.most_common(10))
+    }
+
+def print_summary(summary):
+    """Print the load run summary in the suite's console format."""
+    def fmt(value):
+        return f"{value:.3f}s" if value is not None else "N/A"
+
+    print("\n" + "="*60)
+    print("LOAD TEST RESULTS")
+    print("="*60)
+    print(f"Mode: {summary['mode']}  Concurrency: {summary['concurrency']}")
+    print(f"Purchases: {summary['purchases']}  Succeeded: {summary['succeeded']}  Failed: {summary['failed']}")
+    print(f"Error rate: {summary['error_rate']:.1%}")
+    print(f"Throughput: {summary['throughput']:.2f} purchases/s over {summary['duration']:.2f}s")
+    print(f"Latency p50: {fmt(summary['latency_p50'])}  p90: {fmt(summary['latency_p90'])}  "
+          f"p95: {fmt(summary['latency_p95'])}  p99: {fmt(summary['latency_p99'])}  max: {fmt(summary['latency_max'])}")
+    for error, count in summary["errors"].items():
+        print(f"  ❌ {count}x {error}")
+    if "balance_consistent" in summary:
+        icon = "✅" if summary["balance_consistent"] else "❌"
+        print(f"{icon} Balance: before {summary['balance_before']}, after {summary['balance_after']}, "
+              f"expected {summary['balance_expected']}")
+
+def run_load(mode, concurrency, purchases, flow=None):
+    """Run a load test and return its summary, verifying the balance when the flow allows it."""
+    balance_before = read_balance(flow) if flow and flow.get("balance") else None
+
+    start = time.perf_counter()
+    if mode == "browser":
+        samples = run_browser_load(concurrency, purchases, flow.get("price") if flow else None)
+    else:
+        samples = run_http_load(flow, concurrency, purchases)
+    duration = time.perf_counter() - start
+
+    summary = summarize(samples, duration, mode, concurrency)
+
+    if balance_before is not None and all(s["amount"] is not None for s in samples if s["success"]):
+        balance_after = read_balance(flow)
+        spent = sum(Decimal(s["amount"]) for s in samples if s["success"] and s["amount"] is not None)
+        summary["balance_before"] = str(balance_before)
+        summary["balance_after"] = str(balance_after)
+        summary["balance_expected"] = str(balance_before - spent)
+        summary["balance_consistent"] = balance_after == balance_before - spent
+
+    return summary
+
+# ===== Main Execution =====
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent-buyer load mode for the balance purchase flow")
+    parser.add_argument("--mode", choices=["http", "browser"], default="http",
+                        help="Drive sessions with HTTP replay (default) or full browsers")
+    parser.add_argument("--flow", help="Flow JSON describing the purchase requests (HTTP mode), or the login and "
+                                       "balance requests and package price to check the balance with (browser mode)")
+    parser.add_argument("--standin", action="store_true", help="Run against a local stand-in server (HTTP mode)")
+    parser.add_argument("--standin-latency", type=float, default=0.0, help="Artificial stand-in latency per request in seconds")
+    parser.add_argument("--concurrency", type=int, default=10, help="Number of concurrent buyer sessions")
+    parser.add_argument("--purchases", type=int, default=100, help="Total number of purchases across all sessions")
+    args = parser.parse_args(argv)
+    if args.mode == "http" and not (args.flow or args.standin):
+        parser.error("HTTP mode needs --flow or --standin")
+    if args.mode == "browser" and not args.flow:
+        parser.error("Browser mode needs --flow with the balance request and price to check the balance")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    report_dir = create_report_dir()
+    server = None
+
+    try:
+        flow = None
+        if args.standin:
+            server = start_standin_server({STANDIN_PHONE: (STANDIN_PASSWORD, STANDIN_BALANCE)}, latency=args.standin_latency)
+            flow = standin_purchase_flow(server.base_url, STANDIN_PHONE, STANDIN_PASSWORD)
+            print(f"Stand-in server running at {server.base_url}")
+        elif args.flow:
+            flow = load_flow(args.flow)
+            if args.mode == "browser" and not (flow.get("balance") and flow.get("price")):
+                raise ValueError(f"{args.flow} needs 'balance' and 'price' entries to check the balance in browser mode")
+
+        summary = run_load(args.mode, args.concurrency, args.purchases, flow)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    print_summary(summary)
+    results_file = os.path.join(report_dir, "load_results.json")
+    with open(results_file, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    print(f"\nLoad results saved: {results_file}")
+    return summary
+
+if __name__ == "__main__":
+    main()
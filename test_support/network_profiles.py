@@ -0,0 +1,63 @@
+"""
+Network Condition Emulation Profiles
+Applies DevTools network emulation and CPU throttling to a Chrome WebDriver session.
+"""
+
+# ===== Profiles =====
+# Latency in milliseconds, throughput in bytes per second, CPU slowdown as a multiplier.
+# DevTools packet loss only affects WebRTC traffic, so the lossy profile also degrades
+# latency and throughput to approximate retransmissions on HTTP connections.
+NETWORK_PROFILES = {
+    "lan": None,
+    "3g": {
+        "latency": 300,
+        "download_throughput": 1.6 * 1024 * 1024 / 8,
+        "upload_throughput": 750 * 1024 / 8,
+        "packet_loss": 0,
+        "cpu_slowdown": 4,
+    },
+    "high_latency": {
+        "latency": 800,
+        "download_throughput": 5 * 1024 * 1024 / 8,
+        "upload_throughput": 2 * 1024 * 1024 / 8,
+        "packet_loss": 0,
+        "cpu_slowdown": 1,
+    },
+    "lossy": {
+        "latency": 400,
+        "download_throughput": 1 * 1024 * 1024 / 8,
+        "upload_throughput": 512 * 1024 / 8,
+        "packet_loss": 10,
+        "cpu_slowdown": 2,
+    },
+}
+
+DEFAULT_NETWORK_PROFILE = "lan"
+
+def apply_network_profile(driver, profile_name):
+    """Apply a named throttling profile to the driver's current tab ("lan" removes throttling)."""
+    if profile_name not in NETWORK_PROFILES:
+        raise ValueError(f"Unknown network profile: {profile_name}")
+    
+    profile = NETWORK_PROFILES[profile_name]
+    driver.execute_cdp_cmd("Network.enable", {})
+    
+    if profile is None:
+        driver.execute_cdp_cmd("Network.emulateNetworkConditions", {
+            "offline": False,
+            "latency": 0,
+            "downloadThroughput": -1,
+            "uploadThroughput": -1,
+        })
+        driver.execute_cdp_cmd("Emulation.setCPUThrottlingRate", {"rate": 1})
+    else:
+        driver.execute_cdp_cmd("Network.emulateNetworkConditions", {
+            "offline": False,
+            "latency": profile["latency"],
+            "downloadThroughput": profile["download_throughput"],
+            "uploadThroughput": profile["upload_throughput"],
+            "packetLoss": profile["packet_loss"],
+        })
+        driver.execute_cdp_cmd("Emulation.setCPUThrottlingRate", {"rate": profile["cpu_slowdown"]})
+    
+    print(f"🌐 Applied network profile: {profile_name}")
@@ -0,0 +1,108 @@
+"""
+Fail-Fast Scenario Ordering
+Runs the scenarios most likely to fail first, so a broken build shows up in the first
+minutes instead of at the end of the run.
+
+The likelihood comes from the run history (see FlakeHistory.get_failure_probabilities),
+raised for scenarios whose test function, or a helper it calls, changed since a git ref:
+by default the merge-base with the main branch, so a CI build of a branch sees every
+change the branch makes, committed or not.
+
+Scenarios that share an account stay together, so reordering never makes a later
+scenario run logged in with another scenario's account.
+"""
+
+import ast
+import os
+import re
+import subprocess
+
+# Branches tried, in order, for the merge-base when no ref is given
+BASE_BRANCHES = ["main", "origin/main", "master", "origin/master"]
+
+def get_base_ref(cwd, branches=BASE_BRANCHES):
+    """Get the merge-base of HEAD with the first base branch that exists, or HEAD when there is none."""
+    for branch in branches:
+        result = subprocess.run(["git", "merge-base", "HEAD", branch], cwd=cwd,
+                                capture_output=True, text=True, timeout=30)
+        if result.returncode == 0 and result.stdout.strip():
+            return result.stdout.strip()
+    return "HEAD"
+
+def get_changed_lines(path, ref=None):
+    """Get the line numbers of `path` that differ from `ref` (the merge-base with the main branch by default)."""
+    cwd = os.path.dirname(os.path.abspath(path))
+    if ref is None:
+        ref = get_base_ref(cwd)
+    result = subprocess.run(["git", "diff", "-U0", ref, "--", os.path.basename(path)], cwd=cwd,
+                            capture_output=True, text=True, timeout=30, check=True)
+    changed = set()
+    for match in re.finditer(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@", result.stdout, re.MULTILINE):
+        start, count = int(match.group(1)), int(match.group(2) if match.group(2) is not None else 1)
+        # A pure deletion (count 0) still marks the line it happened at
+        changed.update(range(start, start + max(count, 1)))
+    return changed
+
+def get_function_calls(tree):
+    """Map each top-level function to the names it calls, directly or through other functions."""
+    calls = {}
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef):
+            calls[node.name] = {call.func.id for call in ast.walk(node)
+                                if isinstance(call, ast.Call) and isinstance(call.func, ast.Name)}
+    # Transitive closure over the module's own functions
+    changed = True
+    while changed:
+        changed = False
+        for name, called in calls.items():
+            indirect = set().union(*(calls.get(callee, set()) for callee in called)) - called
+            if indirect:
+                called |= indirect
+                changed = True
+    return calls
+
+def get_changed_scenarios(scenarios, module_path, ref=None):
+    """Get the keys of scenarios whose test function or any helper it uses changed since ref."""
+    try:
+        changed_lines = get_changed_lines(module_path, ref)
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"⚠️ No code-change hints: {str(e)}")
+        return set()
+    if not changed_lines:
+        return set()
+
+    with open(module_path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    changed_functions = {node.name for node in tree.body if isinstance(node, ast.FunctionDef)
+                         and changed_lines & set(range(node.lineno, node.end_lineno + 1))}
+    calls = get_function_calls(tree)
+    return {scenario.key for scenario in scenarios
+            if scenario.test_func.__name__ in changed_functions
+            or calls.get(scenario.test_func.__name__, set()) & changed_functions}
+
+def order_fail_fast(scenarios, failure_probabilities, changed_keys=(), change_boost=0.5):
+    """Sort scenarios by descending chance of failing; ties keep the source order.
+
+    A changed scenario has its chance of passing cut by change_boost; scenarios without
+    history count as 50/50. Scenarios are sorted within their Scenario.account group and
+    the groups run in order of their likeliest failure, so the browser switches accounts
+    once per group instead of between interleaved scenarios.
+    """
+    def priority(scenario):
+        probability = failure_probabilities.get(scenario.key, 0.5)
+        if scenario.key in changed_keys:
+            probability = 1 - (1 - probability) * (1 - change_boost)
+        return probability
+
+    groups = {}
+    for scenario in scenarios:
+        groups.setdefault(scenario.account, []).append(scenario)
+    group_order = sorted(groups, key=lambda account: max(priority(scenario) for scenario in groups[account]), reverse=True)
+    ordered = [scenario for account in group_order
+               for scenario in sorted(groups[account], key=priority, reverse=True)]
+    print("\n🎯 Fail-fast order (estimated failure probability):")
+    for scenario in ordered:
+        change_note = " (code changed)" if scenario.key in changed_keys else ""
+        account_note = f" [{scenario.account}]" if scenario.account else ""
+        print(f"   {priority(scenario):.2f}  {scenario.name}{account_note}{change_note}")
+    return ordered
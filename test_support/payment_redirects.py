@@ -0,0 +1,68 @@
+"""
+Payment Redirect Watcher
+Verifies payment-gateway redirects from DevTools target events without switching the driver's tab.
+"""
+
+import threading
+import time
+
+from test_support.devtools import DevToolsListener, trio
+
+class RedirectWatcher:
+    """Watches in the background for a tab reaching a URL and closes that tab.
+
+    Start it before the click that opens the tab, keep driving the main tab, and call
+    result() at the end of the test to join on the outcome.
+    """
+
+    def __init__(self, driver, url_fragment, timeout=20, close_tab=True):
+        self.url_fragment = url_fragment
+        self.timeout = timeout
+        self.close_tab = close_tab
+        self.started_at = None
+        self.started_at_perf = None     # perf_counter() reading, for backdating the step that joins on the result
+        self.matched_url = None
+        self.latency = None
+        self._done = threading.Event()
+        self._listener = DevToolsListener(driver, self._listen, name="redirect-watcher")
+
+    def start(self):
+        """Subscribe to target events and return immediately."""
+        self.started_at = time.time()
+        self.started_at_perf = time.perf_counter()
+        self._listener.start()
+        if self._listener.error is not None:
+            # Could not connect to DevTools; let result() report the error straight away
+            self._done.set()
+        return self
+
+    async def _listen(self, connection, devtools, ready):
+        target = devtools.target
+        try:
+            # Tabs that already exist (e.g. the main tab) only count if they navigate later
+            existing_targets = {info.target_id for info in await connection.execute(target.get_targets())}
+            events = connection.listen(target.TargetCreated, target.TargetInfoChanged, buffer_size=100)
+            await connection.execute(target.set_discover_targets(True))
+            ready.set()
+
+            with trio.move_on_after(self.timeout):
+                async for event in events:
+                    info = event.target_info
+                    if isinstance(event, target.TargetCreated) and info.target_id in existing_targets:
+                        continue
+                    if info.type_ == "page" and self.url_fragment in info.url:
+                        self.matched_url = info.url
+                        self.latency = time.perf_counter() - self.started_at_perf
+                        if self.close_tab:
+                            await connection.execute(target.close_target(info.target_id))
+                        break
+        finally:
+            self._done.set()
+
+    def result(self):
+        """Wait for the watcher to finish and return the matched URL, or None on timeout."""
+        self._done.wait(self.timeout + 5)
+        self._listener.stop()
+        if self._listener.error is not None:
+            raise self._listener.error
+        return self.matched_url
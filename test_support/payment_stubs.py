@@ -0,0 +1,132 @@
+"""
+Local Payment-Gateway Stubs
+Intercepts payment-gateway navigations and QR requests at the browser layer, answers them
+from local stubs and records each request's payload so order parameters can be asserted.
+"""
+
+import base64
+import fnmatch
+import json
+import threading
+from urllib.parse import parse_qsl, urlsplit
+
+from test_support.devtools import DevToolsListener, cdp, is_session_closed, trio
+
+STUB_PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>{gateway} stub</title></head>
+<body><h1>{gateway} payment stub</h1><p>Request intercepted by the test suite.</p></body>
+</html>"""
+
+# 1x1 transparent PNG served in place of QR code images
+STUB_PNG = base64.b64decode("iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII=")
+
+class GatewayStub:
+    """A URL pattern (DevTools wildcard syntax) answered locally instead of by the real gateway."""
+
+    def __init__(self, name, url_pattern, resource_type=None):
+        self.name = name
+        self.url_pattern = url_pattern
+        self.resource_type = resource_type  # e.g. "Document" or "Image"; None matches any
+
+    def matches(self, url, resource_type):
+        if self.resource_type is not None and resource_type != self.resource_type:
+            return False
+        return fnmatch.fnmatchcase(url, self.url_pattern)
+
+class PaymentGatewayStubs:
+    """Answers gateway requests from every tab with local stubs and records their payloads."""
+
+    def __init__(self, driver, stubs):
+        self.stubs = stubs
+        self.requests = []
+        self._lock = threading.Lock()
+        self._listener = DevToolsListener(driver, self._listen, name="payment-stubs")
+
+    def start(self):
+        """Start intercepting; raises if the DevTools connection could not be set up."""
+        self._listener.start()
+        if self._listener.error is not None:
+            raise self._listener.error
+        print(f"🧪 Payment gateway stubs active: {', '.join(stub.name for stub in self.stubs)}")
+        return self
+
+    def stop(self):
+        self._listener.stop()
+
+    def get_requests(self, gateway):
+        """Get the recorded requests that reached a gateway stub, oldest first."""
+        with self._lock:
+            return [request for request in self.requests if request["gateway"] == gateway]
+
+    def clear(self):
+        with self._lock:
+            self.requests.clear()
+
+    async def _listen(self, connection, devtools, ready):
+        target = devtools.target
+        attached = connection.listen(target.AttachedToTarget, buffer_size=100)
+        # Pause every new tab until interception is enabled so the first navigation is caught
+        await connection.execute(target.set_auto_attach(auto_attach=True, wait_for_debugger_on_start=True, flatten=True))
+        ready.set()
+
+        async with trio.open_nursery() as nursery:
+            async for event in attached:
+                session = cdp.CdpSession(connection.ws, event.session_id, event.target_info.target_id)
+                connection.sessions[event.session_id] = session
+                nursery.start_soon(self._intercept, session, devtools, event.target_info.type_)
+
+    async def _intercept(self, session, devtools, target_type):
+        fetch = devtools.fetch
+        intercepting = target_type in ("page", "iframe")
+        try:
+            paused = session.listen(fetch.RequestPaused, buffer_size=100)
+            if intercepting:
+                patterns = [
+                    fetch.RequestPattern(
+                        url_pattern=stub.url_pattern,
+                        resource_type=devtools.network.ResourceType(stub.resource_type) if stub.resource_type else None,
+                        request_stage=fetch.RequestStage.REQUEST)
+                    for stub in self.stubs
+                ]
+                await session.execute(fetch.enable(patterns=patterns))
+            await session.execute(devtools.runtime.run_if_waiting_for_debugger())
+
+            if intercepting:
+                async for event in paused:
+                    await self._fulfill(session, devtools, event)
+        except Exception as e:
+            # A closed tab takes its session with it; anything else means requests reach the real gateway
+            if not is_session_closed(e):
+                print(f"⚠️ Payment stubs stopped intercepting a {target_type} target: {type(e).__name__}: {str(e)}")
+
+    async def _fulfill(self, session, devtools, event):
+        fetch = devtools.fetch
+        request = event.request
+        resource_type = event.resource_type.value
+        stub = next((stub for stub in self.stubs if stub.matches(request.url, resource_type)), None)
+        if stub is None:
+            await session.execute(fetch.continue_request(request_id=event.request_id))
+            return
+
+        params = dict(parse_qsl(urlsplit(request.url).query))
+        if request.post_data:
+            params.update(parse_qsl(request.post_data))
+        record = {"gateway": stub.name, "url": request.url, "method": request.method, "params": params}
+        if "biz_content" in params:
+            try:
+                record["biz_content"] = json.loads(params["biz_content"])
+            except ValueError:
+                pass
+        with self._lock:
+            self.requests.append(record)
+
+        if resource_type == "Image":
+            content_type, body = "image/png", STUB_PNG
+        else:
+            content_type, body = "text/html; charset=utf-8", STUB_PAGE.format(gateway=stub.name).encode("utf-8")
+        await session.execute(fetch.fulfill_request(
+            request_id=event.request_id,
+            response_code=200,
+            response_headers=[fetch.HeaderEntry(name="Content-Type", value=content_type)],
+            body=base64.b64encode(body).decode("ascii")))
@@ -0,0 +1,102 @@
+"""
+Run Planning
+Describes what a suite run would do without starting a browser: the scenarios left after
+the filters, the order and worker they run in, the account and logins each one needs, the
+pages it opens and how long the run is expected to take.
+
+Navigations are found statically: every driver.get() in a scenario's test function or the
+helpers it calls, with module-level URL constants resolved to their values.
+"""
+
+import ast
+
+from test_support.ordering import get_function_calls
+from test_support.scheduling import format_duration, print_prediction
+
+def _get_constants(tree):
+    """Module-level string constants, with simple f-strings of other constants resolved."""
+    constants = {}
+    for node in tree.body:
+        if not (isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name)):
+            continue
+        value = _resolve(node.value, constants)
+        if value is not None:
+            constants[node.targets[0].id] = value
+    return constants
+
+def _resolve(node, constants):
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    if isinstance(node, ast.Name):
+        return constants.get(node.id)
+    if isinstance(node, ast.JoinedStr):
+        parts = []
+        for value in node.values:
+            if isinstance(value, ast.Constant):
+                parts.append(str(value.value))
+            else:
+                resolved = _resolve(value.value, constants) if isinstance(value, ast.FormattedValue) else None
+                parts.append(resolved if resolved is not None else "{" + ast.unparse(value.value) + "}")
+        return "".join(parts)
+    # URL templates such as USER_DETAIL_URL.format(user_id=...) keep their placeholders
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr == "format":
+        return _resolve(node.func.value, constants)
+    return None
+
+def find_navigations(module_path):
+    """Map each top-level function to the URLs it opens with driver.get(), directly or through helpers."""
+    with open(module_path, 'r', encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    constants = _get_constants(tree)
+    direct = {}
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef):
+            direct[node.name] = [
+                (call.lineno, _resolve(call.args[0], constants) or ast.unparse(call.args[0]))
+                for call in ast.walk(node)
+                if isinstance(call, ast.Call) and isinstance(call.func, ast.Attribute) and call.func.attr == "get"
+                and isinstance(call.func.value, ast.Name) and call.func.value.id == "driver" and call.args]
+    navigations = {}
+    for name, called in get_function_calls(tree).items():
+        found = sorted(set(direct.get(name, [])).union(*(direct.get(callee, []) for callee in called)))
+        urls = []
+        for _, url in found:
+            if url not in urls:
+                urls.append(url)
+        navigations[name] = urls
+    return navigations
+
+def get_prerequisite_chain(keys, prerequisites):
+    """Descriptions of the prerequisites behind keys, each after the ones it depends on."""
+    chain = []
+    for key in keys:
+        prerequisite = prerequisites[key]
+        for description in get_prerequisite_chain(prerequisite.requires, prerequisites) + [prerequisite.description]:
+            if description not in chain:
+                chain.append(description)
+    return chain
+
+def print_plan(assignments, scenarios, predictions, navigations, logins, history_keys=(), lane_scenarios=(),
+               lane_in_parallel=True):
+    """Print the planned scenarios per worker in run order, then the predicted run time.
+    
+    A quarantine lane that runs after the main lane in the same browser adds to the run time.
+    """
+    by_key = {scenario.key: scenario for scenario in list(scenarios) + list(lane_scenarios)}
+    print("\n📋 Run plan (no browser started)")
+    lanes = [(f"Worker {worker}" if len(assignments) > 1 else "Main lane", keys) for worker, keys in enumerate(assignments)]
+    if lane_scenarios:
+        lanes.append(("Quarantine lane (non-blocking)", [scenario.key for scenario in lane_scenarios]))
+    for lane_name, keys in lanes:
+        print(f"\n{lane_name}: {len(keys)} scenarios")
+        for position, key in enumerate(keys, 1):
+            scenario = by_key[key]
+            estimate = "" if key in history_keys else " (estimated)"
+            print(f"  {position:2d}. {scenario.name} - ~{format_duration(predictions[key])}{estimate}")
+            print(f"      Account: {scenario.account or 'none'}")
+            print(f"      Logins: {' → '.join(logins.get(key, [])) or 'none'}")
+            for url in navigations.get(scenario.test_func.__name__, []):
+                print(f"      Opens: {url}")
+    if lane_scenarios and not lane_in_parallel:
+        assignments = [assignments[0] + [scenario.key for scenario in lane_scenarios]] + assignments[1:]
+    print_prediction(assignments, predictions, history_keys)
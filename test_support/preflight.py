@@ -0,0 +1,183 @@
+"""
+Environment Pre-flight
+Probes every host a suite depends on before any scenario runs: TCP reachability, the TLS
+handshake, whether the login page is served and whether the backend API answers. All targets
+are probed in parallel with a short timeout, so a down environment is reported within seconds
+instead of after a full run of browser timeouts.
+"""
+
+import http.client
+import json
+import os
+import socket
+import ssl
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin, urlsplit
+
+from test_reports.test_report import TestStep, create_test_case
+from test_support.http_flows import load_flow
+
+PREFLIGHT_FILE = "preflight.json"
+DEFAULT_PREFLIGHT_TIMEOUT = 5
+# Certificates closer to expiry than this are flagged in the check details
+CERT_WARNING_DAYS = 14
+# Enough of the login page to find the marker without downloading large bundles
+MAX_PAGE_BYTES = 512 * 1024
+
+class HealthTarget:
+    """A host the suite depends on and the URLs used to probe it."""
+
+    def __init__(self, name, login_url, page_marker="<html", api_url=None, critical=True):
+        self.name = name
+        self.login_url = login_url
+        self.page_marker = page_marker  # Text the served login page must contain
+        self.api_url = api_url          # Any backend endpoint; a non-5xx answer means the API is alive
+        self.critical = critical        # An unhealthy non-critical target only warns
+
+class CheckResult:
+    """Outcome and latency of one probe."""
+
+    def __init__(self, name, ok, latency, detail):
+        self.name = name
+        self.ok = ok
+        self.latency = latency
+        self.detail = detail
+
+    def to_dict(self):
+        return {'check': self.name, 'ok': self.ok, 'latency_ms': round(self.latency * 1000, 1), 'detail': self.detail}
+
+class TargetHealth:
+    """All check results for one target."""
+
+    def __init__(self, target):
+        self.target = target
+        self.checks = []
+        self.started_at = time.time()
+
+    @property
+    def healthy(self):
+        return all(check.ok for check in self.checks)
+
+    def to_dict(self):
+        return {'target': self.target.name, 'url': self.target.login_url, 'critical': self.target.critical,
+                'healthy': self.healthy, 'checks': [check.to_dict() for check in self.checks]}
+
+def _timed(name, probe):
+    """Run a probe returning (ok, detail) and time it; exceptions count as a failed check."""
+    start = time.perf_counter()
+    try:
+        ok, detail = probe()
+    except Exception as e:
+        ok, detail = False, f"{type(e).__name__}: {str(e)}"
+    return CheckResult(name, ok, time.perf_counter() - start, detail)
+
+def _http_get(url, timeout, max_bytes):
+    parts = urlsplit(url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    connection = connection_class(parts.netloc, timeout=timeout)
+    try:
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        connection.request("GET", path, headers={"User-Agent": "payment-tests-preflight"})
+        response = connection.getresponse()
+        return response.status, response.read(max_bytes)
+    finally:
+        connection.close()
+
+def probe_target(target, timeout=DEFAULT_PREFLIGHT_TIMEOUT):
+    """Probe one target; later checks are skipped once the host is unreachable."""
+    health = TargetHealth(target)
+    parts = urlsplit(target.login_url)
+    host = parts.hostname
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+
+    def reachability():
+        socket.create_connection((host, port), timeout=timeout).close()
+        return True, f"{host}:{port} accepts connections"
+    health.checks.append(_timed("Reachability", reachability))
+    if not health.checks[-1].ok:
+        return health
+
+    if parts.scheme == "https":
+        def tls():
+            context = ssl.create_default_context()
+            with socket.create_connection((host, port), timeout=timeout) as sock:
+                with context.wrap_socket(sock, server_hostname=host) as tls_sock:
+                    certificate = tls_sock.getpeercert()
+                    version = tls_sock.version()
+            days_left = int((ssl.cert_time_to_seconds(certificate['notAfter']) - time.time()) / 86400)
+            warning = " - renew soon" if days_left < CERT_WARNING_DAYS else ""
+            return True, f"{version}, certificate valid for {days_left} more days{warning}"
+        health.checks.append(_timed("TLS", tls))
+        if not health.checks[-1].ok:
+            return health
+
+    def login_page():
+        status, body = _http_get(target.login_url, timeout, MAX_PAGE_BYTES)
+        if status >= 400:
+            return False, f"HTTP {status}"
+        if target.page_marker and target.page_marker.lower() not in body.decode('utf-8', 'replace').lower():
+            return False, f"HTTP {status} but the page does not contain {target.page_marker!r}"
+        return True, f"HTTP {status}, {len(body)} bytes"
+    health.checks.append(_timed("Login Page", login_page))
+
+    if target.api_url:
+        def api():
+            status, _ = _http_get(target.api_url, timeout, 64 * 1024)
+            return status < 500, f"HTTP {status} from {urlsplit(target.api_url).path}"
+        health.checks.append(_timed("API Liveness", api))
+    return health
+
+def get_flow_api_url(flow_file):
+    """Get the first backend endpoint of a recorded flow, or None when the flow has not been recorded."""
+    if not os.path.exists(flow_file):
+        return None
+    flow = load_flow(flow_file)
+    requests = flow.get("login", []) + flow.get("requests", [])
+    if not requests:
+        return None
+    return urljoin(flow["base_url"] + "/", requests[0]["url"].lstrip("/"))
+
+def run_preflight(targets, timeout=DEFAULT_PREFLIGHT_TIMEOUT, output_dir=None):
+    """Probe all targets in parallel, print the results and save them to output_dir/preflight.json."""
+    print(f"\n🩺 Pre-flight: probing {len(targets)} hosts (timeout {timeout}s)")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(targets), thread_name_prefix="preflight") as executor:
+        results = list(executor.map(lambda target: probe_target(target, timeout), targets))
+    elapsed = time.perf_counter() - start
+
+    for health in results:
+        icon = "✅" if health.healthy else "❌" if health.target.critical else "⚠️"
+        print(f"{icon} {health.target.name} ({urlsplit(health.target.login_url).hostname})")
+        for check in health.checks:
+            print(f"   {'✓' if check.ok else '✗'} {check.name}: {check.latency * 1000:.0f} ms - {check.detail}")
+    print(f"🩺 Pre-flight finished in {elapsed:.1f}s")
+
+    if output_dir is not None:
+        with open(os.path.join(output_dir, PREFLIGHT_FILE), 'w', encoding='utf-8') as f:
+            json.dump({'elapsed_seconds': round(elapsed, 2), 'targets': [health.to_dict() for health in results]},
+                      f, ensure_ascii=False, indent=2)
+    return results
+
+def get_unhealthy(results):
+    """Get the critical targets that failed a check."""
+    return [health for health in results if health.target.critical and not health.healthy]
+
+def create_preflight_test_case(results):
+    """Build a report test case with one step per check, so the probe latencies appear in the report."""
+    test_case = create_test_case("Environment Pre-flight", "Reachability, TLS, login page and API checks of every host")
+    # The probes already ran, so the test case spans their recorded times rather than being timed live
+    test_case.start_time = min((health.started_at for health in results), default=time.time())
+    for health in results:
+        check_start = health.started_at
+        for check in health.checks:
+            step = TestStep(f"{health.target.name}: {check.name}", check.detail)
+            step.start_time = check_start
+            step.complete(check.ok, None if check.ok else check.detail)
+            step.end_time = check_start + check.latency
+            check_start = step.end_time
+            test_case.add_step(step)
+    test_case.complete(not get_unhealthy(results))
+    return test_case
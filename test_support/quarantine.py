@@ -0,0 +1,48 @@
+"""
+Quarantine Lane
+Runs the scenarios with a high flake score in a separate suite process alongside the main
+run. The lane writes its own checkpoint inside the main run directory; its results are
+merged into the report but never count towards the main verdict.
+"""
+
+import os
+import subprocess
+import sys
+
+from test_reports.checkpoint import RunCheckpoint
+
+QUARANTINE_DIR = "quarantine"
+
+class QuarantineLane:
+    """A suite process running quarantined scenarios in parallel with the main lane."""
+
+    def __init__(self, suite_script, suite, scenario_keys, run_dir, suite_args=None):
+        self.suite = suite
+        self.scenario_keys = sorted(scenario_keys)
+        self.lane_dir = os.path.join(run_dir, QUARANTINE_DIR)
+        self.log_path = os.path.join(run_dir, "quarantine_lane.log")
+        self.command = [sys.executable, suite_script, "--quarantine-lane",
+                        "--only", ",".join(self.scenario_keys), "--run-dir", self.lane_dir] + list(suite_args or [])
+        self.process = None
+
+    def start(self):
+        """Start the lane process; its console output goes to quarantine_lane.log."""
+        os.makedirs(self.lane_dir, exist_ok=True)
+        with open(self.log_path, 'w', encoding='utf-8') as log:
+            self.process = subprocess.Popen(self.command, stdout=log, stderr=subprocess.STDOUT)
+        print(f"🧪 Quarantine lane started for {len(self.scenario_keys)} flaky scenarios (log: {self.log_path})")
+        return self
+
+    def wait(self, timeout=None):
+        """Wait for the lane to finish (terminating it after timeout) and load its checkpoint."""
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            print("⚠️ Quarantine lane did not finish in time - terminating it")
+            self.process.terminate()
+            self.process.wait()
+        try:
+            return RunCheckpoint.load(self.lane_dir, self.suite)
+        except FileNotFoundError:
+            print(f"⚠️ Quarantine lane produced no results, see {self.log_path}")
+            return None
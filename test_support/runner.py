@@ -0,0 +1,244 @@
+"""
+Scenario Runner
+Shared execution loop for the website and admin payment suites.
+"""
+
+class Scenario:
+    """A registered test scenario and the metadata needed to run it."""
+    
+    def __init__(self, key, name, description, test_func, section=None, account=None, api=False, requires=()):
+        self.key = key
+        self.name = name
+        self.description = description
+        self.test_func = test_func
+        self.section = section
+        self.account = account      # Test account the scenario must be logged in with
+        self.api = api              # Outcome can be verified from HTTP responses alone
+        self.requires = tuple(requires)     # Keys of the prerequisites the scenario depends on
+
+class Prerequisite:
+    """Something scenarios depend on (a reachable site, a working login), checked once per run.
+    
+    check(test_case) runs the check with tracked steps and raises or returns False when it fails.
+    A login prerequisite names the account tag its check leaves the browser logged in with;
+    passing it only proves the login works, later scenarios still log in as they need.
+    """
+    
+    def __init__(self, key, description, check, requires=(), account=None):
+        self.key = key
+        self.description = description
+        self.check = check
+        self.requires = tuple(requires)
+        self.account = account
+        self.passed = None          # None until the prerequisite has been evaluated
+        self.reason = None
+        self.test_case = None
+
+def evaluate_prerequisite(key, prerequisites, test_report, watchdog=None, recycle_driver=None, browser_login=None):
+    """Evaluate a prerequisite (and the ones it depends on) once and return the first one that failed, or None.
+    
+    The check's test case is created by test_report, so the suite's latency budgets apply to its steps.
+    """
+    prerequisite = prerequisites[key]
+    if prerequisite.passed is None:
+        for required_key in prerequisite.requires:
+            failed = evaluate_prerequisite(required_key, prerequisites, test_report, watchdog, recycle_driver, browser_login)
+            if failed is not None:
+                prerequisite.passed = False
+                prerequisite.reason = f"requires '{failed.description}'"
+                prerequisite.test_case = failed.test_case
+                return prerequisite
+        
+        print(f"\n🔎 Checking prerequisite: {prerequisite.description}")
+        test_case = test_report.create_test_case(f"Prerequisite: {prerequisite.description}",
+                                                 "Checked once before the scenarios that depend on it")
+        test_case.start()
+        try:
+            prerequisite.passed = prerequisite.check(test_case) is not False
+            if not prerequisite.passed:
+                prerequisite.reason = "check returned False"
+        except Exception as e:
+            prerequisite.passed = False
+            prerequisite.reason = str(e)
+        test_case.complete(prerequisite.passed, None if prerequisite.passed else prerequisite.reason)
+        prerequisite.test_case = test_case
+        if browser_login is not None and prerequisite.account is not None:
+            if prerequisite.passed:
+                browser_login.logged_in(prerequisite.account)
+            else:
+                browser_login.forget()
+        
+        if watchdog is not None and watchdog.tripped:
+            print("♻️ Recycling the browser after a timeout")
+            recycle_driver()
+            watchdog.reset()
+        if prerequisite.passed:
+            print(f"✅ Prerequisite met: {prerequisite.description}")
+        else:
+            print(f"🚫 Prerequisite failed: {prerequisite.description} ({prerequisite.reason}) - dependent scenarios are BLOCKED")
+    
+    return None if prerequisite.passed else prerequisite
+
+def log_in_for_scenario(scenario, test_case, browser_login, watchdog=None):
+    """Log the browser in with the scenario's account if needed; on failure complete the test case as failed."""
+    if browser_login is None or scenario.account is None:
+        return True
+    # The login is timed as part of the scenario; test_func's own start() keeps this start time
+    test_case.start()
+    try:
+        browser_login.ensure(scenario.account, test_case)
+        return True
+    except Exception as e:
+        if watchdog is not None and watchdog.tripped:
+            raise
+        print(f"❌ Could not log in with the '{scenario.account}' account for {scenario.name}: {str(e)}")
+        test_case.complete(False, f"Could not log in with the '{scenario.account}' account: {str(e)}")
+        return False
+
+def format_result(test_results, key, quarantined=(), blocked=()):
+    """Format a scenario outcome for the final results listing."""
+    result = test_results.get(key)
+    text = "⏭️ NOT RUN" if result is None else "✅ PASSED" if result else "🚫 BLOCKED" if key in blocked else "❌ FAILED"
+    return f"{text} (quarantined)" if key in quarantined else text
+
+def run_scenarios(scenarios, test_report, report_dir, network_profile=None, test_results=None,
+                  recorder=None, api_mode=None, watchdog=None, recycle_driver=None, checkpoint=None,
+                  flake_scores=None, step_flake_scores=None, quarantined=False, max_failures=None,
+                  prerequisites=None, blocked=None, account_pool=None, browser_login=None):
+    """Run scenarios in order and add their test cases to the report.
+    
+    Results are recorded into test_results (scenario key -> pass/fail) as each scenario
+    finishes, so callers keep partial results if the run is interrupted. A FlowRecorder
+    saves the HTTP calls behind each scenario; an ApiMode replays recorded flows instead
+    of driving the browser where possible, requiring its HTTP login prerequisites instead of
+    the scenario's own. With a Watchdog each scenario gets a deadline; after a timeout
+    recycle_driver() replaces the aborted browser before the next scenario.
+    A RunCheckpoint is saved after every scenario so the run can be resumed. Flake scores
+    from the run history (scenario key / (key, step name) -> score) are shown in the report;
+    quarantined marks a non-blocking lane. After max_failures failures the remaining
+    scenarios are reported as NOT_RUN (result None) instead of being run.
+    
+    prerequisites (key -> Prerequisite) are evaluated the first time a scenario requires
+    them; a scenario whose prerequisite failed is reported as BLOCKED and counts as failed
+    without being run, and blocked (scenario key -> failed prerequisite) collects them.
+    Failed prerequisite checks are added to the report as their own test cases.
+    
+    With an AccountPool each scenario leases an account tagged with scenario.account for
+    as long as it runs, so processes running scenarios side by side never share an account.
+    With a BrowserLogin the browser is logged in with scenario.account before each browser
+    run whenever it is logged in with another account, or logged out after a recycle.
+    """
+    if test_results is None:
+        test_results = {}
+    current_section = None
+    failures = 0
+    
+    for scenario in scenarios:
+        if max_failures is not None and failures >= max_failures:
+            test_case = test_report.create_test_case(scenario.name, scenario.description)
+            test_case.network_profile = network_profile
+            test_case.mark_not_run(f"Skipped after {failures} failures (--max-failures {max_failures})")
+            test_report.add_test_case(test_case)
+            test_results[scenario.key] = None
+            continue
+        
+        if scenario.section and scenario.section != current_section:
+            current_section = scenario.section
+            print("\n" + "="*60)
+            print(current_section)
+            print("="*60)
+        
+        print(f"\n--- {scenario.name} ---")
+        test_case = test_report.create_test_case(scenario.name, scenario.description)
+        test_case.network_profile = network_profile
+        test_case.quarantined = quarantined
+        if flake_scores is not None:
+            test_case.flake_score = flake_scores.get(scenario.key)
+        
+        lease = None
+        if account_pool is not None and scenario.account is not None:
+            try:
+                lease = account_pool.lease(scenario.account, scenario.key)
+            except (LookupError, TimeoutError) as e:
+                print(f"❌ Could not lease a '{scenario.account}' account: {str(e)}")
+                test_case.start()
+                test_case.complete(False, f"Could not lease a '{scenario.account}' account: {str(e)}")
+                test_report.add_test_case(test_case)
+                test_results[scenario.key] = False
+                failures += 1
+                continue
+            print(f"🔑 Leased '{scenario.account}' account {lease.account.account_id}")
+        
+        # The lease is released however the scenario ends, even when it crashes the run
+        try:
+            flow = api_mode.get_flow(scenario) if api_mode is not None else None
+            # A replayed scenario needs its account's HTTP login, not the browser prerequisites
+            requires = api_mode.get_prerequisites(scenario) if flow is not None else scenario.requires
+            failed_prerequisite = None
+            for key in requires:
+                failed_prerequisite = evaluate_prerequisite(key, prerequisites, test_report, watchdog, recycle_driver, browser_login)
+                if failed_prerequisite is not None:
+                    break
+            if failed_prerequisite is not None:
+                if failed_prerequisite.test_case not in test_report.test_cases:
+                    failed_prerequisite.test_case.network_profile = network_profile
+                    test_report.add_test_case(failed_prerequisite.test_case)
+                print(f"🚫 BLOCKED: prerequisite '{failed_prerequisite.description}' failed")
+                test_case.mark_blocked(f"Blocked: prerequisite '{failed_prerequisite.description}' failed ({failed_prerequisite.reason})")
+                test_report.add_test_case(test_case)
+                test_results[scenario.key] = False
+                if blocked is not None:
+                    blocked[scenario.key] = failed_prerequisite.description
+                if checkpoint is not None:
+                    checkpoint.record(scenario.key, test_case, False)
+                continue
+            
+            deadline = None
+            if watchdog is not None:
+                deadline = watchdog.arm(f"Scenario '{scenario.name}'", watchdog.scenario_timeout, test_case)
+            try:
+                if flow is not None:
+                    test_case.description = f"{scenario.description} (HTTP replay)"
+                    test_results[scenario.key] = api_mode.run_scenario(scenario, test_case, flow)
+                elif log_in_for_scenario(scenario, test_case, browser_login, watchdog):
+                    if recorder is not None:
+                        recorder.start()
+                    test_results[scenario.key] = scenario.test_func(report_dir, test_case)
+                    if recorder is not None:
+                        recorder.save(scenario.key)
+                else:
+                    test_results[scenario.key] = False
+            except Exception:
+                # Calls on the aborted browser are expected to fail; anything else is a real crash
+                if watchdog is None or not watchdog.tripped:
+                    raise
+            finally:
+                if watchdog is not None and watchdog.disarm(deadline):
+                    test_case.mark_timed_out(f"Scenario exceeded its {deadline.timeout}s deadline")
+            
+            timed_out = watchdog is not None and watchdog.tripped
+            if timed_out:
+                test_results[scenario.key] = False
+                if test_case.status != "TIMED_OUT":
+                    test_case.mark_timed_out("Aborted by the watchdog")
+            if step_flake_scores:
+                for step in test_case.steps:
+                    step.flake_score = step_flake_scores.get((scenario.key, step.name))
+            test_report.add_test_case(test_case)
+            if checkpoint is not None:
+                checkpoint.record(scenario.key, test_case, test_results.get(scenario.key, False))
+            
+            if not test_results.get(scenario.key):
+                failures += 1
+                if max_failures is not None and failures >= max_failures:
+                    print(f"\n⛔ {failures} failures - skipping the remaining scenarios (--max-failures {max_failures})")
+            
+            if timed_out:
+                print("♻️ Recycling the browser after a timeout")
+                recycle_driver()
+                watchdog.reset()
+        finally:
+            if lease is not None:
+                account_pool.release(lease)
+    
+    return test_results
@@ -0,0 +1,199 @@
+"""
+Runtime Prediction and Worker Scheduling
+Predicts how long each scenario will take from the run history and spreads the scenarios
+over several suite processes ("workers"), each driving its own browser.
+
+Scenarios are assigned longest-processing-time first: the longest remaining scenario always
+goes to the worker with the least predicted work, and each worker runs its share longest
+first. Predictions are never exact, so the assignment lives in a shared work queue file and
+a worker that runs out of work steals the shortest scenario of the worker with the most
+predicted work left, until every queue is empty.
+
+Each worker has one browser, so the account is part of the schedule: a worker runs its share
+grouped by Scenario.account, and a thief prefers scenarios of the account its browser is
+already logged in with. When it has to take another account's scenario, the runner's
+BrowserLogin logs the browser in again before running it.
+"""
+
+import heapq
+import json
+import os
+import subprocess
+import sys
+import time
+
+from test_reports.checkpoint import RunCheckpoint
+from test_support.file_locks import locked
+
+# Seconds assumed for a scenario when no run history exists at all
+DEFAULT_SCENARIO_ESTIMATE = 90
+
+def predict_durations(scenarios, history_durations, default=DEFAULT_SCENARIO_ESTIMATE):
+    """Predict scenario key -> seconds; scenarios without history get the median known duration."""
+    known = sorted(history_durations[scenario.key] for scenario in scenarios if scenario.key in history_durations)
+    fallback = known[len(known) // 2] if known else default
+    return {scenario.key: history_durations.get(scenario.key, fallback) for scenario in scenarios}
+
+def group_by_account(scenarios, predictions):
+    """Order scenarios longest first within account groups, the group with the longest scenario first."""
+    groups = {}
+    # Ties keep the source order, so the same history always gives the same plan
+    for scenario in sorted(scenarios, key=lambda scenario: predictions[scenario.key], reverse=True):
+        groups.setdefault(scenario.account, []).append(scenario)
+    return [scenario for group in groups.values() for scenario in group]
+
+def assign_longest_first(scenarios, predictions, workers):
+    """Split scenario keys over workers, longest first, each to the currently least loaded worker.
+    
+    Each worker's share is then grouped by account, so its browser switches accounts as few times as possible.
+    """
+    shares = [[] for _ in range(workers)]
+    loads = [(0.0, worker) for worker in range(workers)]
+    for scenario in sorted(scenarios, key=lambda scenario: predictions[scenario.key], reverse=True):
+        load, worker = heapq.heappop(loads)
+        shares[worker].append(scenario)
+        heapq.heappush(loads, (load + predictions[scenario.key], worker))
+    return [[scenario.key for scenario in group_by_account(share, predictions)] for share in shares]
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    return f"{minutes}m {seconds:02d}s" if minutes else f"{seconds}s"
+
+def print_prediction(assignments, predictions, history_keys=()):
+    """Print the predicted load of every worker and the predicted wall-clock time of the run."""
+    loads = [sum(predictions[key] for key in keys) for keys in assignments]
+    estimated = sum(1 for keys in assignments for key in keys if key not in history_keys)
+    estimate_note = f" ({estimated} scenarios without history estimated)" if estimated else ""
+    print(f"\n⏱️ Predicted run time: {format_duration(max(loads, default=0))} "
+          f"for {sum(len(keys) for keys in assignments)} scenarios{estimate_note}")
+    if len(assignments) > 1:
+        for worker, (keys, load) in enumerate(zip(assignments, loads)):
+            print(f"   Worker {worker}: {len(keys)} scenarios, {format_duration(load)}")
+        print(f"   Total work: {format_duration(sum(loads))}")
+    return max(loads, default=0)
+
+class WorkQueue:
+    """Per-worker scenario queues in a JSON file shared by the worker processes of a run."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = path + ".lock"
+
+    @classmethod
+    def create(cls, path, assignments, predictions, accounts=None):
+        """Write the queues of a new schedule; workers waiting for the file start taking from it.
+        
+        accounts maps scenario key -> Scenario.account, so thieves can stay on their browser's account.
+        """
+        queue = cls(path)
+        with locked(queue.lock_path):
+            queue._save({'predictions': predictions,
+                         'accounts': accounts or {},
+                         'queues': {str(worker): keys for worker, keys in enumerate(assignments)},
+                         'taken': []})
+        return queue
+
+    @classmethod
+    def wait_for(cls, path, timeout, poll_interval=0.5):
+        """Wait until the main process has written the schedule at path."""
+        deadline = time.time() + timeout
+        while not os.path.exists(path):
+            if time.time() >= deadline:
+                raise TimeoutError(f"No work queue appeared at {path} within {timeout}s")
+            time.sleep(poll_interval)
+        return cls(path)
+
+    def _load(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save(self, data):
+        temp_path = self.path + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, self.path)
+
+    def take(self, worker, account=None):
+        """Take the next scenario key for a worker, stealing when its own queue is empty; None when done.
+        
+        account is the one the worker's browser is logged in with; a thief takes a scenario of that
+        account when any queue still has one.
+        """
+        with locked(self.lock_path):
+            data = self._load()
+            queues = data['queues']
+            stolen_from = None
+            own = queues.setdefault(str(worker), [])
+            if own:
+                key = own.pop(0)
+            else:
+                predictions = data['predictions']
+                accounts = data.get('accounts', {})
+                victims = [(sum(predictions[key] for key in keys), name) for name, keys in queues.items() if keys]
+                if not victims:
+                    return None
+                same_account = [victim for victim in victims
+                                if any(accounts.get(key) == account for key in queues[victim[1]])]
+                _, stolen_from = max(same_account or victims)
+                # The owner works from the front; the thief takes the shortest scenario from the back,
+                # the last one of its own account if the victim has one
+                victim_keys = queues[stolen_from]
+                index = len(victim_keys) - 1
+                if same_account:
+                    index = max(i for i, key in enumerate(victim_keys) if accounts.get(key) == account)
+                key = victim_keys.pop(index)
+            data['taken'].append({'scenario': key, 'worker': worker, 'stolen_from': stolen_from, 'at': time.time()})
+            self._save(data)
+        if stolen_from is not None:
+            print(f"🤝 Worker {worker} took {key} from worker {stolen_from}")
+        return key
+
+    def iter_scenarios(self, worker, scenarios):
+        """Yield the worker's scenarios one at a time as they are taken from the queue."""
+        by_key = {scenario.key: scenario for scenario in scenarios}
+        account = None
+        while True:
+            key = self.take(worker, account)
+            if key is None:
+                return
+            account = by_key[key].account or account
+            yield by_key[key]
+
+class WorkerLane:
+    """A suite process that runs scenarios taken from the work queues of the main run."""
+
+    def __init__(self, suite_script, suite, worker, run_dir, queue_dir, suite_args=None):
+        self.suite = suite
+        self.worker = worker
+        # One level below the run directory, where load_history also picks up lane checkpoints
+        self.worker_dir = os.path.join(run_dir, f"worker_{worker}")
+        self.log_path = os.path.join(run_dir, f"worker_{worker}.log")
+        self.command = [sys.executable, suite_script, "--worker-lane", str(worker),
+                        "--work-queue", queue_dir, "--run-dir", self.worker_dir] + list(suite_args or [])
+        self.process = None
+
+    def start(self):
+        """Start the worker process; its console output goes to worker_<n>.log."""
+        os.makedirs(self.worker_dir, exist_ok=True)
+        with open(self.log_path, 'w', encoding='utf-8') as log:
+            self.process = subprocess.Popen(self.command, stdout=log, stderr=subprocess.STDOUT)
+        print(f"👷 Worker {self.worker} started (log: {self.log_path})")
+        return self
+
+    def wait(self, timeout=None):
+        """Wait for the worker to finish (terminating it after timeout) and load its checkpoint."""
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            print(f"⚠️ Worker {self.worker} did not finish in time - terminating it")
+            self.process.terminate()
+            self.process.wait()
+        try:
+            return RunCheckpoint.load(self.worker_dir, self.suite)
+        except FileNotFoundError:
+            print(f"⚠️ Worker {self.worker} produced no results, see {self.log_path}")
+            return None
+
+def get_queue_path(queue_dir, network_profile=None):
+    """Path of the work queue for one network profile."""
+    return os.path.join(queue_dir, f"work_queue_{network_profile or 'default'}.json")
@@ -0,0 +1,133 @@
+"""
+Failure-Triggered Screencast Ring Buffer
+Keeps the last few seconds of compressed DevTools screencast frames in memory and only
+writes them out when a step fails.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+
+from test_reports.test_report import add_failure_hook
+from test_support.devtools import DevToolsListener
+
+PLAYER_PAGE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>{title}</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; margin: 20px; }}
+        img {{ max-width: 100%; border: 1px solid #ddd; }}
+    </style>
+</head>
+<body>
+    <h2>{title}</h2>
+    <p><button onclick="paused = !paused">Play / Pause</button> <span id="position"></span></p>
+    <img id="frame">
+    <script>
+        const frames = {frames};
+        let index = 0, paused = false;
+        function show() {{
+            document.getElementById("frame").src = "data:image/jpeg;base64," + frames[index][1];
+            document.getElementById("position").textContent =
+                `frame ${{index + 1}}/${{frames.length}}, t=${{(frames[index][0] - frames[0][0]).toFixed(2)}}s`;
+        }}
+        function next() {{
+            if (!paused) {{ index = (index + 1) % frames.length; show(); }}
+            const delay = index + 1 < frames.length ? (frames[index + 1][0] - frames[index][0]) * 1000 : 1000;
+            setTimeout(next, Math.min(Math.max(delay, 40), 2000));
+        }}
+        if (frames.length) {{ show(); setTimeout(next, 500); }}
+    </script>
+</body>
+</html>
+"""
+
+class ScreencastRecorder:
+    """Buffers the last `seconds` of JPEG screencast frames of the driver's current tab."""
+
+    def __init__(self, driver, seconds=15, quality=40, max_width=1280, max_height=720):
+        self.seconds = seconds
+        self.quality = quality
+        self.max_width = max_width
+        self.max_height = max_height
+        self.target_id = driver.current_window_handle
+        self._frames = deque()
+        self._lock = threading.Lock()
+        self._saved_count = 0
+        self._listener = DevToolsListener(driver, self._listen, name="screencast")
+
+    def start(self):
+        """Start buffering frames in the background."""
+        self._listener.start()
+        if self._listener.error is not None:
+            raise self._listener.error
+        return self
+
+    def stop(self):
+        self._listener.stop()
+
+    async def _listen(self, connection, devtools, ready):
+        page = devtools.page
+        session = await connection.open_session(self.target_id)
+        frames = session.listen(page.ScreencastFrame, buffer_size=100)
+        await session.execute(page.start_screencast(
+            format_="jpeg", quality=self.quality, max_width=self.max_width, max_height=self.max_height))
+        ready.set()
+
+        async for frame in frames:
+            # Frames keep coming only after the previous one is acknowledged
+            await session.execute(page.screencast_frame_ack(frame.session_id))
+            timestamp = float(frame.metadata.timestamp or time.time())
+            with self._lock:
+                self._frames.append((timestamp, frame.data))
+                while self._frames and timestamp - self._frames[0][0] > self.seconds:
+                    self._frames.popleft()
+
+    def get_frames(self):
+        """Get a copy of the buffered (timestamp, base64 JPEG) frames."""
+        with self._lock:
+            return list(self._frames)
+
+    def save(self, output_dir, label, writer=None):
+        """Write the buffered frames as a self-contained HTML player and return its path.
+
+        With an ArtifactWriter the page is rendered and written in the background.
+        """
+        frames = self.get_frames()
+        if not frames:
+            return None
+        self._saved_count += 1
+        safe_label = re.sub(r"[^A-Za-z0-9]+", "_", label).strip("_")
+        path = os.path.join(output_dir, f"screencast_{self._saved_count:03d}_{safe_label}.html")
+        render = lambda: PLAYER_PAGE.format(title=f"Last {self.seconds}s before: {label}", frames=json.dumps(frames))
+        if writer is not None:
+            return writer.write_text(path, render)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(render())
+        return path
+
+    def attach_to_step(self, test_case, step, output_dir, writer=None):
+        """Failure hook: save the buffer and link it from the failed step."""
+        path = self.save(output_dir, f"{test_case.name} {step.name}", writer)
+        if path:
+            step.add_artifact("Screencast", path)
+            print(f"🎞️ Screencast of the last {self.seconds}s saved: {path}")
+
+def start_failure_screencast(driver, report_dir, writer=None, seconds=15):
+    """Start a recorder whose buffer is saved to report_dir whenever a step fails.
+
+    Returns the recorder, or None when DevTools is unavailable (the run continues without screencasts).
+    """
+    try:
+        recorder = ScreencastRecorder(driver, seconds=seconds).start()
+    except Exception as e:
+        print(f"⚠️ Screencast recording unavailable: {str(e)}")
+        return None
+    recorder.failure_hook = lambda test_case, step: recorder.attach_to_step(test_case, step, report_dir, writer)
+    add_failure_hook(recorder.failure_hook)
+    return recorder
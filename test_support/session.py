@@ -0,0 +1,59 @@
+"""
+Browser Session Provider
+Owns a suite's browser. Chrome is started the first time the driver is used rather than when
+the suite module is imported, and the watchdog's recycle swaps in a fresh browser without
+rebinding the module's `driver` global: the global is a proxy that always forwards to the
+session's current browser.
+"""
+
+import threading
+
+class BrowserSession:
+    """Starts the browser on first use and replaces it on request."""
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.driver = DriverProxy(self)
+        self._current = None
+        self._lock = threading.Lock()
+
+    @property
+    def current(self):
+        """The running browser, or None while none has been started."""
+        return self._current
+
+    def get(self):
+        """Get the running browser, starting it if needed."""
+        if self._current is None:
+            with self._lock:
+                if self._current is None:
+                    print("🌐 Starting Chrome")
+                    self._current = self.factory()
+        return self._current
+
+    def reset(self):
+        """Forget the current browser (after discarding it) so the next use starts a fresh one."""
+        with self._lock:
+            self._current = None
+
+    def quit(self):
+        """Quit the browser if one was started."""
+        with self._lock:
+            driver, self._current = self._current, None
+        if driver is not None:
+            driver.quit()
+
+class DriverProxy:
+    """Stand-in for the WebDriver that forwards every attribute to the session's current browser."""
+
+    def __init__(self, session):
+        object.__setattr__(self, "_session", session)
+
+    def __getattr__(self, name):
+        return getattr(self._session.get(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._session.get(), name, value)
+
+    def __repr__(self):
+        return f"<driver proxy for {self._session.current!r}>"
@@ -0,0 +1,136 @@
+"""
+Failure Page Snapshots
+Captures a full MHTML snapshot, a screenshot and the recent console output of the page when a
+step fails. Capture happens on a background DevTools connection and compression and writing on
+the artifact writer, so the failing scenario only pays for queueing a request and the step keeps
+just the file references.
+"""
+
+import base64
+import math
+import os
+import re
+import threading
+from collections import deque
+
+from test_reports.test_report import add_failure_hook
+from test_support.devtools import DevToolsListener, trio
+
+def _plain(value):
+    """Unwrap DevTools enum values so console entries serialize as plain JSON."""
+    return getattr(value, "value", value)
+
+def _describe(remote_object):
+    """Render a console.* argument the way the DevTools console would."""
+    if remote_object.value is not None:
+        return remote_object.value
+    return remote_object.description or remote_object.unserializable_value or _plain(remote_object.type_)
+
+class PageSnapshotter:
+    """Keeps the recent console log of the driver's main tab and snapshots the page on request."""
+
+    def __init__(self, driver, writer, console_entries=500):
+        self.writer = writer
+        self.target_id = driver.current_window_handle
+        self._console = deque(maxlen=console_entries)
+        self._lock = threading.Lock()
+        self._send = None
+        self._drained = threading.Event()
+        self._idle = threading.Condition()
+        self._pending = 0
+        self._saved_count = 0
+        self._listener = DevToolsListener(driver, self._listen, name="page-snapshots")
+
+    def start(self):
+        """Start collecting console output in the background."""
+        self._listener.start()
+        if self._listener.error is not None:
+            raise self._listener.error
+        return self
+
+    def stop(self, timeout=30):
+        """Finish pending snapshots, then close the DevTools connection."""
+        if self._listener.is_running() and self._send is not None:
+            try:
+                self._listener.call_soon(self._send.close)
+                self._drained.wait(timeout)
+            except trio.RunFinishedError:
+                pass
+        self._listener.stop()
+
+    async def _listen(self, connection, devtools, ready):
+        session = await connection.open_session(self.target_id)
+        events = session.listen(devtools.runtime.ConsoleAPICalled, devtools.log.EntryAdded, buffer_size=500)
+        await session.execute(devtools.runtime.enable())
+        await session.execute(devtools.log.enable())
+        self._send, requests = trio.open_memory_channel(math.inf)
+        ready.set()
+
+        async with trio.open_nursery() as nursery:
+            nursery.start_soon(self._snapshot_worker, session, devtools, requests)
+            async for event in events:
+                if isinstance(event, devtools.runtime.ConsoleAPICalled):
+                    entry = {"timestamp": float(event.timestamp), "source": "console",
+                             "level": event.type_, "text": " ".join(str(_describe(arg)) for arg in event.args)}
+                else:
+                    entry = {"timestamp": float(event.entry.timestamp), "source": _plain(event.entry.source),
+                             "level": _plain(event.entry.level), "text": event.entry.text, "url": event.entry.url}
+                with self._lock:
+                    self._console.append(entry)
+
+    async def _snapshot_worker(self, session, devtools, requests):
+        async for snapshot_path, screenshot_path, console_path in requests:
+            try:
+                mhtml = await session.execute(devtools.page.capture_snapshot(format_="mhtml"))
+                # Writes are queued from a worker thread: when the writer applies back-pressure only this
+                # worker waits, and the event loop keeps collecting console output
+                await trio.to_thread.run_sync(lambda: self.writer.write_text(snapshot_path, mhtml, compress=True))
+                screenshot = await session.execute(devtools.page.capture_screenshot(format_="png"))
+                await trio.to_thread.run_sync(self.writer.write_bytes, screenshot_path, base64.b64decode(screenshot))
+            except Exception as e:
+                print(f"⚠️ Page snapshot failed: {str(e)}")
+            with self._lock:
+                console = list(self._console)
+            await trio.to_thread.run_sync(lambda: self.writer.write_json(console_path, console, compress=True))
+            with self._idle:
+                self._pending -= 1
+                self._idle.notify_all()
+        self._drained.set()
+
+    def request_snapshot(self, output_dir, label):
+        """Queue a snapshot of the main tab and return the (snapshot, screenshot, console log) paths it will write."""
+        self._saved_count += 1
+        safe_label = re.sub(r"[^A-Za-z0-9]+", "_", label).strip("_")
+        base = os.path.join(output_dir, f"snapshot_{self._saved_count:03d}_{safe_label}")
+        paths = (f"{base}.mhtml.gz", f"{base}.png", f"{base}.console.json.gz")
+        with self._idle:
+            self._pending += 1
+        self._listener.call_soon(self._send.send_nowait, paths)
+        return paths
+    
+    def wait_idle(self, timeout=None):
+        """Wait until every requested snapshot has been captured and handed to the writer."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0 or not self._listener.is_running(), timeout)
+
+    def attach_to_step(self, test_case, step, output_dir):
+        """Failure hook: queue a snapshot and link its files from the failed step."""
+        snapshot_path, screenshot_path, console_path = self.request_snapshot(output_dir, f"{test_case.name} {step.name}")
+        step.add_artifact("Screenshot", screenshot_path)
+        step.add_artifact("Page snapshot (MHTML, gzip)", snapshot_path)
+        step.add_artifact("Console log (gzip)", console_path)
+        print(f"📸 Page snapshot queued: {snapshot_path}")
+
+def start_failure_snapshots(driver, report_dir, writer):
+    """Start a snapshotter that captures the page into report_dir whenever a step fails.
+
+    Returns the snapshotter, or None when DevTools is unavailable (the run continues without snapshots).
+    """
+    try:
+        snapshotter = PageSnapshotter(driver, writer).start()
+    except Exception as e:
+        print(f"⚠️ Page snapshots unavailable: {str(e)}")
+        return None
+    snapshotter.failure_hook = lambda test_case, step: snapshotter.attach_to_step(test_case, step, report_dir)
+    add_failure_hook(snapshotter.failure_hook)
+    return snapshotter
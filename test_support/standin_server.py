@@ -0,0 +1,152 @@
+"""
+Stand-in Storefront Server
+Minimal local imitation of the storefront purchase API so load runs work without the test environment.
+"""
+
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Prices in fen so balance arithmetic stays exact
+PACKAGE_PRICES = {
+    "天启动态尊享": 10000,
+    "静态IP-天启": 6000,
+    "天启动态标准套餐": 3000,
+    "天启动态独享套餐": 5000
+}
+
+class StandinStore:
+    """In-memory accounts, sessions and orders shared by all request handlers."""
+
+    def __init__(self, accounts, latency=0.0):
+        self.accounts = {phone: {"password": password, "balance": balance} for phone, (password, balance) in accounts.items()}
+        self.sessions = {}
+        self.orders = []
+        self.latency = latency
+        self.lock = threading.Lock()
+
+    def login(self, phone, password):
+        account = self.accounts.get(phone)
+        if account is None or account["password"] != password:
+            return None
+        token = uuid.uuid4().hex
+        with self.lock:
+            self.sessions[token] = phone
+        return token
+
+    def create_order(self, phone, package_name, pay_method):
+        if package_name not in PACKAGE_PRICES:
+            return {"code": 1, "msg": "套餐不存在"}
+        price = PACKAGE_PRICES[package_name]
+        order_no = uuid.uuid4().hex[:16]
+
+        if pay_method != "balance":
+            # Third-party payments only create a pending order
+            with self.lock:
+                self.orders.append({"orderNo": order_no, "phone": phone, "amount": price, "status": "PENDING"})
+            return {"code": 0, "data": {"orderNo": order_no, "amount": price, "status": "PENDING"}}
+
+        with self.lock:
+            account = self.accounts[phone]
+            if account["balance"] < price:
+                return {"code": 1, "msg": "账户余额不足"}
+            account["balance"] -= price
+            self.orders.append({"orderNo": order_no, "phone": phone, "amount": price, "status": "PAID"})
+        return {"code": 0, "msg": "套餐购买成功", "data": {"orderNo": order_no, "amount": price, "status": "PAID"}}
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """Routes the stand-in storefront API."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status=200, cookies=None):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (cookies or {}).items():
+            self.send_header("Set-Cookie", f"{name}={value}; Path=/")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length).decode("utf-8"))
+
+    def _current_phone(self):
+        for part in self.headers.get("Cookie", "").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == "token":
+                return self.server.store.sessions.get(value)
+        return None
+
+    def do_GET(self):
+        store = self.server.store
+        if store.latency:
+            time.sleep(store.latency)
+        if self.path == "/api/user/balance":
+            phone = self._current_phone()
+            if phone is None:
+                self._send_json({"code": 401, "msg": "未登录"}, status=401)
+                return
+            self._send_json({"code": 0, "data": {"balance": store.accounts[phone]["balance"]}})
+        else:
+            self._send_json({"code": 404, "msg": "Not Found"}, status=404)
+
+    def do_POST(self):
+        store = self.server.store
+        payload = self._read_json()
+        if store.latency:
+            time.sleep(store.latency)
+        if self.path == "/api/login":
+            token = store.login(payload.get("phone"), payload.get("password"))
+            if token is None:
+                self._send_json({"code": 1, "msg": "登录失败"})
+            else:
+                self._send_json({"code": 0, "msg": "登录成功"}, cookies={"token": token})
+        elif self.path == "/api/order/create":
+            phone = self._current_phone()
+            if phone is None:
+                self._send_json({"code": 401, "msg": "未登录"}, status=401)
+                return
+            self._send_json(store.create_order(phone, payload.get("packageName"), payload.get("payMethod")))
+        else:
+            self._send_json({"code": 404, "msg": "Not Found"}, status=404)
+
+def start_standin_server(accounts, host="127.0.0.1", port=0, latency=0.0):
+    """Start the stand-in server on a background thread and return it.
+
+    accounts maps phone -> (password, balance in fen). The server exposes
+    base_url and store attributes; call shutdown() when finished.
+    """
+    server = ThreadingHTTPServer((host, port), StandinHandler)
+    server.daemon_threads = True
+    server.store = StandinStore(accounts, latency)
+    server.base_url = f"http://{host}:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, name="standin-server", daemon=True).start()
+    return server
+
+def standin_purchase_flow(base_url, phone, password, package_name="天启动态尊享"):
+    """Build the balance purchase flow for the stand-in server."""
+    return {
+        "name": "standin_balance_purchase",
+        "base_url": base_url,
+        "login": [
+            {"method": "POST", "url": "/api/login", "body": {"phone": phone, "password": password},
+             "expect_status": 200, "expect_json": {"code": 0}}
+        ],
+        "requests": [
+            {"method": "POST", "url": "/api/order/create", "body": {"packageName": package_name, "payMethod": "balance"},
+             "expect_status": 200, "expect_json": {"code": 0}}
+        ],
+        "balance": {"method": "GET", "url": "/api/user/balance", "expect_status": 200, "field": "data.balance"},
+        "amount_field": "data.amount"
+    }
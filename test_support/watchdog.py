@@ -0,0 +1,145 @@
+"""
+Step and Scenario Watchdog
+Gives every tracked step and every scenario a deadline. When one passes, the watchdog captures
+the failure artifacts, then closes the browser so the WebDriver call that is stuck returns with
+an error; the step is reported as TIMED_OUT and the runner recycles the driver and moves on.
+"""
+
+import threading
+import time
+
+from test_reports.test_report import run_failure_hooks
+from test_support.devtools import DevToolsListener
+
+class Deadline:
+    """A running step or scenario that must finish within `timeout` seconds."""
+
+    def __init__(self, label, timeout, test_case=None, step=None):
+        self.label = label
+        self.timeout = timeout
+        self.test_case = test_case
+        self.step = step
+        # Monotonic, so a wall-clock jump (NTP step, VM resume) cannot fire it early or never
+        self.expires_at = time.monotonic() + timeout
+        self.expired = False
+        self.finished = threading.Event()
+
+def close_browser(driver):
+    """Close Chrome over its own DevTools connection, failing any WebDriver call blocked on it."""
+    async def close(connection, devtools, ready):
+        ready.set()
+        await connection.execute(devtools.browser.close())
+
+    listener = DevToolsListener(driver, close, name="close-browser").start()
+    listener.stop()
+
+def abort_browser(driver, force=False):
+    """Unblock a hung driver: close the browser, or kill chromedriver when that is not enough."""
+    if not force:
+        try:
+            close_browser(driver)
+            return
+        except Exception as e:
+            print(f"⚠️ Could not close the browser over DevTools: {str(e)}")
+    driver.service.process.kill()
+
+def discard_driver(driver):
+    """Quit a driver that may already be dead without letting it raise or hang."""
+    try:
+        driver.quit()
+    except Exception:
+        pass
+    try:
+        driver.service.process.kill()
+    except Exception:
+        pass
+
+class Watchdog:
+    """Background thread enforcing step and scenario deadlines.
+
+    abort(force) must unblock the thread driving the browser (see abort_browser); it is
+    called once when a deadline passes and again with force=True if nothing returns within
+    abort_grace seconds. before_abort(timeout), if given, waits for queued failure captures.
+    """
+
+    def __init__(self, abort, step_timeout=None, scenario_timeout=None, step_timeouts=None,
+                 before_abort=None, abort_grace=15, poll_interval=1):
+        self.abort = abort
+        self.step_timeout = step_timeout
+        self.scenario_timeout = scenario_timeout
+        self.step_timeouts = dict(step_timeouts or {})
+        self.before_abort = before_abort
+        self.abort_grace = abort_grace
+        self.poll_interval = poll_interval
+        self.tripped = False
+        self._deadlines = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="watchdog", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        self._thread.join(self.poll_interval + 1)
+
+    def get_step_timeout(self, step_name):
+        return self.step_timeouts.get(step_name, self.step_timeout)
+
+    def arm(self, label, timeout, test_case=None, step=None):
+        """Start a deadline; returns None when no timeout applies."""
+        if timeout is None:
+            return None
+        deadline = Deadline(label, timeout, test_case, step)
+        with self._lock:
+            self._deadlines.append(deadline)
+        return deadline
+
+    def disarm(self, deadline):
+        """Finish a deadline and return whether it expired."""
+        if deadline is None:
+            return False
+        deadline.finished.set()
+        with self._lock:
+            if deadline in self._deadlines:
+                self._deadlines.remove(deadline)
+        return deadline.expired
+
+    def reset(self):
+        """Clear the tripped flag once the driver has been recycled."""
+        self.tripped = False
+
+    def _run(self):
+        while not self._stopped.wait(self.poll_interval):
+            now = time.monotonic()
+            with self._lock:
+                expired = [deadline for deadline in self._deadlines if not deadline.expired and deadline.expires_at <= now]
+            if expired and not self.tripped:
+                self._fire(expired[0])
+
+    def _fire(self, deadline):
+        deadline.expired = True
+        self.tripped = True
+        print(f"\n⏰ {deadline.label} exceeded its {deadline.timeout}s deadline - aborting the browser")
+
+        # Capture while the browser is still there; a scenario deadline captures its running step
+        step = deadline.step
+        if step is None and deadline.test_case is not None:
+            step = next((s for s in reversed(deadline.test_case.steps) if s.status == "RUNNING"), None)
+        if step is not None:
+            run_failure_hooks(deadline.test_case, step)
+            if self.before_abort is not None:
+                try:
+                    self.before_abort(self.abort_grace)
+                except Exception as e:
+                    print(f"⚠️ Waiting for failure captures failed: {str(e)}")
+
+        for force in (False, True):
+            try:
+                self.abort(force)
+            except Exception as e:
+                print(f"⚠️ Aborting the browser failed: {str(e)}")
+            if deadline.finished.wait(self.abort_grace):
+                return
@@ -0,0 +1,109 @@
+import os
+import tempfile
+import unittest
+
+from test_support.accounts import ACTIVE_LEASES, Account, AccountPool, BrowserLogin, get_leased_account
+
+class AccountPoolTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.addCleanup(ACTIVE_LEASES.clear)
+        self.lock_dir = os.path.join(self.temp_dir.name, "leases")
+        self.accounts = [Account("1001", ["balance"]), Account("1002", ["balance"]), Account("2001", ["no_balance"])]
+
+    def make_pool(self):
+        # Each pool opens its own lock files, like a separate suite process
+        return AccountPool(self.accounts, self.lock_dir, lease_timeout=0, poll_interval=0.01)
+
+    def test_leases_are_exclusive_across_pools(self):
+        first, second, third = self.make_pool(), self.make_pool(), self.make_pool()
+        lease = first.lease("balance", "scenario 1")
+        other = second.lease("balance", "scenario 2")
+        self.assertNotEqual(lease.account.account_id, other.account.account_id)
+        with self.assertRaises(TimeoutError):
+            third.lease("balance", "scenario 3")
+        first.release(lease)
+        second.release(other)
+
+    def test_release_frees_the_account(self):
+        first, second = self.make_pool(), self.make_pool()
+        lease = first.lease("no_balance", "scenario 1")
+        first.release(lease)
+        other = second.lease("no_balance", "scenario 2")
+        self.assertEqual(other.account.account_id, "2001")
+        second.release(other)
+
+    def test_get_leased_account_follows_the_lease(self):
+        pool = self.make_pool()
+        lease = pool.lease("no_balance", "scenario")
+        self.assertEqual(get_leased_account("no_balance").account_id, "2001")
+        pool.release(lease)
+        self.assertIsNone(get_leased_account("no_balance"))
+
+    def test_prefers_the_account_leased_last(self):
+        pool = self.make_pool()
+        first = pool.lease("balance", "scenario 1")
+        second = pool.lease("balance", "scenario 2")
+        pool.release(first)
+        pool.release(second)
+        self.assertEqual(pool.lease("balance", "scenario 3").account.account_id, second.account.account_id)
+
+    def test_unknown_tag_is_rejected(self):
+        with self.assertRaises(LookupError):
+            self.make_pool().lease("admin_target", "scenario")
+
+class BrowserLoginTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.addCleanup(ACTIVE_LEASES.clear)
+        self.pool = AccountPool([Account("1001", ["balance"]), Account("1002", ["balance"]), Account("2001", ["no_balance"])],
+                                os.path.join(self.temp_dir.name, "leases"), lease_timeout=0)
+        self.events = []
+        self.browser_login = BrowserLogin({"balance": lambda test_case: self.events.append("login balance"),
+                                           "no_balance": lambda test_case: self.events.append("login no_balance")},
+                                          lambda: self.events.append("reset"))
+
+    def test_logs_in_only_when_the_account_changes(self):
+        lease = self.pool.lease("balance", "scenario 1")
+        self.assertTrue(self.browser_login.ensure("balance", None))
+        self.assertFalse(self.browser_login.ensure("balance", None))
+        self.pool.release(lease)
+        lease = self.pool.lease("no_balance", "scenario 2")
+        self.assertTrue(self.browser_login.ensure("no_balance", None))
+        self.pool.release(lease)
+        self.assertEqual(self.events, ["reset", "login balance", "reset", "login no_balance"])
+
+    def test_logs_in_again_when_the_lease_hands_out_another_account(self):
+        lease = self.pool.lease("balance", "scenario 1")
+        self.browser_login.ensure("balance", None)
+        self.pool.release(lease)
+        # Another process takes the account the browser is logged in with
+        other_pool = AccountPool(self.pool.accounts, self.pool.lock_dir)
+        blocker = other_pool.lease("balance", "other process")
+        self.assertEqual(blocker.account.account_id, lease.account.account_id)
+        lease = self.pool.lease("balance", "scenario 2")
+        self.assertNotEqual(lease.account.account_id, blocker.account.account_id)
+        self.assertTrue(self.browser_login.ensure("balance", None))
+        self.pool.release(lease)
+        other_pool.release(blocker)
+        self.assertEqual(self.events, ["reset", "login balance", "reset", "login balance"])
+
+    def test_failed_login_is_not_remembered(self):
+        def fail(test_case):
+            raise RuntimeError("login failed")
+        self.browser_login.logins["balance"] = fail
+        with self.assertRaises(RuntimeError):
+            self.browser_login.ensure("balance", None)
+        self.assertIsNone(self.browser_login.account)
+
+    def test_forget_forces_a_new_login(self):
+        self.browser_login.logged_in("balance")
+        self.browser_login.forget()
+        self.assertTrue(self.browser_login.ensure("balance", None))
+
+if __name__ == "__main__":
+    unittest.main()
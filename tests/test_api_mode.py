@@ -0,0 +1,83 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+from test_reports import test_report as reports
+from test_support.accounts import ACTIVE_LEASES, Account, AccountPool
+from test_support.api_mode import ApiMode, flow_path
+from test_support.runner import Prerequisite, Scenario, run_scenarios
+from test_support.standin_server import start_standin_server
+
+LOGIN_FLOW = {"name": "login_with_balance", "requests": [
+    {"method": "POST", "url": "/api/login", "body": '{"phone": "{account}", "password": "{password}"}',
+     "headers": {"Content-Type": "application/json"}, "expect_status": 200, "expect_json": {"code": 0}}]}
+PURCHASE_FLOW = {"name": "1.1_wallet_balance", "requests": [
+    {"method": "POST", "url": "/api/order/create", "body": {"packageName": "天启动态尊享", "payMethod": "balance"},
+     "expect_status": 200, "expect_json": {"code": 0}}]}
+
+class ApiModeTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.addCleanup(ACTIVE_LEASES.clear)
+        self.flows_dir = os.path.join(self.temp_dir.name, "flows")
+        os.makedirs(self.flows_dir)
+        for flow in (LOGIN_FLOW, PURCHASE_FLOW):
+            with open(flow_path(self.flows_dir, flow["name"]), 'w', encoding='utf-8') as f:
+                json.dump(flow, f, ensure_ascii=False)
+
+        self.server = start_standin_server({"13800000001": ("pass-1", 50000), "13800000002": ("pass-2", 50000)})
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.api_mode = ApiMode(self.server.base_url, self.flows_dir, {"balance": "login_with_balance"},
+                                {"balance": Account("13800000001", ["balance"], "pass-1")})
+        self.addCleanup(self.api_mode.close)
+        self.account_pool = AccountPool([Account("13800000002", ["balance"], "pass-2")],
+                                        os.path.join(self.temp_dir.name, "leases"), lease_timeout=0)
+
+    def make_prerequisites(self):
+        def browser_login(test_case):
+            raise AssertionError("the browser login must not run for a replayed scenario")
+        prerequisites = {"balance_login": Prerequisite("balance_login", "Logged in with balance account", browser_login)}
+        prerequisites.update(self.api_mode.create_prerequisites())
+        return prerequisites
+
+    def run_scenario(self, scenario, prerequisites):
+        test_report = reports.TestReport(os.path.join(self.temp_dir.name, "report"))
+        with redirect_stdout(io.StringIO()):
+            results = run_scenarios([scenario], test_report, self.temp_dir.name, api_mode=self.api_mode,
+                                    prerequisites=prerequisites, account_pool=self.account_pool)
+        return results, test_report
+
+    def test_replayed_scenario_requires_the_http_login_instead_of_the_browser(self):
+        scenario = Scenario("1.1_wallet_balance", "1.1", "", None, account="balance", api=True, requires=("balance_login",))
+        prerequisites = self.make_prerequisites()
+        results, test_report = self.run_scenario(scenario, prerequisites)
+        self.assertEqual(results, {"1.1_wallet_balance": True})
+        self.assertIsNone(prerequisites["balance_login"].passed)
+        self.assertTrue(prerequisites["api_balance_login"].passed)
+
+    def test_login_is_replayed_with_the_leased_account(self):
+        scenario = Scenario("1.1_wallet_balance", "1.1", "", None, account="balance", api=True, requires=("balance_login",))
+        self.run_scenario(scenario, self.make_prerequisites())
+        self.assertEqual([order["phone"] for order in self.server.store.orders], ["13800000002"])
+
+    def test_default_account_is_used_outside_a_lease(self):
+        session = self.api_mode.get_session("balance")
+        response = session.request("GET", "/api/user/balance")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(list(self.server.store.sessions.values()), ["13800000001"])
+
+    def test_browser_only_scenarios_keep_their_prerequisites(self):
+        scenario = Scenario("1.3_wechat", "1.3", "", lambda report_dir, test_case: True, account="balance",
+                            api=False, requires=("balance_login",))
+        results, test_report = self.run_scenario(scenario, self.make_prerequisites())
+        self.assertEqual(results, {"1.3_wechat": False})
+        self.assertEqual(test_report.test_cases[-1].status, "BLOCKED")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from test_support.cleanup import CLEANED_FILE, BatchCleanup, EntityManifest, find_pending_entities
+
+DELETE_REQUESTS = [{"method": "POST", "url": "/api/client/account/delete", "body": {"account": "{name}", "userId": "{owner}"},
+                    "expect_status": 200, "expect_json": {"code": 0}}]
+
+class StubAdminHandler(BaseHTTPRequestHandler):
+    """Deletes the accounts the stub server knows, and only for requests carrying the admin cookie."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        server = self.server
+        if self.path != "/api/client/account/delete":
+            self._send_json({"code": 404}, status=404)
+        elif "session=admin" not in self.headers.get("Cookie", ""):
+            self._send_json({"code": 401}, status=401)
+        else:
+            with server.lock:
+                server.requests.append(payload)
+                found = server.accounts.pop(payload["account"], None) is not None
+            self._send_json({"code": 0} if found else {"code": 1, "msg": "账号不存在"})
+
+class BatchCleanupTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.reports_root = self.temp_dir.name
+        self.run_dir = os.path.join(self.reports_root, "run1")
+        os.makedirs(self.run_dir)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubAdminHandler)
+        self.server.daemon_threads = True
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.accounts = {"a0000000": "10711", "a0000001": "10711"}
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.origin = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+        manifest = EntityManifest(self.run_dir)
+        for name in ["a0000000", "a0000001", "a0000002"]:
+            manifest.record("vpn_account", name, owner="10711", scenario="1.1")
+
+    def make_cleanup(self, delete_requests=None, cookies=None):
+        return BatchCleanup(self.origin, {"vpn_account": DELETE_REQUESTS} if delete_requests is None else delete_requests,
+                            {"session": "admin"} if cookies is None else cookies, workers=2, rate=100)
+
+    def test_deletes_pending_entities_and_records_the_outcome(self):
+        deleted, failed = self.make_cleanup().run(find_pending_entities(self.reports_root))
+        self.assertEqual((deleted, failed), (2, 1))
+        self.assertEqual(self.server.accounts, {})
+        self.assertIn({"account": "a0000000", "userId": "10711"}, self.server.requests)
+        with open(os.path.join(self.run_dir, CLEANED_FILE), 'r', encoding='utf-8') as f:
+            outcomes = {record['name']: record['deleted'] for record in map(json.loads, f)}
+        self.assertEqual(outcomes, {"a0000000": True, "a0000001": True, "a0000002": False})
+
+    def test_deleted_entities_are_not_pending_again(self):
+        self.make_cleanup().run(find_pending_entities(self.reports_root))
+        self.assertEqual([entity['name'] for entity in find_pending_entities(self.reports_root)], ["a0000002"])
+
+    def test_requests_carry_the_admin_cookies(self):
+        deleted, failed = self.make_cleanup(cookies={}).run(find_pending_entities(self.reports_root))
+        self.assertEqual((deleted, failed), (0, 3))
+        self.assertEqual(len(self.server.accounts), 2)
+
+    def test_kinds_without_delete_requests_fail_before_deleting(self):
+        with self.assertRaises(LookupError):
+            self.make_cleanup(delete_requests={}).run(find_pending_entities(self.reports_root))
+        self.assertEqual(self.server.requests, [])
+
+    def test_old_runs_are_skipped(self):
+        manifest_path = os.path.join(self.run_dir, "created_entities.jsonl")
+        os.utime(manifest_path, (0, 0))
+        self.assertEqual(find_pending_entities(self.reports_root, max_age_days=7), [])
+
+if __name__ == "__main__":
+    unittest.main()
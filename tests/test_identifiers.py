@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+import unittest
+
+from test_support.identifiers import ISSUED_FILE, IdentifierGenerator, to_base36, trace_identifier
+
+class ToBase36Tests(unittest.TestCase):
+
+    def test_pads_to_the_width(self):
+        self.assertEqual(to_base36(0, 4), "0000")
+        self.assertEqual(to_base36(35, 2), "0z")
+        self.assertEqual(to_base36(36 ** 4 - 1, 4), "zzzz")
+
+    def test_rejects_numbers_that_do_not_fit(self):
+        with self.assertRaises(OverflowError):
+            to_base36(36 ** 4, 4)
+
+class IdentifierGeneratorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.reports_root = self.temp_dir.name
+
+    def make_run_dir(self, name):
+        run_dir = os.path.join(self.reports_root, name)
+        os.makedirs(run_dir)
+        return run_dir
+
+    def test_names_are_eight_lowercase_characters_starting_with_a_letter(self):
+        name = IdentifierGenerator(self.make_run_dir("run1"), self.reports_root).next_name()
+        self.assertRegex(name, r"^[a-z][0-9a-z]{7}$")
+
+    def test_runs_get_different_tags(self):
+        first = IdentifierGenerator(self.make_run_dir("run1"), self.reports_root)
+        second = IdentifierGenerator(self.make_run_dir("run2"), self.reports_root)
+        self.assertNotEqual(first.run_tag, second.run_tag)
+
+    def test_processes_of_a_run_share_the_tag_and_never_collide(self):
+        run_dir = self.make_run_dir("run1")
+        first = IdentifierGenerator(run_dir, self.reports_root, block_size=3)
+        second = IdentifierGenerator(run_dir, self.reports_root, block_size=3)
+        self.assertEqual(first.run_tag, second.run_tag)
+        names = [generator.next_name() for _ in range(5) for generator in (first, second)]
+        self.assertEqual(len(set(names)), len(names))
+
+    def test_resumed_run_continues_after_the_used_blocks(self):
+        run_dir = self.make_run_dir("run1")
+        used = {IdentifierGenerator(run_dir, self.reports_root, block_size=2).next_name() for _ in range(3)}
+        resumed = IdentifierGenerator(run_dir, self.reports_root, block_size=2).next_name()
+        self.assertNotIn(resumed, used)
+
+    def test_every_name_is_logged(self):
+        run_dir = self.make_run_dir("run1")
+        name = IdentifierGenerator(run_dir, self.reports_root).next_name("website_create_account", "account")
+        with open(os.path.join(run_dir, ISSUED_FILE), 'r', encoding='utf-8') as f:
+            record = json.loads(f.readline())
+        self.assertEqual((record['name'], record['scenario'], record['kind']), (name, "website_create_account", "account"))
+
+class TraceIdentifierTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.reports_root = self.temp_dir.name
+
+    def test_finds_the_run_and_scenario(self):
+        run_dir = os.path.join(self.reports_root, "run1")
+        os.makedirs(run_dir)
+        name = IdentifierGenerator(run_dir, self.reports_root).next_name("admin_add_user", "user")
+        found = trace_identifier(self.reports_root, name)
+        self.assertEqual(found['run_dir'], os.path.abspath(run_dir))
+        self.assertEqual(found['scenario'], "admin_add_user")
+
+    def test_unknown_names_are_not_found(self):
+        self.assertIsNone(trace_identifier(self.reports_root, "a0000000"))
+        run_dir = os.path.join(self.reports_root, "run1")
+        os.makedirs(run_dir)
+        IdentifierGenerator(run_dir, self.reports_root).next_name()
+        self.assertIsNone(trace_identifier(self.reports_root, "zzzz0000"))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import ast
+import unittest
+
+from test_support.ordering import get_function_calls, order_fail_fast
+from test_support.runner import Scenario
+
+def make_scenario(key, account=None, test_func=None):
+    return Scenario(key, key, "", test_func or (lambda: None), account=account)
+
+class OrderFailFastTests(unittest.TestCase):
+
+    def test_sorts_by_failure_probability_within_an_account(self):
+        scenarios = [make_scenario("a"), make_scenario("b"), make_scenario("c")]
+        ordered = order_fail_fast(scenarios, {"a": 0.1, "b": 0.9, "c": 0.5})
+        self.assertEqual([scenario.key for scenario in ordered], ["b", "c", "a"])
+
+    def test_ties_keep_the_source_order(self):
+        scenarios = [make_scenario("a"), make_scenario("b"), make_scenario("c")]
+        ordered = order_fail_fast(scenarios, {})
+        self.assertEqual([scenario.key for scenario in ordered], ["a", "b", "c"])
+
+    def test_groups_scenarios_by_account(self):
+        scenarios = [make_scenario("a1", "balance"), make_scenario("n1", "no_balance"),
+                     make_scenario("a2", "balance"), make_scenario("n2", "no_balance")]
+        ordered = order_fail_fast(scenarios, {"a1": 0.2, "n1": 0.3, "a2": 0.8, "n2": 0.1})
+        # The balance group holds the likeliest failure, so it runs first
+        self.assertEqual([scenario.key for scenario in ordered], ["a2", "a1", "n1", "n2"])
+
+    def test_changed_scenarios_move_forward(self):
+        scenarios = [make_scenario("a"), make_scenario("b")]
+        ordered = order_fail_fast(scenarios, {"a": 0.3, "b": 0.2}, changed_keys={"b"})
+        self.assertEqual([scenario.key for scenario in ordered], ["b", "a"])
+
+class GetFunctionCallsTests(unittest.TestCase):
+
+    def test_includes_indirect_calls(self):
+        tree = ast.parse(
+            "def helper():\n    click()\n"
+            "def step():\n    helper()\n"
+            "def scenario():\n    step()\n")
+        calls = get_function_calls(tree)
+        self.assertEqual(calls["scenario"], {"step", "helper", "click"})
+        self.assertEqual(calls["helper"], {"click"})
+
+    def test_handles_recursion(self):
+        tree = ast.parse("def retry():\n    retry()\n    wait()\n")
+        self.assertEqual(get_function_calls(tree)["retry"], {"retry", "wait"})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+
+from test_support.runner import Scenario
+from test_support.scheduling import WorkQueue, assign_longest_first, group_by_account, predict_durations
+
+def make_scenario(key, account=None):
+    return Scenario(key, key, "", lambda: None, account=account)
+
+class PredictDurationsTests(unittest.TestCase):
+
+    def test_uses_history_and_the_median_for_new_scenarios(self):
+        scenarios = [make_scenario(key) for key in "abcd"]
+        predictions = predict_durations(scenarios, {"a": 10, "b": 30, "c": 20})
+        self.assertEqual(predictions, {"a": 10, "b": 30, "c": 20, "d": 20})
+
+    def test_falls_back_to_the_default_without_history(self):
+        predictions = predict_durations([make_scenario("a")], {}, default=42)
+        self.assertEqual(predictions, {"a": 42})
+
+class AssignLongestFirstTests(unittest.TestCase):
+
+    def test_balances_the_load(self):
+        scenarios = [make_scenario(key) for key in "abcde"]
+        predictions = {"a": 50, "b": 40, "c": 30, "d": 20, "e": 10}
+        assignments = assign_longest_first(scenarios, predictions, 2)
+        loads = sorted(sum(predictions[key] for key in keys) for keys in assignments)
+        self.assertEqual(loads, [70, 80])
+        self.assertEqual(sorted(key for keys in assignments for key in keys), list("abcde"))
+
+    def test_groups_each_share_by_account(self):
+        scenarios = [make_scenario("a1", "balance"), make_scenario("n1", "no_balance"),
+                     make_scenario("a2", "balance"), make_scenario("n2", "no_balance")]
+        predictions = {"a1": 40, "n1": 30, "a2": 20, "n2": 10}
+        self.assertEqual(assign_longest_first(scenarios, predictions, 1), [["a1", "a2", "n1", "n2"]])
+
+    def test_group_by_account_puts_the_longest_group_first(self):
+        scenarios = [make_scenario("a", "balance"), make_scenario("n", "no_balance"), make_scenario("b", "balance")]
+        ordered = group_by_account(scenarios, {"a": 5, "n": 60, "b": 10})
+        self.assertEqual([scenario.key for scenario in ordered], ["n", "b", "a"])
+
+class WorkQueueTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.path = os.path.join(self.temp_dir.name, "queue.json")
+
+    def test_workers_take_their_own_queue_in_order(self):
+        queue = WorkQueue.create(self.path, [["a", "b"], ["c"]], {"a": 1, "b": 1, "c": 1})
+        self.assertEqual([queue.take(0), queue.take(0), queue.take(1)], ["a", "b", "c"])
+
+    def test_idle_worker_steals_from_the_back_of_the_longest_queue(self):
+        queue = WorkQueue.create(self.path, [["a", "b", "c"], ["d"], []], {"a": 30, "b": 20, "c": 10, "d": 5})
+        self.assertEqual(queue.take(2), "c")
+        self.assertEqual(queue.take(0), "a")
+
+    def test_every_scenario_is_taken_exactly_once(self):
+        queue = WorkQueue.create(self.path, [["a", "b"], ["c", "d", "e"]], dict.fromkeys("abcde", 1))
+        taken = []
+        for worker in [0, 1, 0, 0, 1, 0]:
+            key = queue.take(worker)
+            if key is not None:
+                taken.append(key)
+        self.assertEqual(sorted(taken), list("abcde"))
+        self.assertIsNone(queue.take(0))
+        self.assertIsNone(queue.take(1))
+
+    def test_thief_prefers_scenarios_of_its_account(self):
+        predictions = {"a": 10, "b": 10, "c": 10, "n": 5}
+        accounts = {"a": "balance", "b": "no_balance", "c": "balance", "n": "no_balance"}
+        queue = WorkQueue.create(self.path, [["a", "c"], ["n"], []], predictions, accounts)
+        # Worker 0's queue is longer, but only worker 1's has no_balance work
+        self.assertEqual(queue.take(2, "no_balance"), "n")
+        self.assertEqual(queue.take(2, "no_balance"), "c")
+
+    def test_thief_takes_the_last_scenario_of_its_account(self):
+        predictions = {"a": 10, "b": 10, "c": 10}
+        accounts = {"a": "no_balance", "b": "no_balance", "c": "balance"}
+        queue = WorkQueue.create(self.path, [["a", "b", "c"], []], predictions, accounts)
+        self.assertEqual(queue.take(1, "no_balance"), "b")
+        self.assertEqual(queue.take(0), "a")
+
+    def test_iter_scenarios_carries_the_current_account(self):
+        scenarios = [make_scenario("a", "balance"), make_scenario("b", "no_balance"), make_scenario("c", "no_balance")]
+        queue = WorkQueue.create(self.path, [["a"], ["c", "b"]], dict.fromkeys("abc", 1),
+                                 {scenario.key: scenario.account for scenario in scenarios})
+        # After its own balance scenario, worker 0 steals the no_balance work from the back
+        self.assertEqual([scenario.key for scenario in queue.iter_scenarios(0, scenarios)], ["a", "b", "c"])
+
+if __name__ == "__main__":
+    unittest.main()
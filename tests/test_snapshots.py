@@ -0,0 +1,77 @@
+import collections
+import threading
+import unittest
+
+try:
+    import trio
+except ImportError:
+    trio = None
+
+from test_support.snapshots import PageSnapshotter
+
+class BlockedWriter:
+    """Artifact writer whose queue is full until release is set."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.written = []
+
+    def _write(self, path, *args, **kwargs):
+        self.release.wait(5)
+        self.written.append(path)
+        return path
+
+    write_text = write_bytes = write_json = _write
+
+class FakeSession:
+    async def execute(self, command):
+        return command
+
+class FakePage:
+    @staticmethod
+    def capture_snapshot(format_):
+        return "mhtml"
+
+    @staticmethod
+    def capture_screenshot(format_):
+        return ""
+
+@unittest.skipIf(trio is None, "trio is not installed")
+class SnapshotWorkerTests(unittest.TestCase):
+
+    def make_snapshotter(self, writer):
+        # Only the worker is exercised; no browser or DevTools connection is needed
+        snapshotter = PageSnapshotter.__new__(PageSnapshotter)
+        snapshotter.writer = writer
+        snapshotter._console = collections.deque(maxlen=10)
+        snapshotter._lock = threading.Lock()
+        snapshotter._idle = threading.Condition()
+        snapshotter._pending = 1
+        snapshotter._drained = threading.Event()
+        return snapshotter
+
+    def test_back_pressure_does_not_block_the_event_loop(self):
+        writer = BlockedWriter()
+        snapshotter = self.make_snapshotter(writer)
+        devtools = type("DevTools", (), {"page": FakePage})
+        ticks = []
+
+        async def main():
+            send, receive = trio.open_memory_channel(1)
+            async with trio.open_nursery() as nursery:
+                nursery.start_soon(snapshotter._snapshot_worker, FakeSession(), devtools, receive)
+                await send.send(("page.mhtml.gz", "page.png", "console.json.gz"))
+                # The loop keeps running other tasks while the writer is blocked
+                for _ in range(5):
+                    await trio.sleep(0.01)
+                    ticks.append(len(writer.written))
+                writer.release.set()
+                await send.aclose()
+
+        trio.run(main)
+        self.assertEqual(ticks, [0] * 5)
+        self.assertEqual(writer.written, ["page.mhtml.gz", "page.png", "console.json.gz"])
+        self.assertTrue(snapshotter._drained.is_set())
+
+if __name__ == "__main__":
+    unittest.main()
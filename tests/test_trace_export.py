@@ -0,0 +1,47 @@
+import json
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from test_reports import test_report
+from test_reports.trace_export import ChromeTraceWriter
+
+class ChromeTraceWriterTests(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.writer = ChromeTraceWriter(self.temp_dir.name, "suite")
+
+    def read_spans(self):
+        self.writer.close()
+        with open(self.writer.path, 'r', encoding='utf-8') as f:
+            return {event['name']: event for event in json.load(f) if event['ph'] == 'X'}
+
+    def test_backdated_steps_use_the_same_clock_as_their_case(self):
+        test_case = test_report.TestCase("Purchase", "")
+        test_case.start()
+        redirect_started = time.perf_counter()
+        time.sleep(0.02)
+        # The wall clock jumps between the redirect and the step being tracked
+        with mock.patch('time.time', return_value=time.time() + 3600):
+            with test_report.track_step(test_case, "Verify Alipay", "", started_at_perf=redirect_started):
+                pass
+        test_case.complete()
+        self.writer.write_test_case(test_case)
+        spans = self.read_spans()
+        step, case = spans["Verify Alipay"], spans["Purchase"]
+        expected_offset = (redirect_started - test_case._perf_start) * 1_000_000
+        self.assertAlmostEqual(step['ts'] - case['ts'], expected_offset, delta=2)
+        self.assertLessEqual(step['ts'] + step['dur'], case['ts'] + case['dur'] + 2)
+
+    def test_loaded_cases_keep_their_recorded_start(self):
+        test_case = test_report.TestCase.from_dict({'name': "Loaded", 'description': "", 'status': "PASSED",
+                                        'start_time': 1000.0, 'end_time': 1002.5, 'steps': []})
+        self.writer.write_test_case(test_case)
+        span = self.read_spans()["Loaded"]
+        self.assertEqual((span['ts'], span['dur']), (1_000_000_000, 2_500_000))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import io
+import unittest
+from contextlib import redirect_stdout
+
+from test_reports import test_report
+
+class TrackStepFailureTests(unittest.TestCase):
+
+    def setUp(self):
+        self.failed_steps = []
+        hook = lambda test_case, step: self.failed_steps.append(step.name)
+        test_report.FAILURE_HOOKS.append(hook)
+        self.addCleanup(test_report.FAILURE_HOOKS.remove, hook)
+        self.test_case = test_report.TestCase("Purchase", "")
+        self.test_case.start()
+
+    def test_hooks_run_once_for_the_innermost_failed_step(self):
+        output = io.StringIO()
+        with redirect_stdout(output), self.assertRaises(ValueError):
+            with test_report.track_step(self.test_case, "Verify Success", ""):
+                with test_report.track_step(self.test_case, "Close Success Popup", ""):
+                    raise ValueError("popup not found")
+        self.assertEqual(self.failed_steps, ["Close Success Popup"])
+        self.assertEqual(output.getvalue().count("Stack trace:"), 1)
+        self.assertEqual([step.status for step in self.test_case.steps], ["FAILED", "FAILED"])
+
+    def test_a_new_failure_in_the_enclosing_step_runs_the_hooks(self):
+        with redirect_stdout(io.StringIO()), self.assertRaises(RuntimeError):
+            with test_report.track_step(self.test_case, "Verify Success", ""):
+                try:
+                    with test_report.track_step(self.test_case, "Close Success Popup", ""):
+                        raise ValueError("popup not found")
+                except ValueError:
+                    pass
+                raise RuntimeError("no success message")
+        self.assertEqual(self.failed_steps, ["Close Success Popup", "Verify Success"])
+
+    def test_budgets_apply_to_self_time(self):
+        test_case = test_report.TestCase("Purchase", "", step_budgets={"Verify Success": 0.05})
+        test_case.start()
+        with redirect_stdout(io.StringIO()):
+            with test_report.track_step(test_case, "Verify Success", "") as parent:
+                with test_report.track_step(test_case, "Close Success Popup", "") as child:
+                    pass
+        child.duration = 1.0
+        parent.duration = 1.01
+        self.assertFalse(parent.exceeds_budget())
+        parent.duration = 1.1
+        self.assertTrue(parent.exceeds_budget())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,35 @@
+import io
+import time
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+
+from test_support.watchdog import Watchdog
+
+class WatchdogTests(unittest.TestCase):
+
+    def make_watchdog(self):
+        self.aborts = []
+        watchdog = Watchdog(lambda force: self.aborts.append(force), abort_grace=0.05, poll_interval=0.01)
+        self.addCleanup(watchdog.stop)
+        return watchdog.start()
+
+    def test_fires_after_the_timeout(self):
+        watchdog = self.make_watchdog()
+        with redirect_stdout(io.StringIO()):
+            deadline = watchdog.arm("Step 'Login'", 0.05)
+            time.sleep(0.3)
+        self.assertTrue(watchdog.tripped)
+        self.assertTrue(watchdog.disarm(deadline))
+        self.assertEqual(self.aborts[0], False)
+
+    def test_wall_clock_jumps_do_not_fire_it(self):
+        watchdog = self.make_watchdog()
+        deadline = watchdog.arm("Step 'Login'", 60)
+        with mock.patch('time.time', return_value=time.time() + 3600):
+            time.sleep(0.1)
+        self.assertFalse(watchdog.tripped)
+        self.assertFalse(watchdog.disarm(deadline))
+
+if __name__ == "__main__":
+    unittest.main()